@@ -0,0 +1,486 @@
+# api/admission.py
+# Admission control: memory-aware concurrency limits, bounded fair queues and 429 backpressure.
+
+import asyncio
+import inspect
+import json
+import math
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, nullcontext
+from typing import (
+    Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Pattern, Tuple, Union,
+)
+from urllib.parse import parse_qs
+
+from api.pools import get_io_pool
+from core.metrics import metrics
+from datasets.rows import DEFAULT_LIMIT, MAX_LIMIT
+from datasets.storage import load_profile
+
+# Constants
+UPLOAD_MEMORY_FACTOR = 8  # Peak memory of parsing + profiling a CSV, relative to its size
+DEFAULT_UPLOAD_BYTES = 64 * 1024 * 1024  # Assumed upload size when Content-Length is missing
+PLAN_REQUEST_BYTES = 16 * 1024 * 1024  # Planning only holds the profile and prompt
+BYTES_PER_CELL = 16  # In-memory cost of one dataset cell (values plus index/overhead)
+MAX_RETRY_AFTER = 120  # Upper bound on the Retry-After hint, seconds
+CLIENT_ID_HEADER = b"x-client-id"
+SHAPE_CACHE_SIZE = 1024  # Dataset shapes remembered for row-page estimates
+MISSING_SHAPE_TTL = 5.0  # Seconds an unknown dataset ID is remembered as missing
+SCOPE_KEY = "autostat.admission"  # ASGI scope key under which the middleware exposes its controller
+COST_SCOPE_KEY = "autostat.admission.cost"  # ASGI scope key holding the admitted request's reservation
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment."""
+    return int(os.getenv(name, str(default)))
+
+
+def _default_memory_budget() -> int:
+    """Half of physical memory, or 2 GiB if it cannot be determined."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2
+    except (ValueError, OSError, AttributeError):
+        return 2 * 1024 ** 3
+
+
+class AdmissionRejected(Exception):
+    """Raised by AdmissionController.slot when work is not admitted."""
+
+    def __init__(self, status: int, message: str, headers: Dict[str, str]):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers
+
+
+class _Waiter:
+    """A queued request waiting for a slot and a memory reservation."""
+
+    def __init__(self, cost: int, future: "asyncio.Future[None]"):
+        self.cost = cost
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+class AdmissionClass:
+    """
+    Concurrency limit and fair wait queue for one class of endpoints.
+
+    Waiters are kept per client and served round-robin across clients, so
+    one client flooding the queue cannot starve the others.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, queue_size: int):
+        """
+        Initialize the class.
+
+        Args:
+            name: Class name used in metric names (e.g. "llm", "cpu")
+            max_concurrency: Requests of this class processed at once
+            queue_size: Requests allowed to wait; beyond that, 429
+        """
+        self.name = name
+        self.max_concurrency = max(max_concurrency, 1)
+        self.queue_size = queue_size
+        self.active = 0
+        self.queued = 0
+        self.waiters: "OrderedDict[str, deque[_Waiter]]" = OrderedDict()
+        self._service_seconds = 1.0  # Moving average, feeds the Retry-After hint
+
+    def record_service_time(self, seconds: float) -> None:
+        """Fold one request's service time into the moving average."""
+        self._service_seconds = 0.8 * self._service_seconds + 0.2 * seconds
+
+    def retry_after(self) -> int:
+        """Estimate how long until a new request could be admitted, in seconds."""
+        rounds = (self.queued + 1) / self.max_concurrency
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(rounds * self._service_seconds)))
+
+    def publish(self) -> None:
+        """Publish the class's active and queue-depth gauges."""
+        metrics.set_gauge(f"admission.{self.name}.active", self.active)
+        metrics.set_gauge(f"admission.{self.name}.queue_depth", self.queued)
+
+
+class AdmissionController:
+    """
+    Admits requests against per-class slots and a shared memory budget.
+
+    A request is admitted when its class has a free slot and its estimated
+    memory fits the remaining budget. Otherwise it waits in the class's
+    bounded fair queue; if the queue is full, or the wait exceeds
+    ``max_wait``, it is rejected with 429 and a Retry-After hint. Requests
+    whose estimate exceeds the whole budget are rejected with 413.
+
+    All state is touched only from the event loop, so no locks are needed.
+    """
+
+    def __init__(self, classes: Dict[str, AdmissionClass], memory_budget: int, max_wait: float):
+        """
+        Initialize the controller.
+
+        Args:
+            classes: Admission classes by name
+            memory_budget: Bytes that admitted requests may reserve in total
+            max_wait: Maximum seconds a request may wait in a queue
+        """
+        self.classes = classes
+        self.memory_budget = memory_budget
+        self.max_wait = max_wait
+        self.reserved = 0
+
+    async def acquire(self, cls: AdmissionClass, client: str, cost: int) -> Optional[Tuple[int, str, Dict[str, str]]]:
+        """
+        Wait for admission.
+
+        Args:
+            cls: Admission class of the request
+            client: Client identity used for fair queuing
+            cost: Estimated memory in bytes
+
+        Returns:
+            None when admitted, otherwise (status, message, headers) to reject with
+        """
+        if cost > self.memory_budget:
+            metrics.incr(f"admission.{cls.name}.rejected_too_large")
+            return 413, "Request exceeds the server's memory budget", {}
+
+        if not cls.queued and self._fits(cls, cost):
+            self._admit(cls, cost)
+            return None
+
+        if cls.queued >= cls.queue_size:
+            metrics.incr(f"admission.{cls.name}.rejected")
+            return 429, "Server busy, retry later", {"Retry-After": str(cls.retry_after())}
+
+        waiter = _Waiter(cost=cost, future=asyncio.get_running_loop().create_future())
+        cls.waiters.setdefault(client, deque()).append(waiter)
+        cls.queued += 1
+        metrics.incr(f"admission.{cls.name}.queued")
+        cls.publish()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted at the last moment: hand the reservation back
+                self.release(cls, cost, service_seconds=None)
+            else:
+                waiter.future.cancel()
+                self._remove(cls, client, waiter)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            metrics.incr(f"admission.{cls.name}.rejected_timeout")
+            return 429, "Timed out waiting for capacity, retry later", {"Retry-After": str(cls.retry_after())}
+        metrics.observe(f"admission.{cls.name}.wait_seconds", time.monotonic() - waiter.queued_at)
+        return None
+
+    @asynccontextmanager
+    async def slot(self, class_name: str, client: str, cost: int) -> AsyncIterator[None]:
+        """
+        Hold one admission slot for a block of work.
+
+        Used by handlers that fan one request out into several units of
+        work (e.g. batch planning), so each unit is admitted on its own.
+
+        Args:
+            class_name: Admission class to take the slot from
+            client: Client identity used for fair queuing
+            cost: Estimated memory in bytes
+
+        Raises:
+            AdmissionRejected: If the work is not admitted
+        """
+        cls = self.classes[class_name]
+        rejection = await self.acquire(cls, client, cost)
+        if rejection is not None:
+            raise AdmissionRejected(*rejection)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(cls, cost, time.monotonic() - start)
+
+    def release(self, cls: AdmissionClass, cost: int, service_seconds: Optional[float]) -> None:
+        """
+        Return a slot and its memory reservation, then admit waiters.
+
+        Args:
+            cls: Admission class of the finished request
+            cost: Memory reserved at admission
+            service_seconds: How long the request ran (None if it never ran)
+        """
+        cls.active -= 1
+        self.reserved -= cost
+        if service_seconds is not None:
+            cls.record_service_time(service_seconds)
+        metrics.set_gauge("admission.memory_reserved_bytes", self.reserved)
+        self._dispatch()
+        cls.publish()
+
+    def _fits(self, cls: AdmissionClass, cost: int) -> bool:
+        """True if the class has a free slot and the cost fits the budget."""
+        return cls.active < cls.max_concurrency and self.reserved + cost <= self.memory_budget
+
+    def _admit(self, cls: AdmissionClass, cost: int) -> None:
+        """Take a slot and reserve memory."""
+        cls.active += 1
+        self.reserved += cost
+        metrics.incr(f"admission.{cls.name}.admitted")
+        metrics.set_gauge("admission.memory_reserved_bytes", self.reserved)
+        cls.publish()
+
+    def _dispatch(self) -> None:
+        """Admit queued requests, round-robin over clients, while capacity allows."""
+        for cls in self.classes.values():
+            progressed = True
+            while progressed and cls.waiters:
+                progressed = False
+                for client in list(cls.waiters):
+                    queue = cls.waiters[client]
+                    waiter = queue[0]
+                    if not self._fits(cls, waiter.cost):
+                        continue
+                    queue.popleft()
+                    cls.queued -= 1
+                    # Served clients move to the back of the rotation
+                    del cls.waiters[client]
+                    if queue:
+                        cls.waiters[client] = queue
+                    self._admit(cls, waiter.cost)
+                    waiter.future.set_result(None)
+                    progressed = True
+                    break
+            cls.publish()
+
+    def _remove(self, cls: AdmissionClass, client: str, waiter: _Waiter) -> None:
+        """Drop a waiter that gave up."""
+        queue = cls.waiters.get(client)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            cls.queued -= 1
+            if not queue:
+                del cls.waiters[client]
+        cls.publish()
+
+
+# Cost estimators receive the ASGI scope and the route's path parameters; estimators
+# that need I/O are coroutines, so the event loop never blocks on disk
+CostEstimator = Callable[[Dict[str, Any], Dict[str, str]], Union[int, Awaitable[int]]]
+
+
+def upload_cost(scope: Dict[str, Any], params: Dict[str, str]) -> int:
+    """Estimate upload memory from Content-Length."""
+    length = _header(scope, b"content-length")
+    size = int(length) if length and length.isdigit() else DEFAULT_UPLOAD_BYTES
+    return size * UPLOAD_MEMORY_FACTOR
+
+
+def upload_size_limit(scope: Dict[str, Any]) -> Optional[int]:
+    """
+    Largest upload the request's memory reservation covers.
+
+    upload_cost reserves for DEFAULT_UPLOAD_BYTES when Content-Length is
+    missing (chunked uploads), so the upload handler enforces this limit
+    while spooling instead of trusting the estimate.
+
+    Args:
+        scope: ASGI scope of an admitted upload request
+
+    Returns:
+        Size limit in bytes, or None if the request was not admitted by the middleware
+    """
+    cost = scope.get(COST_SCOPE_KEY)
+    return cost // UPLOAD_MEMORY_FACTOR if cost is not None else None
+
+
+def plan_cost(scope: Dict[str, Any], params: Dict[str, str]) -> int:
+    """Planning holds only the profile and prompt."""
+    return PLAN_REQUEST_BYTES
+
+
+async def rows_cost(scope: Dict[str, Any], params: Dict[str, str]) -> int:
+    """Estimate a row page from its limit and the dataset's width; pages never load the whole dataset."""
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    try:
+        limit = min(int(query.get("limit", [DEFAULT_LIMIT])[0]), MAX_LIMIT)
+        shape = await _dataset_shape(params["dataset_id"])
+    except (KeyError, ValueError):
+        return PLAN_REQUEST_BYTES  # The handler will answer 422
+    if shape is None:
+        return PLAN_REQUEST_BYTES  # The handler will answer 404
+    rows, columns = shape
+    return max(min(limit, rows) * columns * BYTES_PER_CELL, PLAN_REQUEST_BYTES)
+
+
+# dataset_id -> (shape, or None if missing; monotonic time the entry expires)
+_shapes: "OrderedDict[str, Tuple[Optional[Tuple[int, int]], float]]" = OrderedDict()
+
+
+async def _dataset_shape(dataset_id: str) -> Optional[Tuple[int, int]]:
+    """
+    Rows and columns of a stored dataset, or None if it does not exist.
+
+    The profile is read on the I/O pool. Shapes are cached for good
+    (datasets are immutable once stored); unknown IDs only for
+    MISSING_SHAPE_TTL, so a dataset uploaded meanwhile is found soon.
+    """
+    now = time.monotonic()
+    cached = _shapes.get(dataset_id)
+    if cached is not None and cached[1] > now:
+        _shapes.move_to_end(dataset_id)
+        return cached[0]
+
+    try:
+        profile = await get_io_pool().run(load_profile, dataset_id)
+    except FileNotFoundError:
+        shape, expires = None, now + MISSING_SHAPE_TTL
+    else:
+        cols = profile.get("num_columns") or len(profile.get("columns", {}))
+        shape, expires = (profile.get("num_rows") or 0, cols), math.inf
+    _shapes[dataset_id] = (shape, expires)
+    _shapes.move_to_end(dataset_id)
+    while len(_shapes) > SHAPE_CACHE_SIZE:
+        _shapes.popitem(last=False)
+    return shape
+
+
+# (method, path pattern, admission class, cost estimator); unmatched routes are not limited
+ADMISSION_RULES: List[Tuple[str, Pattern[str], str, CostEstimator]] = [
+    ("POST", re.compile(r"^/datasets/upload$"), "cpu", upload_cost),
+    ("GET", re.compile(r"^/datasets/(?P<dataset_id>[^/]+)/rows$"), "cpu", rows_cost),
+    # /analyze/batch is not admitted as a whole: each of its planner calls takes
+    # its own "llm" slot through request_slot()
+    ("POST", re.compile(r"^/analyze$"), "llm", plan_cost),
+]
+
+
+def request_slot(scope: Dict[str, Any], class_name: str, cost: int) -> AsyncContextManager[None]:
+    """
+    Admit one unit of work done on behalf of a request.
+
+    Uses the controller of the AdmissionMiddleware that handled the request
+    and the request's client identity; without the middleware, nothing is
+    limited.
+
+    Args:
+        scope: ASGI scope of the request
+        class_name: Admission class to take the slot from
+        cost: Estimated memory in bytes
+
+    Returns:
+        Async context manager holding the slot; entering it may raise AdmissionRejected
+    """
+    controller: Optional[AdmissionController] = scope.get(SCOPE_KEY)
+    if controller is None:
+        return nullcontext()
+    return controller.slot(class_name, _client_id(scope), cost)
+
+
+def _header(scope: Dict[str, Any], name: bytes) -> Optional[str]:
+    """Return a request header value, or None."""
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _client_id(scope: Dict[str, Any]) -> str:
+    """Identify the client: X-Client-ID header, else the peer address."""
+    explicit = _header(scope, CLIENT_ID_HEADER)
+    if explicit:
+        return explicit
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def build_controller() -> AdmissionController:
+    """Create a controller from the AUTOSTAT_ADMIT_* environment settings."""
+    classes = {
+        "llm": AdmissionClass(
+            "llm",
+            _env_int("AUTOSTAT_ADMIT_LLM_CONCURRENCY", 8),
+            _env_int("AUTOSTAT_ADMIT_LLM_QUEUE", 64),
+        ),
+        "cpu": AdmissionClass(
+            "cpu",
+            _env_int("AUTOSTAT_ADMIT_CPU_CONCURRENCY", 4),
+            _env_int("AUTOSTAT_ADMIT_CPU_QUEUE", 16),
+        ),
+    }
+    memory_mb = os.getenv("AUTOSTAT_ADMIT_MEMORY_MB")
+    budget = int(memory_mb) * 1024 * 1024 if memory_mb else _default_memory_budget()
+    max_wait = float(os.getenv("AUTOSTAT_ADMIT_MAX_WAIT", "30"))
+    return AdmissionController(classes, budget, max_wait)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying an AdmissionController to matching routes.
+
+    The slot is held until the response has been fully sent, so streaming
+    responses count against the limit for their whole duration.
+    """
+
+    def __init__(self, app: Any, controller: Optional[AdmissionController] = None):
+        """
+        Wrap an ASGI app.
+
+        Args:
+            app: The downstream ASGI application
+            controller: Admission controller (built from the environment if omitted)
+        """
+        self.app = app
+        self.controller = controller or build_controller()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        """Admit, queue or reject the request, then run it."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        scope[SCOPE_KEY] = self.controller
+        match = self._match(scope)
+        if match is None:
+            await self.app(scope, receive, send)
+            return
+
+        cls, estimator, params = match
+        try:
+            cost = estimator(scope, params)
+            if inspect.isawaitable(cost):
+                cost = await cost
+        except Exception:
+            cost = PLAN_REQUEST_BYTES
+        rejection = await self.controller.acquire(cls, _client_id(scope), cost)
+        if rejection is not None:
+            await _reject(send, *rejection)
+            return
+
+        scope[COST_SCOPE_KEY] = cost
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(cls, cost, time.monotonic() - start)
+
+    def _match(self, scope: Dict[str, Any]) -> Optional[Tuple[AdmissionClass, CostEstimator, Dict[str, str]]]:
+        """Find the admission rule for a request."""
+        for method, pattern, class_name, estimator in ADMISSION_RULES:
+            if scope["method"] != method:
+                continue
+            m = pattern.match(scope["path"])
+            if m:
+                params = {k: v for k, v in m.groupdict().items() if v is not None}
+                return self.controller.classes[class_name], estimator, params
+        return None
+
+
+async def _reject(send: Callable, status: int, message: str, headers: Dict[str, str]) -> None:
+    """Send a small JSON error response."""
+    body = json.dumps({"detail": message}).encode()
+    raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    raw_headers += [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
@@ -1,23 +1,69 @@
 # api/main.py
 # FastAPI entry-point with robust error logging.
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from api.routers import datasets, analyze
+from api.admission import AdmissionMiddleware
+from api.pools import shutdown_pools
+from api.serialization import CompressionMiddleware, FastJSONResponse
+from api.routers import datasets, analyze, metrics, runs
+from core.jobs import get_run_queue
+from planner.llm_planner import warm_up
+from planner.backends import get_backend_pool
+import threading
 import traceback
 import logging
+import os
 
 # Configure logging using uvicorn's logger
 logger = logging.getLogger("uvicorn.error")
 
+# Set AUTOSTAT_PLANNER_WARMUP=0 to skip the model warm-up request at startup
+PLANNER_WARMUP = os.getenv("AUTOSTAT_PLANNER_WARMUP", "1") != "0"
+
+
+def _warm_up_planner() -> None:
+    """Prefill the planner prompt prefix; failures only delay the first plan."""
+    try:
+        warm_up()
+        logger.info("Planner model warmed up")
+    except Exception as exc:
+        logger.warning("Planner warm-up failed: %s", exc)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Periodic probes let backends marked unhealthy rejoin the pool
+    get_backend_pool().start_health_checks()
+    # Warm up in the background so startup never waits on the model server
+    if PLANNER_WARMUP:
+        threading.Thread(target=_warm_up_planner, name="planner-warmup", daemon=True).start()
+    # Resume runs that were queued or running when the API last stopped
+    run_queue = get_run_queue()
+    recovered = run_queue.recover()
+    if recovered:
+        logger.info("Re-enqueued %d interrupted runs", recovered)
+    yield
+    run_queue.stop(timeout=5)
+    shutdown_pools()
+
+
 # FastAPI application setup
 app = FastAPI(
     title="AutoStat-Agent API",
     version="0.1",
-    description="Plan-only prototype for statistical analysis automation",
+    description="Prototype for statistical analysis automation: planning and queued end-to-end runs",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 app.include_router(datasets.router)
 app.include_router(analyze.router)
+app.include_router(metrics.router)
+app.include_router(runs.router)
+
+# Admission control: bounded, memory-aware concurrency with 429 backpressure
+app.add_middleware(AdmissionMiddleware)
 
 # Exception logging middleware
 @app.middleware("http")
@@ -32,3 +78,8 @@ async def log_exceptions(request: Request, call_next):
             "".join(traceback.format_exception(exc)),
         )
         raise
+
+
+# Registered last so it is outermost: negotiated zstd/brotli/gzip for complete
+# responses (streams pass through), including those of the middleware above
+app.add_middleware(CompressionMiddleware)
@@ -0,0 +1,134 @@
+# api/pools.py
+# Executor pools that keep CPU-bound and blocking work off the event loop.
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, Tuple
+
+from core.metrics import metrics
+
+# Constants
+CPU_WORKERS = int(os.getenv("AUTOSTAT_CPU_WORKERS", str(min(os.cpu_count() or 1, 4))))  # CSV parsing, profiling
+IO_WORKERS = int(os.getenv("AUTOSTAT_IO_WORKERS", "16"))  # Disk, SQLite and blocking LLM calls
+
+
+def _timed_call(fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: dict) -> Tuple[float, Any]:
+    """Run fn in a worker and report when it actually started (wall clock)."""
+    return time.time(), fn(*args, **kwargs)
+
+
+class WorkerPool:
+    """
+    An executor wrapped with an awaitable ``run`` and per-pool telemetry.
+
+    For a pool named ``cpu`` the metrics are ``pools.cpu.pending`` (tasks
+    submitted but not finished), ``pools.cpu.wait_seconds`` (time queued
+    before a worker picked the task up), ``pools.cpu.seconds`` (end-to-end
+    latency) and the ``pools.cpu.tasks`` / ``pools.cpu.errors`` counters.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Executor], workers: int):
+        """
+        Initialize the pool; the executor is created on first use.
+
+        Args:
+            name: Pool name used in metric names
+            factory: Creates the underlying executor
+            workers: Configured number of workers (reported as a gauge)
+        """
+        self.name = name
+        self.workers = workers
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` in the pool and await its result.
+
+        For the process pool, ``fn`` and its arguments must be picklable.
+
+        Args:
+            fn: Function to call
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The function's return value
+
+        Raises:
+            Exception: Whatever ``fn`` raised
+        """
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        self._track(+1)
+        try:
+            started, result = await loop.run_in_executor(
+                self._get_executor(), partial(_timed_call, fn, args, kwargs)
+            )
+        except Exception:
+            metrics.incr(f"pools.{self.name}.errors")
+            raise
+        finally:
+            self._track(-1)
+            metrics.observe(f"pools.{self.name}.seconds", time.time() - submitted)
+        metrics.observe(f"pools.{self.name}.wait_seconds", max(started - submitted, 0.0))
+        metrics.incr(f"pools.{self.name}.tasks")
+        return result
+
+    def shutdown(self) -> None:
+        """Shut the executor down; a later ``run`` recreates it."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self) -> Executor:
+        """Create the executor lazily."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+                metrics.set_gauge(f"pools.{self.name}.workers", self.workers)
+            return self._executor
+
+    def _track(self, delta: int) -> None:
+        """Update the pending-task gauge."""
+        with self._lock:
+            self._pending += delta
+            pending = self._pending
+        metrics.set_gauge(f"pools.{self.name}.pending", pending)
+
+
+# Spawned workers do not inherit the API's threads (audit writer, run workers)
+_cpu_pool = WorkerPool(
+    "cpu",
+    lambda: ProcessPoolExecutor(max_workers=CPU_WORKERS, mp_context=multiprocessing.get_context("spawn")),
+    CPU_WORKERS,
+)
+_io_pool = WorkerPool(
+    "io",
+    lambda: ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io-pool"),
+    IO_WORKERS,
+)
+
+
+def get_cpu_pool() -> WorkerPool:
+    """Return the process pool for CPU-bound dataset work."""
+    return _cpu_pool
+
+
+def get_io_pool() -> WorkerPool:
+    """Return the bounded thread pool for blocking I/O."""
+    return _io_pool
+
+
+def shutdown_pools() -> None:
+    """Shut both pools down (called on API shutdown)."""
+    _cpu_pool.shutdown()
+    _io_pool.shutdown()
@@ -1,13 +1,31 @@
 # api/routers/analyze.py
 # Handles /analyze endpoint for dataset analysis requests.
 
-from typing import Dict, Any
-from fastapi import APIRouter, Form, HTTPException
-from fastapi.responses import JSONResponse
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Any, Literal, Set
+from fastapi import APIRouter, Form, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
+from api.admission import PLAN_REQUEST_BYTES, request_slot
+from api.pools import IO_WORKERS, get_io_pool
+from api.schemas import BatchAnalyzeRequest, BatchPlanResult
+from api.serialization import FastJSONResponse, compact_profile
+from core.singleflight import AsyncSingleFlight
 from core.state import PromptState
-from datasets.storage import load_dataset
-from planner.llm_planner import plan
+from datasets.storage import load_profile
+from planner.cache import normalize_question
+from planner.prompting import prepare_profile
+from planner.router import route_plan
+
+# Constants
+# Upper bound on planner calls in flight per batch: below the I/O pool size, so
+# one batch cannot take every thread that /analyze and other requests need
+BATCH_MAX_CONCURRENCY = max(IO_WORKERS // 2, 1)
+BATCH_DEFAULT_CONCURRENCY = min(4, BATCH_MAX_CONCURRENCY)
+
+# Identical /analyze requests in flight (e.g. several dashboard tabs) share one plan
+_inflight_analyze = AsyncSingleFlight("analyze")
 
 router = APIRouter()
 
@@ -15,18 +33,28 @@ router = APIRouter()
 @router.post("/analyze")
 async def analyze(
     dataset_id: str = Form(..., description="Unique identifier for the uploaded dataset"),
-    prompt: str = Form(..., description="Research question or analysis request")
-) -> JSONResponse:
+    prompt: str = Form(..., description="Research question or analysis request"),
+    use_cache: bool = Form(True, description="Serve the plan from the plan cache when available"),
+    profile_view: Literal["full", "compact"] = Query(
+        "full", alias="profile", description="compact omits per-column statistics (see /datasets/{id}/profile)"
+    ),
+) -> FastJSONResponse:
     """
     Generate an analysis plan for a given dataset and research question.
     
-    This endpoint loads the specified dataset, builds a prompt state with the 
-    user's question and dataset profile, then generates a structured plan 
-    using the LLM planner.
+    This endpoint loads the specified dataset's profile, builds a prompt
+    state with the user's question, then generates a structured plan 
+    using the rule-based fast path or, for less common questions, the LLM
+    planner. Both the profile read and the (possibly blocking) planner
+    call run in the I/O thread pool, and identical requests arriving while
+    one is being planned wait for and share its result.
     
     Args:
         dataset_id: Unique identifier for a previously uploaded dataset
         prompt: The user's research question or analysis request
+        use_cache: Set to false to force a fresh plan from the LLM
+        profile_view: ``profile`` query parameter; "compact" returns only
+            column names, dtypes and counts
         
     Returns:
         JSON response containing the dataset profile and generated analysis plan
@@ -34,23 +62,106 @@ async def analyze(
     Raises:
         HTTPException: If the dataset cannot be loaded or planning fails
     """
-    # Step 1: Load the dataset and its profile using the provided dataset_id
-    df, profile = load_dataset(dataset_id)
+    async def load_and_plan():
+        # Step 1: Load the dataset profile (planning does not need the data itself)
+        io_pool = get_io_pool()
+        profile = await io_pool.run(load_profile, dataset_id)
+
+        # Step 2: Build a PromptState object to encapsulate the user's question
+        # and the dataset profile for downstream processing
+        prompt_state = PromptState(
+            question=prompt,
+            profile=profile,
+            dataset_id=dataset_id
+        )
 
-    # Step 2: Build a PromptState object to encapsulate the user's question,
-    # the loaded dataframe, and its profile for downstream processing
-    prompt_state = PromptState(
-        question=prompt,
-        dataframe=df,
-        profile=profile
-    )
+        # Step 3: Generate a plan, skipping the LLM when the rules are confident
+        plan_steps = await io_pool.run(route_plan, prompt_state, use_cache=use_cache)
+        return profile, plan_steps
 
-    # Step 3: Generate a plan using the planner module
-    plan_steps = plan(prompt_state)
+    key = (dataset_id, normalize_question(prompt), use_cache)
+    try:
+        (profile, plan_steps), _ = await _inflight_analyze.do(key, load_and_plan)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
     # Step 4: Return the dataset_id, profile, and the generated plan as a JSON response
-    return JSONResponse(content={
+    return FastJSONResponse(content={
         "dataset_id": dataset_id,
-        "profile": profile,
+        "profile": compact_profile(profile) if profile_view == "compact" else profile,
         "plan": [step.model_dump() for step in plan_steps]
-    })
\ No newline at end of file
+    })
+
+
+@router.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalyzeRequest, http_request: Request) -> StreamingResponse:
+    """
+    Plan many research questions against one dataset, streaming results.
+    
+    The dataset profile is loaded and rendered once and shared by every
+    prompt (the static prompt prefix is shared process-wide). Planner calls
+    run with bounded concurrency and each takes its own "llm" admission
+    slot, so a batch competes for the planner like that many /analyze
+    requests; a call that is not admitted reports it in its line's
+    ``error``. Each result is written as one NDJSON line as soon as it
+    finishes, so lines may arrive out of order; use ``index`` to match
+    them to prompts.
+    
+    Args:
+        request: Dataset ID, prompts, optional concurrency limit and cache flag
+        http_request: The HTTP request, for admission control
+        
+    Returns:
+        Streaming NDJSON response of BatchPlanResult lines
+        
+    Raises:
+        HTTPException: If the dataset does not exist
+    """
+    try:
+        profile = await get_io_pool().run(load_profile, request.dataset_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    prepared = prepare_profile(profile)
+    limit = min(request.concurrency or BATCH_DEFAULT_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+
+    async def plan_one(index: int, prompt: str) -> BatchPlanResult:
+        start = time.perf_counter()
+        state = PromptState(question=prompt, profile=profile, dataset_id=request.dataset_id)
+        try:
+            async with request_slot(http_request.scope, "llm", PLAN_REQUEST_BYTES):
+                steps = await get_io_pool().run(
+                    route_plan, state, use_cache=request.use_cache, prepared=prepared
+                )
+            plan_json, error = [s.model_dump() for s in steps], None
+        except Exception as e:
+            plan_json, error = None, str(e)
+        return BatchPlanResult(
+            index=index,
+            prompt=prompt,
+            plan=plan_json,
+            error=error,
+            elapsed_seconds=time.perf_counter() - start,
+        )
+
+    async def stream() -> AsyncIterator[str]:
+        # A window of at most `limit` tasks: the next prompt starts when one finishes
+        queued = iter(enumerate(request.prompts))
+        running: Set["asyncio.Task[BatchPlanResult]"] = set()
+        try:
+            while True:
+                for index, prompt in queued:
+                    running.add(asyncio.create_task(plan_one(index, prompt)))
+                    if len(running) >= limit:
+                        break
+                if not running:
+                    return
+                finished, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    yield task.result().model_dump_json() + "\n"
+        finally:
+            # Client went away: stop prompts in flight from reaching the planner
+            for task in running:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,55 +1,202 @@
 # api/routers/datasets.py
 # Manages dataset upload, metadata, and retrieval endpoints.
 
-from typing import Dict, Any
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-import pandas as pd
-import uuid
+import io
 import os
+from contextlib import suppress
+from typing import Dict, Any, List, Literal, Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Request
+from fastapi.responses import Response
+import uuid
+
+from api.admission import upload_size_limit
+from api.pools import get_cpu_pool, get_io_pool
+from api.serialization import FastJSONResponse, compact_profile
+from datasets import rows, storage
 
-from datasets.profile import profile_dataset
-from datasets.storage import save_dataset
+# Constants
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
 
 router = APIRouter()
 
 
 @router.post("/datasets/upload")
 async def upload_dataset(
-    file: UploadFile = File(..., description="CSV file containing the dataset to analyze")
-) -> JSONResponse:
+    request: Request,
+    file: UploadFile = File(..., description="CSV file containing the dataset to analyze"),
+    profile_view: Literal["full", "compact"] = Query(
+        "full", alias="profile", description="compact omits per-column statistics (see /datasets/{id}/profile)"
+    ),
+) -> FastJSONResponse:
     """
     Upload and process a CSV dataset for analysis.
     
     This endpoint accepts a CSV file, loads it into a DataFrame, generates
     a data profile with summary statistics, and stores both the dataset
-    and its profile for later use.
+    and its profile for later use. The upload is streamed to the storage
+    directory and only its path is handed to the CPU process pool, which
+    parses and profiles it, so the API process never holds the whole file
+    and the event loop keeps serving other requests. Uploads larger than
+    the admission reservation allows (e.g. chunked uploads without
+    Content-Length) are rejected while spooling.
     
     Args:
+        request: The HTTP request, for its admission reservation
         file: CSV file upload containing the dataset
+        profile_view: ``profile`` query parameter; "compact" returns only
+            column names, dtypes and counts
         
     Returns:
         JSON response with the dataset ID and profile information
         
     Raises:
-        HTTPException: If the CSV file cannot be parsed or processed
+        HTTPException: If the CSV file cannot be parsed or processed, or
+            exceeds its admission reservation
     """
-    # Step 1: Attempt to load the uploaded file as a CSV into a pandas DataFrame
+    # Step 1: Stream the upload to disk without blocking the event loop
+    dataset_id = str(uuid.uuid4())
+    try:
+        path = await get_io_pool().run(
+            storage.spool_upload, file.file, dataset_id, storage.BASE_DIR, upload_size_limit(request.scope)
+        )
+    except storage.UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    # Step 2: Parse, profile and save the dataset in a worker process
     try:
-        df = pd.read_csv(file.file)
-    except Exception as e:
-        # If loading fails, return a 400 error with details
+        profile = await get_cpu_pool().run(storage.ingest_csv, dataset_id, path, storage.BASE_DIR)
+    except ValueError as e:
+        # If parsing fails, return a 400 error with details
         raise HTTPException(status_code=400, detail=f"Invalid CSV: {str(e)}")
+    finally:
+        with suppress(FileNotFoundError):
+            os.remove(path)
 
-    # Step 2: Generate a profile (summary/statistics) of the dataset
-    profile = profile_dataset(df)
+    # Step 3: Return the dataset ID and its profile in the response
+    return FastJSONResponse(content={
+        "dataset_id": dataset_id,
+        "profile": compact_profile(profile) if profile_view == "compact" else profile
+    })
 
-    # Step 3: Generate a unique ID for the dataset and save both the data and its profile
-    dataset_id = str(uuid.uuid4())
-    save_dataset(dataset_id, df, profile)
 
-    # Step 4: Return the dataset ID and its profile in the response
-    return JSONResponse(content={
+@router.get("/datasets/{dataset_id}/profile")
+async def get_profile(
+    dataset_id: str,
+    columns: Optional[str] = Query(None, description="Comma-separated columns to include (default: all)"),
+) -> FastJSONResponse:
+    """
+    Return a stored dataset's profile, or the details of some columns.
+
+    Clients that asked for a compact profile fetch per-column statistics
+    here on demand.
+
+    Args:
+        dataset_id: Dataset whose profile to return
+        columns: Comma-separated column selection
+
+    Returns:
+        JSON response with the (possibly column-filtered) profile
+
+    Raises:
+        HTTPException: 404 if the dataset does not exist, 400 for unknown columns
+    """
+    try:
+        profile = await get_io_pool().run(storage.load_profile, dataset_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Dataset {dataset_id} not found")
+
+    if columns:
+        selected = [c.strip() for c in columns.split(",") if c.strip()]
+        unknown = [c for c in selected if c not in profile.get("columns", {})]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+        profile["columns"] = {c: profile["columns"][c] for c in selected}
+    return FastJSONResponse(content={"dataset_id": dataset_id, "profile": profile})
+
+
+@router.get("/datasets/{dataset_id}/rows")
+async def get_rows(
+    dataset_id: str,
+    request: Request,
+    offset: int = Query(0, ge=0, description="Number of (matching) rows to skip"),
+    limit: int = Query(rows.DEFAULT_LIMIT, ge=1, le=rows.MAX_LIMIT, description="Rows per page"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return (default: all)"),
+    filters: List[str] = Query([], alias="filter", description="Repeatable column<op>value predicate, e.g. price>=1000"),
+    output: Literal["json", "arrow"] = Query("json", alias="format", description="json records or an Arrow IPC stream"),
+) -> Response:
+    """
+    Read a page of rows, optionally restricted to some columns and filtered.
+
+    Only the requested range and columns are read (see datasets.rows), so
+    paging through a large dataset does not load it. Responses carry an
+    ETag derived from the stored dataset and the query; a matching
+    If-None-Match is answered with 304 before any data is read.
+
+    Args:
+        dataset_id: Dataset to read
+        request: Incoming request (for If-None-Match)
+        offset: Number of (matching) rows to skip
+        limit: Maximum number of rows to return
+        columns: Comma-separated column selection
+        filters: Filters (``filter`` query parameter), all of which rows must satisfy
+        output: ``format`` query parameter, "json" (records) or "arrow" (Arrow IPC stream)
+
+    Returns:
+        The page as JSON or as an Arrow IPC stream
+
+    Raises:
+        HTTPException: 404 if the dataset does not exist, 400 for unknown
+            columns or malformed filters, 406 for Arrow output without pyarrow
+    """
+    pa = storage.arrow_module() if output == "arrow" else None
+    if output == "arrow" and pa is None:
+        raise HTTPException(status_code=406, detail="Arrow output requires pyarrow on the server")
+
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    io_pool = get_io_pool()
+    try:
+        etag = await io_pool.run(
+            rows.page_etag, dataset_id,
+            offset=offset, limit=limit, columns=selected, filters=sorted(filters), output=output,
+        )
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(etag, request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+
+        profile = await io_pool.run(storage.load_profile, dataset_id)
+        predicates = rows.parse_filters(filters, profile)
+        page, has_more = await io_pool.run(rows.read_rows, dataset_id, offset, limit, selected, predicates)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Dataset {dataset_id} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers["X-Has-More"] = str(has_more).lower()
+    if pa is not None:
+        return Response(content=_arrow_stream(pa, page), media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+    return FastJSONResponse(content={
         "dataset_id": dataset_id,
-        "profile": profile
-    })
\ No newline at end of file
+        "offset": offset,
+        "limit": limit,
+        "columns": list(page.columns),
+        "total_rows": None if filters else profile.get("num_rows"),
+        "has_more": has_more,
+        "rows": page.to_dict(orient="records"),
+    }, headers=headers)
+
+
+def _etag_matches(etag: str, header: Optional[str]) -> bool:
+    """Whether an If-None-Match header matches the current ETag."""
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _arrow_stream(pa: Any, page: Any) -> bytes:
+    """Serialize a page as an Arrow IPC stream."""
+    table = pa.Table.from_pandas(page, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
@@ -0,0 +1,20 @@
+# api/routers/metrics.py
+# Exposes in-process telemetry (planner, cache, pools) as JSON.
+
+from fastapi import APIRouter
+
+from api.serialization import FastJSONResponse
+from core.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics() -> FastJSONResponse:
+    """
+    Return a snapshot of all counters, gauges and latency histograms.
+    
+    Returns:
+        JSON response with 'counters', 'gauges' and 'histograms'
+    """
+    return FastJSONResponse(content=metrics.snapshot())
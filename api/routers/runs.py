@@ -0,0 +1,202 @@
+# api/routers/runs.py
+# Handles /runs endpoints for queued end-to-end analysis runs.
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import AsyncIterator, Literal, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+
+from api.pools import get_io_pool
+from api.schemas import RunRequest
+from api.serialization import FastJSONResponse
+from core.jobs import TERMINAL_EVENT, get_run_queue
+from core.state import RunEvent, RunStatus
+from datasets.storage import load_profile
+from summarizer.html_export import export_html
+
+# Constants
+EVENT_POLL_INTERVAL = 0.25  # Seconds between store polls while a run is idle
+EVENT_BATCH_SIZE = 100  # Events read from the store per poll
+SSE_HEARTBEAT_SECONDS = 15.0  # Comment line sent on idle streams to keep proxies from closing them
+
+router = APIRouter()
+
+
+@router.post("/runs", status_code=202)
+async def create_run(request: RunRequest) -> FastJSONResponse:
+    """
+    Enqueue a full analysis run and return immediately.
+    
+    A background worker plans the question, executes the plan and writes
+    the report; poll ``GET /runs/{run_id}`` for progress.
+    
+    Args:
+        request: Dataset ID, research question and cache flag
+        
+    Returns:
+        JSON response with the run ID and its initial status
+        
+    Raises:
+        HTTPException: If the dataset does not exist
+    """
+    try:
+        await get_io_pool().run(load_profile, request.dataset_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    record = await get_io_pool().run(
+        get_run_queue().submit, request.dataset_id, request.prompt, request.use_cache
+    )
+    return FastJSONResponse(status_code=202, content={"run_id": record.run_id, "status": record.status})
+
+
+@router.get("/runs/{run_id}")
+async def get_run(run_id: str) -> FastJSONResponse:
+    """
+    Return the status, plan, per-step results and report path of a run.
+    
+    Args:
+        run_id: Identifier returned by ``POST /runs``
+        
+    Returns:
+        JSON response with the full run record
+        
+    Raises:
+        HTTPException: If the run does not exist
+    """
+    record = await get_io_pool().run(get_run_queue().store.get, run_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    return FastJSONResponse(content=record.model_dump())
+
+
+@router.get("/runs")
+async def list_runs(
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of runs to return"),
+    status: Optional[RunStatus] = Query(None, description="Only return runs in this state"),
+) -> FastJSONResponse:
+    """
+    List recent runs, newest first.
+    
+    Args:
+        limit: Maximum number of runs
+        status: Optional status filter
+        
+    Returns:
+        JSON response with run summaries
+    """
+    records = await get_io_pool().run(get_run_queue().store.list, limit, status)
+    return FastJSONResponse(content={
+        "runs": [
+            r.model_dump(include={"run_id", "dataset_id", "question", "status", "created_at", "finished_at"})
+            for r in records
+        ]
+    })
+
+
+@router.get("/runs/{run_id}/report.html")
+async def export_run_report(
+    run_id: str,
+    mode: Literal["inline", "bundle"] = Query(
+        "inline", description="inline: one HTML file with embedded images; bundle: zip of HTML and images"
+    ),
+) -> FileResponse:
+    """
+    Export a run's report as self-contained HTML.
+
+    Works while the run is still executing (the partial report is exported).
+    
+    Args:
+        run_id: Identifier returned by ``POST /runs``
+        mode: "inline" or "bundle"
+        
+    Returns:
+        The HTML file, or a zip archive in bundle mode
+        
+    Raises:
+        HTTPException: If the run or its report does not exist, or HTML
+            export is unavailable
+    """
+    record = await get_io_pool().run(get_run_queue().store.get, run_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    if not record.report_path or not Path(record.report_path).is_file():
+        raise HTTPException(status_code=404, detail=f"Run {run_id} has no report yet")
+
+    report = Path(record.report_path)
+    output = report.with_suffix(".export.html" if mode == "inline" else ".export.zip")
+    try:
+        await get_io_pool().run(export_html, report, output, mode)
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"HTML export unavailable: {e}")
+    if mode == "inline":
+        return FileResponse(output, media_type="text/html")
+    return FileResponse(output, media_type="application/zip", filename=f"{run_id}_report.zip")
+
+
+@router.get("/runs/{run_id}/events")
+async def stream_run_events(
+    run_id: str,
+    request: Request,
+    last_event_id: Optional[int] = Query(None, description="Resume after this event ID"),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """
+    Stream a run's progress as Server-Sent Events.
+    
+    Events ("queued", "started", "plan", "step_started", "step_finished",
+    "report", "done") are read from the run store, so a client that
+    reconnects with ``Last-Event-ID`` (or ``?last_event_id=``) resumes
+    exactly where it left off. Events are pulled from the store only as
+    fast as the client consumes them, so slow consumers never make the
+    server buffer. The stream ends after the "done" event.
+    
+    Args:
+        run_id: Identifier returned by ``POST /runs``
+        request: Incoming request (used to detect disconnects)
+        last_event_id: Last event the client has seen (query form)
+        last_event_id_header: Last event the client has seen (SSE reconnect header)
+        
+    Returns:
+        ``text/event-stream`` response
+        
+    Raises:
+        HTTPException: If the run does not exist
+    """
+    store = get_run_queue().store
+    if await get_io_pool().run(store.get, run_id) is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    after = last_event_id_header if last_event_id_header is not None else (last_event_id or 0)
+
+    async def stream() -> AsyncIterator[str]:
+        seq = after
+        idle_since = time.monotonic()
+        while not await request.is_disconnected():
+            events = await get_io_pool().run(store.events_after, run_id, seq, EVENT_BATCH_SIZE)
+            for event in events:
+                seq = event.seq
+                yield _format_sse(event)
+                if event.type == TERMINAL_EVENT:
+                    return
+            if events:
+                idle_since = time.monotonic()
+                continue
+            if time.monotonic() - idle_since >= SSE_HEARTBEAT_SECONDS:
+                idle_since = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(EVENT_POLL_INTERVAL)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _format_sse(event: RunEvent) -> str:
+    """Render one run event as an SSE message."""
+    data = json.dumps({"ts": event.ts, **event.data}, default=str)
+    return f"id: {event.seq}\nevent: {event.type}\ndata: {data}\n\n"
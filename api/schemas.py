@@ -1,2 +1,37 @@
 # api/schemas.py
-# Defines Pydantic models for request and response schemas used in the API.
\ No newline at end of file
+# Defines Pydantic models for request and response schemas used in the API.
+
+import os
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+# Constants
+BATCH_MAX_PROMPTS = int(os.getenv("AUTOSTAT_BATCH_MAX_PROMPTS", "1000"))  # Prompts accepted per batch request
+
+
+class BatchAnalyzeRequest(BaseModel):
+    """Many research questions to plan against one uploaded dataset."""
+    dataset_id: str = Field(..., description="Unique identifier for the uploaded dataset")
+    prompts: List[str] = Field(
+        ..., min_length=1, max_length=BATCH_MAX_PROMPTS, description="Research questions to plan"
+    )
+    concurrency: Optional[int] = Field(
+        None, ge=1, description="Maximum planner calls in flight (server default if omitted)"
+    )
+    use_cache: bool = Field(True, description="Serve plans from the plan cache when available")
+
+
+class BatchPlanResult(BaseModel):
+    """One streamed line of a batch response, emitted when its plan finishes."""
+    index: int = Field(..., description="Position of the prompt in the request")
+    prompt: str = Field(..., description="The research question")
+    plan: Optional[List[Dict[str, Any]]] = Field(None, description="Generated plan steps")
+    error: Optional[str] = Field(None, description="Error message if planning failed")
+    elapsed_seconds: float = Field(..., description="Wall time spent planning this prompt")
+
+
+class RunRequest(BaseModel):
+    """A full plan -> execute -> summarize run to enqueue."""
+    dataset_id: str = Field(..., description="Unique identifier for the uploaded dataset")
+    prompt: str = Field(..., min_length=1, description="Research question or analysis request")
+    use_cache: bool = Field(True, description="Serve the plan from the plan cache when available")
@@ -0,0 +1,276 @@
+# api/serialization.py
+# Fast JSON responses for numpy/pandas payloads and negotiated response compression.
+
+import gzip
+import json
+import math
+import os
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+from api.pools import get_io_pool
+from core.metrics import metrics
+
+# Constants
+COMPRESSION_MIN_SIZE = int(os.getenv("AUTOSTAT_COMPRESS_MIN_BYTES", "1024"))  # Smaller bodies go out as-is
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Brotli's higher qualities cost far more CPU for little gain on JSON
+ZSTD_LEVEL = 3
+OFFLOAD_SIZE = 256 * 1024  # Larger bodies are compressed in the I/O pool, off the event loop
+# Compressing these again only costs CPU
+_SKIP_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "text/event-stream")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize a payload to JSON bytes.
+
+    numpy arrays and scalars, pandas timestamps and missing values are
+    handled natively, and NaN/inf become null (stored profiles hold NaN for
+    all-missing columns). Uses orjson when it is installed, otherwise the
+    standard library.
+
+    Args:
+        content: JSON-like payload
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        _finite(content), default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with ``dumps``, so handlers need not pre-cast numpy/pandas values."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def compact_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a profile to what a client needs to list columns.
+
+    Per-column statistics and top values are dropped; they can be fetched on
+    demand from ``/datasets/{id}/profile``.
+
+    Args:
+        profile: Full dataset profile
+
+    Returns:
+        Profile with only dtype, missing and unique counts per column
+    """
+    keep = ("dtype", "num_missing", "num_unique")
+    return {
+        **{k: v for k, v in profile.items() if k != "columns"},
+        "columns": {
+            name: {k: meta[k] for k in keep if k in meta}
+            for name, meta in profile.get("columns", {}).items()
+        },
+    }
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing complete responses with zstd, brotli or gzip.
+
+    The encoding is negotiated from Accept-Encoding among the codecs that
+    are installed (zstd and brotli are optional). Responses below
+    ``minimum_size``, already encoded or of incompressible types are sent
+    as-is. Streaming responses (NDJSON batches, SSE, Arrow streams) are
+    detected by their first body chunk announcing more chunks and pass
+    through untouched, so their messages are never held back in a buffer.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = COMPRESSION_MIN_SIZE):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The ASGI application to wrap
+            minimum_size: Smallest body, in bytes, worth compressing
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(_header(scope, b"accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Dict[str, Any]] = None
+        passthrough = False
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message  # Held until the first body chunk decides
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if start is None:
+                await send(message)
+                return
+            if message.get("more_body", False) or not self._compressible(start, body):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            encoder = ENCODERS[encoding]
+            # zlib, brotli and zstd release the GIL, so a thread really offloads the work
+            compressed = await get_io_pool().run(encoder, body) if len(body) > OFFLOAD_SIZE else encoder(body)
+            metrics.observe("http.compression.ratio", len(compressed) / max(len(body), 1))
+            metrics.incr(f"http.compression.{encoding}")
+            headers = [(k, v) for k, v in start["headers"] if k.lower() not in (b"content-length", b"etag")]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            etag = _response_header(start, b"etag")
+            if etag:
+                # The compressed body differs byte-wise, so its validator is weak
+                headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compressible(self, start: Dict[str, Any], body: bytes) -> bool:
+        """Whether a complete response body should be compressed."""
+        if len(body) < self.minimum_size or _response_header(start, b"content-encoding"):
+            return False
+        content_type = (_response_header(start, b"content-type") or b"").decode("latin-1")
+        return not content_type.startswith(_SKIP_CONTENT_TYPES)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the best installed codec the client accepts.
+
+    Args:
+        accept_encoding: The Accept-Encoding header value
+
+    Returns:
+        "zstd", "br", "gzip" or None
+    """
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    best: Tuple[float, int, Optional[str]] = (0.0, 0, None)
+    # Later entries in ENCODERS win ties: they compress better
+    for rank, name in enumerate(ENCODERS):
+        quality = accepted.get(name, wildcard)
+        if quality > 0 and (quality, rank) > best[:2]:
+            best = (quality, rank, name)
+    return best[2]
+
+
+def _build_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Codecs available in this environment, worst to best compression."""
+    encoders: Dict[str, Callable[[bytes], bytes]] = {
+        "gzip": lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0),
+    }
+    try:
+        import brotli
+
+        encoders["br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+
+        # Compressor objects are not thread-safe, and creating one is cheap
+        encoders["zstd"] = lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    except ImportError:
+        pass
+    return encoders
+
+
+ENCODERS = _build_encoders()
+
+
+@lru_cache(maxsize=None)
+def _orjson() -> Any:
+    """Import orjson on first use; None when it is not installed."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def _default(value: Any) -> Any:
+    """Encode types neither encoder handles natively."""
+    if isinstance(value, np.ndarray):
+        return _finite(value.tolist())
+    if isinstance(value, np.generic):
+        return _finite(value.item())
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return None if pd.isna(value) else value.isoformat()
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Series, pd.Index)):
+        return _finite(value.tolist())
+    if isinstance(value, pd.DataFrame):
+        return _finite(value.to_dict(orient="records"))
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _finite(value: Any) -> Any:
+    """Replace NaN/inf floats with None, recursively (stdlib encoder only)."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    return value
+
+
+def _header(scope: Dict[str, Any], name: bytes) -> Optional[str]:
+    """Read a request header from an ASGI scope."""
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _response_header(start: Dict[str, Any], name: bytes) -> Optional[bytes]:
+    """Read a header from an http.response.start message."""
+    for key, value in start.get("headers", []):
+        if key.lower() == name:
+            return value
+    return None
@@ -0,0 +1,31 @@
+# benchmarks/adversarial.py
+# Adversarial model outputs for exercising the JSON plan extractor; shared by tests and benchmarks.
+
+import json
+from typing import Dict
+
+SAMPLE_PLAN = [
+    {"description": "Brackets ] [ and \"quotes\" in text", "tool": "eda_overview", "args": {}},
+    {"description": "Summarise age", "tool": "summary_stats", "args": {"columns": ["age"], "by": "gender"}},
+]
+
+
+def adversarial_inputs(size: int) -> Dict[str, str]:
+    """
+    Build inputs that are pathological for backtracking regexes or naive scanners.
+
+    Args:
+        size: Approximate length of each input in characters
+
+    Returns:
+        Mapping of input name to text
+    """
+    half = size // 2
+    return {
+        "open_brackets": "[" * size,
+        "unclosed_objects": "[{" * half,
+        "regex_backtrack": "[{" + "}" * (size - 2),
+        "escaped_string": '[{"d": "' + "\\\"" * half,
+        "bracket_prose": "see [note] and [1] " * (size // 19),
+        "chatty_then_plan": ("blah { } [ ] " * (size // 13)) + json.dumps(SAMPLE_PLAN),
+    }
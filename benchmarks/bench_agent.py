@@ -0,0 +1,91 @@
+# benchmarks/bench_agent.py
+# End-to-end latency of plan -> execute -> summarize: sequential stages vs. the pipelined agent.
+#
+# Usage: python -m benchmarks.bench_agent [seconds_per_planned_step]
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from core.agent import Agent
+from core.state import PromptState
+from datasets.profile import profile_dataset
+from executor.runner import run_plan
+from planner.schemas import PlanStep
+from summarizer.writer import SectionCache, write_report
+
+DEFAULT_STEP_SECONDS = 0.3  # Simulated generation time of one plan step
+ROWS = 300_000
+COLUMNS = 8
+
+
+def _state():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({f"x{i}": rng.normal(size=ROWS) for i in range(COLUMNS)})
+    df["group"] = rng.choice(["a", "b"], size=ROWS)
+    return PromptState(question="Describe every column by group", profile=profile_dataset(df), dataframe=df)
+
+
+def _plan():
+    steps = []
+    for i in range(COLUMNS):
+        steps.append(PlanStep(step_id=uuid.uuid4().hex, description=f"Histogram of x{i}", tool="histogram",
+                              args={"columns": [f"x{i}"]}))
+        steps.append(PlanStep(step_id=uuid.uuid4().hex, description=f"Compare x{i} by group", tool="t_test",
+                              args={"group_column": "group", "value_column": f"x{i}"}))
+    return steps
+
+
+def _streamed(steps, step_seconds):
+    """A plan source emitting one step per simulated generation interval."""
+
+    def source(state, use_cache):
+        for step in steps:
+            time.sleep(step_seconds)
+            yield [step]
+
+    return source
+
+
+def sequential(state, steps, step_seconds, path):
+    timings = {}
+    start = time.perf_counter()
+    planned = [s for batch in _streamed(steps, step_seconds)(state, True) for s in batch]
+    timings["plan"] = time.perf_counter() - start
+    mark = time.perf_counter()
+    results, _ = run_plan(planned, state)
+    timings["execute"] = time.perf_counter() - mark
+    mark = time.perf_counter()
+    write_report(planned, results, path, cache=SectionCache())
+    timings["summarize"] = time.perf_counter() - mark
+    return time.perf_counter() - start, timings
+
+
+def main():
+    step_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_STEP_SECONDS
+    state = _state()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        steps = _plan()
+        run_plan(steps[:2], state)  # Warm up imports and matplotlib
+
+        wall, timings = sequential(state, _plan(), step_seconds, "sequential.md")
+        print(f"{len(steps)} steps, {step_seconds:.2f}s per planned step, {ROWS:,} rows")
+        print(f"{'variant':12s} {'wall':>8s}  stages (busy seconds)")
+        print(f"{'sequential':12s} {wall:7.2f}s  " + "  ".join(f"{k}={v:.2f}" for k, v in timings.items()))
+
+        result = Agent(_streamed(_plan(), step_seconds)).run(state, "pipelined.md")
+        stages = "  ".join(f"{k}={v:.2f}" for k, v in result.stage_seconds.items())
+        print(f"{'pipelined':12s} {result.wall_seconds:7.2f}s  {stages}")
+        print(f"first result after {result.first_result_seconds:.2f}s; "
+              f"slowest stage {max(result.stage_seconds.values()):.2f}s, "
+              f"sum of stages {sum(result.stage_seconds.values()):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
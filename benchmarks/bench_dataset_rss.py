@@ -0,0 +1,81 @@
+# benchmarks/bench_dataset_rss.py
+# Compares worker memory when each process parses the CSV vs. memory-maps the Arrow copy.
+#
+# Usage: python -m benchmarks.bench_dataset_rss [workers] [rows]
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from datasets import storage
+
+DEFAULT_WORKERS = 4
+DEFAULT_ROWS = 1_000_000
+NUM_COLUMNS = 8
+DATASET_ID = "bench"
+
+
+def _memory_kb():
+    """Rss, Pss and private memory of this process, in KB (Linux only)."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields.get("Rss", 0), fields.get("Pss", 0), private
+
+
+def _worker(base_dir, arrow_cache, barrier, results):
+    """Load the dataset, wait until every worker holds it, then measure."""
+    storage.BASE_DIR = base_dir
+    storage.ARROW_CACHE = arrow_cache
+    start = time.perf_counter()
+    df, _ = storage.load_dataset(DATASET_ID)
+    float(df.sum(numeric_only=True).sum())  # Touch every page, as a tool would
+    load_s = time.perf_counter() - start
+    barrier.wait()
+    results.put((load_s,) + _memory_kb())
+    barrier.wait()  # Keep every frame alive until all workers have measured
+
+
+def _run(base_dir, arrow_cache, workers):
+    ctx = multiprocessing.get_context("spawn")
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(base_dir, arrow_cache, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return rows
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_WORKERS
+    num_rows = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ROWS
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(num_rows, NUM_COLUMNS)), columns=[f"x{i}" for i in range(NUM_COLUMNS)])
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        df.to_csv(os.path.join(base_dir, f"{DATASET_ID}{storage.CSV_EXTENSION}"), index=False)
+        storage.save_dataset(DATASET_ID, df, {"num_rows": num_rows}, base_dir=base_dir)
+        print(f"{workers} workers, {num_rows:,} rows x {NUM_COLUMNS} columns "
+              f"({df.memory_usage().sum() / 2**20:.0f} MB in memory)")
+        print(f"{'mode':<8} {'load s':>8} {'RSS MB':>9} {'PSS MB':>9} {'private MB':>11} {'total PSS MB':>13}")
+        for mode, arrow_cache in (("csv", False), ("arrow", True)):
+            rows = _run(base_dir, arrow_cache, workers)
+            load_s = max(r[0] for r in rows)
+            rss, pss, private = (sum(r[i] for r in rows) / len(rows) / 1024 for i in (1, 2, 3))
+            total_pss = sum(r[2] for r in rows) / 1024
+            print(f"{mode:<8} {load_s:8.2f} {rss:9.1f} {pss:9.1f} {private:11.1f} {total_pss:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
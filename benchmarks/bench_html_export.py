@@ -0,0 +1,82 @@
+# benchmarks/bench_html_export.py
+# HTML export time and report size: path-linked PNGs vs. inline and bundled optimized images.
+#
+# Usage: python -m benchmarks.bench_html_export [plots]
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from summarizer.html_export import ConversionCache, export_html
+from summarizer.render import render_html_from_markdown
+
+DEFAULT_PLOTS = 24
+DUPLICATE_EVERY = 4  # Every 4th plot repeats an earlier artifact byte for byte
+
+
+def _report(n, root):
+    """Write n histogram plots (some duplicated) and a report referencing them."""
+    rng = np.random.default_rng(0)
+    artifacts = root / "artifacts"
+    artifacts.mkdir()
+    lines = ["# AutoStat-Agent Report\n"]
+    for i in range(n):
+        path = artifacts / f"hist_{i}.png"
+        if i and i % DUPLICATE_EVERY == 0:
+            shutil.copy(artifacts / f"hist_{i - 1}.png", path)
+        else:
+            fig, ax = plt.subplots(figsize=(12, 8))
+            ax.hist(rng.normal(size=5000), bins=80)
+            fig.savefig(path, dpi=150)
+            plt.close(fig)
+        lines.append(f"## Histogram {i}\n\n![Histogram {i}](artifacts/hist_{i}.png)\n")
+    md = root / "report.md"
+    md.write_text("\n".join(lines))
+    return md
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PLOTS
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        md = _report(n, root)
+        png_bytes = sum(p.stat().st_size for p in (root / "artifacts").glob("*.png"))
+        workers = min(4, os.cpu_count() or 1)
+
+        print(f"{n} plots, {png_bytes / 1e6:.1f} MB of PNG, {workers} workers")
+        print(f"{'variant':34s} {'time':>10s} {'size':>10s}")
+
+        ms = _timed(lambda: render_html_from_markdown(md, root / "linked.html"))
+        size = (root / "linked.html").stat().st_size + png_bytes
+        print(f"{'linked PNGs (html + files)':34s} {ms:8.0f}ms {size / 1e6:8.2f}MB")
+
+        for fmt in ("png", "webp"):
+            for w in sorted({1, workers}):
+                cache = ConversionCache(root / f"cache_{fmt}_{w}", image_format=fmt)
+                out = root / f"inline_{fmt}_{w}.html"
+                ms = _timed(lambda: export_html(md, out, cache=cache, workers=w))
+                print(f"{f'inline {fmt}, cold cache, {w} worker(s)':34s} {ms:8.0f}ms {out.stat().st_size / 1e6:8.2f}MB")
+            ms = _timed(lambda: export_html(md, out, cache=cache, workers=workers))
+            print(f"{f'inline {fmt}, warm cache':34s} {ms:8.0f}ms {out.stat().st_size / 1e6:8.2f}MB")
+            out = root / f"bundle_{fmt}.zip"
+            ms = _timed(lambda: export_html(md, out, mode="bundle", cache=cache, workers=workers))
+            print(f"{f'bundle {fmt}, warm cache':34s} {ms:8.0f}ms {out.stat().st_size / 1e6:8.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
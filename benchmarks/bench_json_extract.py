@@ -0,0 +1,39 @@
+# benchmarks/bench_json_extract.py
+# Compares the legacy regex extractor with JsonArrayScanner on adversarial model outputs.
+#
+# Usage: python -m benchmarks.bench_json_extract
+
+import re
+import time
+
+from benchmarks.adversarial import adversarial_inputs
+from planner.parsing import _extract_json_array
+
+SIZES = [64 * 1024, 256 * 1024, 1024 * 1024]
+LEGACY_MAX_SIZE = 64 * 1024  # The regex is quadratic on some inputs; keep its runs short
+
+
+def legacy_extract(text):
+    """The original DOTALL regex extractor."""
+    match = re.search(r"\[\s*{.*?}\s*\]", text, re.DOTALL)
+    return match.group(0).strip() if match else None
+
+
+def _time(fn, text):
+    start = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'input':<18} {'size':>8} {'scanner s':>10} {'MB/s':>8} {'legacy s':>10}")
+    for size in SIZES:
+        for name, text in adversarial_inputs(size).items():
+            scanner_s = _time(_extract_json_array, text)
+            legacy = f"{_time(legacy_extract, text):10.3f}" if size <= LEGACY_MAX_SIZE else f"{'skipped':>10}"
+            mb_s = len(text) / (1024 * 1024) / max(scanner_s, 1e-9)
+            print(f"{name:<18} {len(text) // 1024:>6}KB {scanner_s:10.4f} {mb_s:8.1f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
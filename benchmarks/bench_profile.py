@@ -0,0 +1,79 @@
+# benchmarks/bench_profile.py
+# Time and peak memory of profiling a large CSV: full pandas load vs. streamed, chunked profiling.
+#
+# Usage: python -m benchmarks.bench_profile [rows] [workers]
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROWS = 2_000_000
+WRITE_ROWS = 500_000  # Rows generated at a time while writing the file
+
+
+def _write_csv(path, rows):
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, WRITE_ROWS):
+        n = min(WRITE_ROWS, rows - start)
+        pd.DataFrame({
+            "id": np.arange(start, start + n),
+            "price": rng.lognormal(10, 1, n).round(2),
+            "mileage": rng.integers(0, 300_000, n),
+            "score": rng.normal(size=n),
+            "fuel": rng.choice(["diesel", "petrol", "electric", "hybrid"], n),
+            "model": rng.choice([f"model_{i}" for i in range(5000)], n),
+        }).to_csv(path, mode="a" if start else "w", header=not start, index=False)
+
+
+def _measure(variant, path, workers):
+    """Run one variant in this (fresh) process and print its time and peak RSS."""
+    start = time.perf_counter()
+    if variant == "full":
+        from datasets.profile import profile_dataset
+
+        profile_dataset(pd.read_csv(path))
+    else:
+        from cli.profile import profile_file
+
+        profile_file(path, workers=workers, progress=None)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": time.perf_counter() - start, "peak_mb": peak_mb}))
+
+
+def _run(*args):
+    # Each step runs in a fresh process: a child inherits its parent's peak RSS
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_profile", *map(str, args)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout) if out.stdout else None
+
+
+def main():
+    if sys.argv[1:2] == ["--write"]:
+        _write_csv(sys.argv[2], int(sys.argv[3]))
+        return
+    if sys.argv[1:2] == ["--measure"]:
+        _measure(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.csv")
+        _run("--write", path, rows)
+        print(f"{rows:,} rows, {os.path.getsize(path) / 2**20:,.0f} MB CSV")
+        print(f"{'variant':24s} {'seconds':>8s} {'peak MB':>8s}")
+        for label, variant, n in [("full load", "full", 0), ("streamed, inline", "stream", 0),
+                                  (f"streamed, {workers} workers", "stream", workers)]:
+            result = _run("--measure", variant, path, n)
+            # With workers the peak is the coordinating process; each worker holds one batch at a time
+            print(f"{label:24s} {result['seconds']:8.2f} {result['peak_mb']:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
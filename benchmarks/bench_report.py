@@ -0,0 +1,91 @@
+# benchmarks/bench_report.py
+# Report generation time and peak memory for a 500-step plan: in-memory build vs. streaming writer.
+#
+# Usage: python -m benchmarks.bench_report [steps]
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from executor.schemas import ExecutionResult
+from planner.schemas import PlanStep
+from summarizer.narrative import _format_table, create_summary_overview
+from summarizer.writer import SectionCache, write_report
+
+DEFAULT_STEPS = 500
+PREVIEW_ROWS = 50
+
+
+def legacy_report(steps, results, path):
+    """The previous approach: += per section, JSON re-read every time, one joined string."""
+    sections = {"overview": create_summary_overview(steps, results)}
+    for step, result in zip(steps, results):
+        summary = f"## {step.tool}\n\n**Description:** {step.description}\n\n"
+        if result.output_preview:
+            summary += "**Results:**\n\n" + _format_table(result.output_preview) + "\n"
+        if result.artifact_path and result.artifact_path.endswith(".json"):
+            with open(result.artifact_path) as f:
+                summary += f"```json\n{json.dumps(json.load(f), indent=2)}\n```\n\n"
+        sections[step.step_id] = summary
+    Path(path).write_text("# AutoStat-Agent Report\n\n" + "\n".join(sections.values()))
+
+
+def _plan(n, artifact_dir):
+    steps, results = [], []
+    for i in range(n):
+        if i % 2:
+            artifact = os.path.join(artifact_dir, f"ttest_{i}.json")
+            with open(artifact, "w") as f:
+                json.dump({"t_stat": i * 0.1, "p_value": 0.05, "samples": list(range(200))}, f)
+            steps.append(PlanStep(step_id=f"s{i}", description=f"Test {i}", tool="t_test", args={}))
+            results.append(ExecutionResult(step_id=f"s{i}", status="success", artifact_path=artifact))
+        else:
+            preview = [{"group": g, "mean": g * 1.5, "std": 0.5, "count": 100} for g in range(PREVIEW_ROWS)]
+            steps.append(PlanStep(step_id=f"s{i}", description=f"Summary {i}", tool="summary_stats", args={}))
+            results.append(ExecutionResult(step_id=f"s{i}", status="success", output_preview=preview))
+    return steps, results
+
+
+def _ms(fn):
+    """Wall-clock milliseconds of one call."""
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _peak_mb(fn):
+    """Peak traced Python memory (MB) of one call."""
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_STEPS
+    with tempfile.TemporaryDirectory() as tmp:
+        steps, results = _plan(n, tmp)
+        report = os.path.join(tmp, "report.md")
+        cache = SectionCache()
+        changed = list(results)
+        changed[0] = changed[0].model_copy(update={"output_preview": changed[0].output_preview[:10]})
+
+        print(f"{n} steps{'':<21} {'ms':>8}")
+        print(f"{'legacy (in memory)':<28} {_ms(lambda: legacy_report(steps, results, report)):8.1f}")
+        print(f"{'streaming, cold cache':<28} {_ms(lambda: write_report(steps, results, report, cache=cache)):8.1f}")
+        print(f"{'streaming, warm cache':<28} {_ms(lambda: write_report(steps, results, report, cache=cache)):8.1f}")
+        print(f"{'streaming, 1 step changed':<28} {_ms(lambda: write_report(steps, changed, report, cache=cache)):8.1f}")
+
+        legacy_mb = _peak_mb(lambda: legacy_report(steps, results, report))
+        streaming_mb = _peak_mb(lambda: write_report(steps, results, report, cache=SectionCache()))
+        print(f"peak memory: legacy {legacy_mb:.2f} MB, streaming (cold) {streaming_mb:.2f} MB; "
+              f"report {os.path.getsize(report) / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
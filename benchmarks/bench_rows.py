@@ -0,0 +1,67 @@
+# benchmarks/bench_rows.py
+# Page latency of datasets.rows.read_rows against loading the whole dataset.
+#
+# Usage: python -m benchmarks.bench_rows [rows]
+
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from datasets import rows, storage
+from datasets.profile import profile_dataset
+
+DEFAULT_ROWS = 10_000_000
+PAGE_SIZE = 100
+PAGES = 20
+DATASET_ID = "bench"
+
+
+def _page_ms(fn, offsets):
+    """Median milliseconds per page over the given offsets."""
+    times = []
+    for offset in offsets:
+        start = time.perf_counter()
+        fn(offset)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "id": np.arange(num_rows),
+        "group": rng.choice(["a", "b", "c", "d"], num_rows),
+        "x": rng.normal(size=num_rows),
+        "y": rng.normal(size=num_rows),
+    })
+    offsets = rng.integers(0, num_rows - PAGE_SIZE, PAGES)
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        storage.BASE_DIR = base_dir
+        start = time.perf_counter()
+        storage.save_dataset(DATASET_ID, df, profile_dataset(df))
+        print(f"{num_rows:,} rows stored in {time.perf_counter() - start:.1f}s; median ms per {PAGE_SIZE}-row page:")
+
+        start = time.perf_counter()
+        pd.read_csv(f"{base_dir}/{DATASET_ID}.csv").iloc[:PAGE_SIZE]
+        print(f"{'full CSV load (before)':<32} {(time.perf_counter() - start) * 1000:10.1f}")
+
+        filters = rows.parse_filters(["group==b", "x>1"], storage.load_profile(DATASET_ID))
+        cases = {
+            "arrow slice": lambda o: rows.read_rows(DATASET_ID, int(o), PAGE_SIZE),
+            "arrow slice, 2 columns": lambda o: rows.read_rows(DATASET_ID, int(o), PAGE_SIZE, ["id", "x"]),
+            "filtered (duckdb on arrow)": lambda o: rows.read_rows(DATASET_ID, int(o) // 100, PAGE_SIZE, None, filters),
+        }
+        for name, fn in cases.items():
+            print(f"{name:<32} {_page_ms(fn, offsets):10.2f}")
+
+        storage.ARROW_CACHE = False
+        print(f"{'filtered (duckdb on CSV)':<32} {_page_ms(cases['filtered (duckdb on arrow)'], offsets[:3]):10.2f}")
+
+
+if __name__ == "__main__":
+    main()
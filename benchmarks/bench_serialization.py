@@ -0,0 +1,55 @@
+# benchmarks/bench_serialization.py
+# Serialization time and bytes on the wire for a wide dataset profile.
+#
+# Usage: python -m benchmarks.bench_serialization [columns]
+
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from api.serialization import ENCODERS, _finite, compact_profile, dumps
+from datasets.profile import profile_dataset
+
+DEFAULT_COLUMNS = 2000
+ROWS = 2000
+REPEATS = 10
+
+
+def _best_ms(fn):
+    """Best of REPEATS wall-clock times, in milliseconds."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    num_columns = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COLUMNS
+    rng = np.random.default_rng(0)
+    data = {f"num_{i}": rng.normal(size=ROWS) for i in range(num_columns // 2)}
+    data.update({f"cat_{i}": rng.choice(["alpha", "beta", "gamma", "delta", "epsilon", "zeta"], ROWS)
+                 for i in range(num_columns - num_columns // 2)})
+    profile = profile_dataset(pd.DataFrame(data))
+    payload = {"dataset_id": "bench", "profile": profile}
+
+    stdlib = lambda: json.dumps(_finite(payload), allow_nan=False).encode()  # noqa: E731
+    print(f"profile of {num_columns} columns")
+    print(f"{'encoder':<22} {'ms':>8}")
+    print(f"{'stdlib json':<22} {_best_ms(stdlib):8.2f}")
+    print(f"{'api.serialization':<22} {_best_ms(lambda: dumps(payload)):8.2f}")
+
+    print(f"\n{'body':<10} {'encoding':<10} {'KB':>9} {'ms':>8}")
+    for name, body in (("full", dumps(payload)), ("compact", dumps(compact_profile(profile)))):
+        print(f"{name:<10} {'identity':<10} {len(body) / 1024:9.1f} {0:8.2f}")
+        for encoding, encoder in ENCODERS.items():
+            size = len(encoder(body))
+            print(f"{name:<10} {encoding:<10} {size / 1024:9.1f} {_best_ms(lambda: encoder(body)):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,341 @@
 # cli/profile.py
-# CLI to upload and profile a dataset.
\ No newline at end of file
+# CLI to profile CSV/Parquet files of any size, streaming record batches across worker processes.
+#
+# Usage: python -m cli.profile data.csv [--workers N] [--output profile.json] [--register [DATASET_ID]]
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from cli.utils import format_clock
+from datasets.profile import PartialProfile
+from datasets.storage import PARQUET_EXTENSIONS
+
+# Constants
+DEFAULT_WORKERS = int(os.getenv("AUTOSTAT_PROFILE_WORKERS", str(os.cpu_count() or 1)))
+# Bytes of file per worker task (CSV byte range or group of Parquet row groups); 0 keeps the file whole
+CHUNK_BYTES = int(os.getenv("AUTOSTAT_PROFILE_CHUNK_MB", "64")) * 2**20
+BATCH_ROWS = 100_000  # Rows parsed at a time; bounds each worker's memory
+PROGRESS_INTERVAL = 2.0  # Minimum seconds between progress lines
+
+
+class FileChunk:
+    """A part of a file that one worker profiles: a CSV byte range or a set of Parquet row groups."""
+
+    def __init__(
+        self,
+        path: str,
+        columns: List[str],
+        size: int,
+        start: int = 0,
+        end: int = 0,
+        row_groups: Optional[List[int]] = None,
+    ):
+        """
+        Initialize the chunk.
+
+        Args:
+            path: File to read
+            columns: Column names, in file order
+            size: Bytes of file covered (for progress)
+            start: First byte of a CSV range (at the start of a record)
+            end: Byte after the CSV range (after a newline, or end of file)
+            row_groups: Parquet row groups to read (None for a CSV range)
+        """
+        self.path = path
+        self.columns = columns
+        self.size = size
+        self.start = start
+        self.end = end
+        self.row_groups = row_groups
+
+    def __repr__(self) -> str:
+        if self.row_groups is not None:
+            return f"{self.path}[row groups {self.row_groups[0]}-{self.row_groups[-1]}]"
+        return f"{self.path}[{self.start}:{self.end}]"
+
+
+def split_file(path: str, chunk_bytes: int = CHUNK_BYTES) -> Tuple[List[str], List[FileChunk]]:
+    """
+    Split a CSV or Parquet file into chunks that can be profiled independently.
+
+    CSV files are split into byte ranges ending at newlines, found by
+    seeking rather than parsing. This assumes no quoted field spans
+    lines; for such files pass chunk_bytes=0. Parquet files are split
+    along row groups.
+
+    Args:
+        path: CSV or Parquet file
+        chunk_bytes: Target bytes per chunk (0 for a single chunk)
+
+    Returns:
+        Tuple of (column names, chunks in file order)
+
+    Raises:
+        ImportError: If a Parquet file is given and pyarrow is not installed
+        ValueError: If a CSV file has no header line
+    """
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        return _split_parquet(path, chunk_bytes)
+    return _split_csv(path, chunk_bytes)
+
+
+def _split_csv(path: str, chunk_bytes: int) -> Tuple[List[str], List[FileChunk]]:
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        if not header.strip():
+            raise ValueError(f"{path}: missing CSV header")
+        columns = next(csv.reader([header.decode("utf-8-sig")]))
+        boundaries = [len(header)]
+        step = chunk_bytes if chunk_bytes > 0 else size
+        while boundaries[-1] + step < size:
+            # Seek one byte early: if it is a newline, the range ends exactly there
+            f.seek(boundaries[-1] + step - 1)
+            f.readline()
+            if f.tell() >= size:
+                break
+            boundaries.append(f.tell())
+    boundaries.append(size)
+    chunks = [FileChunk(path, columns, end - start, start=start, end=end)
+              for start, end in zip(boundaries, boundaries[1:])]
+    return columns, chunks or [FileChunk(path, columns, 0, start=size, end=size)]
+
+
+def _split_parquet(path: str, chunk_bytes: int) -> Tuple[List[str], List[FileChunk]]:
+    import pyarrow.parquet as pq
+
+    metadata = pq.ParquetFile(path).metadata
+    # Index columns written by pandas are not data columns
+    columns = [name for name in metadata.schema.to_arrow_schema().names if not name.startswith("__index_level_")]
+    chunks: List[FileChunk] = []
+    groups: List[int] = []
+    size = 0
+    for i in range(metadata.num_row_groups):
+        groups.append(i)
+        size += metadata.row_group(i).total_byte_size
+        if chunk_bytes > 0 and size >= chunk_bytes:
+            chunks.append(FileChunk(path, columns, size, row_groups=groups))
+            groups, size = [], 0
+    if groups or not chunks:
+        chunks.append(FileChunk(path, columns, size, row_groups=groups))
+    return columns, chunks
+
+
+def profile_chunk(chunk: FileChunk, batch_rows: int = BATCH_ROWS) -> PartialProfile:
+    """
+    Profile one chunk, batch by batch (in a worker process).
+
+    Args:
+        chunk: Chunk from split_file
+        batch_rows: Rows parsed at a time
+
+    Returns:
+        The chunk's mergeable profile
+    """
+    partial = PartialProfile(chunk.columns)
+    for batch in _read_batches(chunk, batch_rows):
+        partial.update(batch)
+    return partial
+
+
+def _read_batches(chunk: FileChunk, batch_rows: int) -> Iterator[pd.DataFrame]:
+    if chunk.row_groups is not None:
+        import pyarrow.parquet as pq
+
+        if not chunk.row_groups:
+            return
+        source = pq.ParquetFile(chunk.path)
+        for batch in source.iter_batches(batch_size=batch_rows, row_groups=chunk.row_groups, columns=chunk.columns):
+            yield batch.to_pandas()
+        return
+
+    if chunk.end <= chunk.start:
+        return
+    with io.BufferedReader(_ByteRange(chunk.path, chunk.start, chunk.end)) as f:
+        yield from pd.read_csv(f, header=None, names=chunk.columns, chunksize=batch_rows)
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of a byte range of a file."""
+
+    def __init__(self, path: str, start: int, end: int):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._file.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def profile_file(
+    path: str,
+    workers: int = DEFAULT_WORKERS,
+    chunk_bytes: int = CHUNK_BYTES,
+    batch_rows: int = BATCH_ROWS,
+    progress: Optional[IO[str]] = sys.stderr,
+) -> Dict[str, Any]:
+    """
+    Profile a CSV or Parquet file without loading it whole.
+
+    The file is split into chunks profiled in parallel worker processes,
+    each parsing batch_rows rows at a time, and the partial profiles are
+    merged as they arrive. Memory therefore depends on the batch size and
+    the number of columns, not on the file size. The result has the
+    format of ``profile_dataset`` (see PartialProfile for which figures
+    are estimated on very large files).
+
+    Args:
+        path: CSV or Parquet file
+        workers: Worker processes (0 profiles in this process)
+        chunk_bytes: Target bytes per worker task (0 for a single task)
+        batch_rows: Rows parsed at a time
+        progress: Stream receiving progress lines (None for silence)
+
+    Returns:
+        The file's profile
+    """
+    columns, chunks = split_file(path, chunk_bytes)
+    merged = PartialProfile(columns)
+    tracker = _Progress(sum(c.size for c in chunks), progress)
+
+    def record(partial: PartialProfile, chunk: FileChunk) -> None:
+        merged.merge(partial)
+        tracker.update(chunk.size)
+
+    if workers <= 0 or len(chunks) == 1:
+        for chunk in chunks:
+            record(profile_chunk(chunk, batch_rows), chunk)
+    else:
+        _profile_in_pool(chunks, batch_rows, min(workers, len(chunks)), record)
+
+    profile = merged.finalize()
+    tracker.finish(profile["num_rows"])
+    return profile
+
+
+def _profile_in_pool(chunks: List[FileChunk], batch_rows: int, workers: int, record: Any) -> None:
+    """Feed chunks to a process pool, keeping only a few queued per worker."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        queued = iter(chunks)
+        running: Dict[Future, FileChunk] = {}
+        for chunk in queued:
+            running[pool.submit(profile_chunk, chunk, batch_rows)] = chunk
+            if len(running) >= 2 * workers:
+                break
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                chunk = running.pop(future)
+                record(future.result(), chunk)
+            for chunk in queued:
+                running[pool.submit(profile_chunk, chunk, batch_rows)] = chunk
+                if len(running) >= 2 * workers:
+                    break
+
+
+class _Progress:
+    """Counts profiled bytes and prints throughput and ETA lines."""
+
+    def __init__(self, total: int, stream: Optional[IO[str]]):
+        self.total = total
+        self.stream = stream
+        self.done = 0
+        self._start = time.perf_counter()
+        self._last_print = 0.0
+
+    def update(self, size: int) -> None:
+        self.done += size
+        now = time.perf_counter()
+        if self.stream is None or now - self._last_print < PROGRESS_INTERVAL or self.done >= self.total:
+            return
+        self._last_print = now
+        rate = self.done / max(now - self._start, 1e-9)
+        eta = (self.total - self.done) / rate if rate else 0.0
+        self.stream.write(
+            f"{self.done / 2**20:,.1f}/{self.total / 2**20:,.1f} MB {100 * self.done / max(self.total, 1):5.1f}%"
+            f"  {rate / 2**20:6.1f} MB/s  ETA {format_clock(eta)}\n"
+        )
+        self.stream.flush()
+
+    def finish(self, num_rows: int) -> None:
+        if self.stream is not None:
+            elapsed = time.perf_counter() - self._start
+            self.stream.write(
+                f"Done: {num_rows:,} rows, {self.total / 2**20:,.1f} MB in {format_clock(elapsed)} "
+                f"({self.total / 2**20 / max(elapsed, 1e-9):.1f} MB/s)\n"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Profile a file from the command line.
+
+    The profile is printed as JSON, or written to --output. With
+    --register the file is also added to the dataset store under the
+    given (or a new) ID, using the profile just computed, and the ID is
+    printed.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv)
+
+    Returns:
+        Exit status
+    """
+    parser = argparse.ArgumentParser(description="Profile a CSV or Parquet file of any size.")
+    parser.add_argument("path", help="CSV or Parquet file")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker processes (0: profile inline)")
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_BYTES // 2**20,
+                        help="MB of file per worker task (0: one task; needed for CSVs with multi-line fields)")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS, help="rows parsed at a time")
+    parser.add_argument("--output", help="write the profile JSON here instead of printing it")
+    parser.add_argument("--register", nargs="?", const="", metavar="DATASET_ID",
+                        help="add the file to the dataset store (a new ID is generated if none is given)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.path):
+        parser.error(f"no such file: {args.path}")
+    try:
+        profile = profile_file(args.path, args.workers, args.chunk_mb * 2**20, max(args.batch_rows, 1))
+    except (ImportError, ValueError) as exc:
+        parser.error(str(exc))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(profile, f)
+    elif args.register is None:
+        json.dump(profile, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    if args.register is not None:
+        from datasets.storage import register_file
+
+        dataset_id = args.register or str(uuid.uuid4())
+        register_file(dataset_id, args.path, profile)
+        print(dataset_id)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
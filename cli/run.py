@@ -1,2 +1,386 @@
 # cli/run.py
-# CLI entry point to run the full agent loop on a YAML prompt file.
\ No newline at end of file
+# CLI entry point to run the full agent loop over a YAML or JSONL manifest of (dataset, prompt) jobs.
+#
+# Usage: python -m cli.run manifest.jsonl [--workers N] [--output-dir DIR] [--checkpoint PATH]
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from cli.utils import format_clock
+
+# Constants
+DEFAULT_WORKERS = int(os.getenv("AUTOSTAT_BATCH_WORKERS", str(min(os.cpu_count() or 1, 4))))
+DEFAULT_OUTPUT_DIR = os.path.join("reports", "batch")
+CHUNK_SIZE = 8  # Jobs per task sent to a worker; a crash loses at most one chunk of progress
+WORKER_DATASET_CACHE = 2  # Datasets each worker keeps loaded between chunks
+PROGRESS_INTERVAL = 2.0  # Minimum seconds between progress lines
+
+
+class ManifestJob(BaseModel):
+    """One (dataset, prompt) pair of a batch manifest."""
+
+    id: Optional[str] = Field(None, description="Stable job ID (derived from dataset and prompt if omitted)")
+    dataset_id: Optional[str] = Field(None, description="Stored dataset to analyse")
+    dataset_path: Optional[str] = Field(None, description="CSV file to analyse instead of a stored dataset")
+    prompt: str = Field(..., description="Research question")
+    use_cache: bool = Field(True, description="Whether the planner may serve the plan from cache")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _accept_question(cls, data: Any) -> Any:
+        """Accept "question" as an alias of "prompt"."""
+        if isinstance(data, dict) and "prompt" not in data and "question" in data:
+            data = {**data, "prompt": data["question"]}
+        return data
+
+    @model_validator(mode="after")
+    def _one_dataset(self) -> "ManifestJob":
+        if (self.dataset_id is None) == (self.dataset_path is None):
+            raise ValueError("exactly one of dataset_id or dataset_path is required")
+        return self
+
+    @property
+    def dataset_key(self) -> str:
+        """Identifies the dataset, for grouping jobs."""
+        return f"id:{self.dataset_id}" if self.dataset_id is not None else f"path:{os.path.abspath(self.dataset_path)}"
+
+
+def load_manifest(path: str) -> List[ManifestJob]:
+    """
+    Read a batch manifest.
+
+    JSONL manifests hold one job object per line. YAML manifests (needs
+    PyYAML) hold a list of jobs, or a mapping with a "jobs" list. Jobs
+    without an "id" get one derived from their dataset and prompt, so
+    the IDs stay stable when the manifest is re-read on resume.
+
+    Args:
+        path: Manifest file (.jsonl, .json, .yaml or .yml)
+
+    Returns:
+        Jobs in manifest order, each with a unique ID
+
+    Raises:
+        ValueError: If an entry is invalid or two jobs share an explicit ID
+        ImportError: If a YAML manifest is given and PyYAML is not installed
+    """
+    if path.endswith((".yaml", ".yml")):
+        import yaml
+
+        with open(path) as f:
+            data = yaml.safe_load(f) or []
+        entries = data.get("jobs", []) if isinstance(data, dict) else data
+        numbered = list(enumerate(entries, start=1))
+    else:
+        with open(path) as f:
+            numbered = [(n, json.loads(line)) for n, line in enumerate(f, start=1) if line.strip()]
+
+    jobs: List[ManifestJob] = []
+    seen: Dict[str, int] = {}
+    for number, entry in numbered:
+        try:
+            job = ManifestJob.model_validate(entry)
+        except ValidationError as exc:
+            raise ValueError(f"{path}: invalid job #{number}: {exc.errors()[0]['msg']}") from exc
+        if job.id is None:
+            base = hashlib.sha256(f"{job.dataset_key}\x1f{job.prompt}".encode()).hexdigest()[:12]
+            seen[base] = seen.get(base, 0) + 1
+            job.id = base if seen[base] == 1 else f"{base}-{seen[base]}"
+        elif job.id in seen:
+            raise ValueError(f"{path}: duplicate job id '{job.id}' (job #{number})")
+        else:
+            seen[job.id] = 1
+        jobs.append(job)
+    return jobs
+
+
+def load_checkpoint(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Read the outcomes recorded by earlier (possibly interrupted) batches.
+
+    A truncated last line, left by a crash mid-write, is ignored.
+
+    Args:
+        path: Checkpoint file (JSONL, one outcome per line)
+
+    Returns:
+        Latest outcome per job ID (empty if the file does not exist)
+    """
+    outcomes: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return outcomes
+    with open(path) as f:
+        for line in f:
+            try:
+                outcome = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            outcomes[outcome["job_id"]] = outcome
+    return outcomes
+
+
+def group_jobs(jobs: List[ManifestJob], chunk_size: int = CHUNK_SIZE) -> List[List[ManifestJob]]:
+    """
+    Split jobs into per-dataset chunks.
+
+    Every chunk holds jobs of a single dataset, so a worker loads it once
+    for the whole chunk (and keeps it for the next chunk of that dataset).
+    Chunks of one dataset are adjacent, so concurrent workers mostly share
+    the same few datasets.
+
+    Args:
+        jobs: Jobs to run
+        chunk_size: Maximum jobs per chunk
+
+    Returns:
+        Chunks in dataset order
+    """
+    by_dataset: Dict[str, List[ManifestJob]] = {}
+    for job in jobs:
+        by_dataset.setdefault(job.dataset_key, []).append(job)
+    return [
+        group[i:i + chunk_size]
+        for group in by_dataset.values()
+        for i in range(0, len(group), chunk_size)
+    ]
+
+
+def run_batch(
+    jobs: List[ManifestJob],
+    checkpoint_path: str,
+    output_dir: str = DEFAULT_OUTPUT_DIR,
+    workers: int = DEFAULT_WORKERS,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[IO[str]] = sys.stderr,
+) -> Dict[str, Any]:
+    """
+    Run every job not yet completed according to the checkpoint.
+
+    Outcomes are appended to the checkpoint as each chunk finishes, so an
+    interrupted batch resumes where it stopped; failed jobs are retried on
+    the next run. Progress lines report throughput and the estimated time
+    remaining.
+
+    Args:
+        jobs: Jobs from the manifest
+        checkpoint_path: JSONL file recording job outcomes
+        output_dir: Directory receiving one markdown report per job
+        workers: Worker processes (0 runs the jobs in this process)
+        chunk_size: Jobs per worker task
+        progress: Stream receiving progress lines (None for silence)
+
+    Returns:
+        Summary with counts of succeeded, failed and skipped jobs, elapsed
+        seconds and throughput
+    """
+    done = load_checkpoint(checkpoint_path)
+    pending = [j for j in jobs if done.get(j.id, {}).get("status") != "succeeded"]
+    chunks = group_jobs(pending, chunk_size)
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), exist_ok=True)
+
+    tracker = _Progress(len(pending), progress)
+    with open(checkpoint_path, "a") as checkpoint:
+
+        def record(outcomes: List[Dict[str, Any]]) -> None:
+            for outcome in outcomes:
+                checkpoint.write(json.dumps(outcome) + "\n")
+            checkpoint.flush()
+            tracker.update(outcomes)
+
+        if workers <= 0:
+            for chunk in chunks:
+                record(_run_chunk(chunk, output_dir))
+        else:
+            _run_in_pool(chunks, output_dir, workers, record)
+
+    summary = tracker.summary()
+    summary["skipped"] = len(jobs) - len(pending)
+    tracker.finish(summary)
+    return summary
+
+
+def _run_in_pool(chunks: List[List[ManifestJob]], output_dir: str, workers: int, record: Any) -> None:
+    """Feed chunks to a process pool, keeping only a few queued per worker."""
+    # Spawned workers do not inherit the parent's threads; datasets are memory-mapped, not pickled
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        queued = iter(chunks)
+        running: Dict[Future, List[ManifestJob]] = {}
+        for chunk in queued:
+            running[pool.submit(_run_chunk, chunk, output_dir)] = chunk
+            if len(running) >= 2 * workers:
+                break
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                chunk = running.pop(future)
+                try:
+                    record(future.result())
+                except Exception as exc:  # The worker died (e.g. out of memory)
+                    record([_outcome(job, "failed", 0.0, error=f"worker failed: {exc}") for job in chunk])
+            for chunk in queued:
+                running[pool.submit(_run_chunk, chunk, output_dir)] = chunk
+                if len(running) >= 2 * workers:
+                    break
+
+
+# Per-worker cache of loaded datasets: dataset_key -> (DataFrame, profile)
+_worker_datasets: "OrderedDict[str, Tuple[pd.DataFrame, Dict[str, Any]]]" = OrderedDict()
+
+
+def _run_chunk(chunk: List[ManifestJob], output_dir: str) -> List[Dict[str, Any]]:
+    """Run one chunk of same-dataset jobs (in a worker process)."""
+    from core.agent import Agent
+    from core.state import PromptState
+
+    try:
+        df, profile = _load(chunk[0])
+    except Exception as exc:
+        return [_outcome(job, "failed", 0.0, error=f"could not load dataset: {exc}") for job in chunk]
+
+    outcomes = []
+    for job in chunk:
+        start = time.perf_counter()
+        state = PromptState(question=job.prompt, profile=profile, dataset_id=job.dataset_id, dataframe=df)
+        try:
+            result = Agent().run(state, os.path.join(output_dir, f"{job.id}.md"), use_cache=job.use_cache)
+        except Exception as exc:
+            outcomes.append(_outcome(job, "failed", time.perf_counter() - start, error=f"{type(exc).__name__}: {exc}"))
+            continue
+        failed_steps = sum(1 for r in result.results if r["status"] == "error")
+        outcomes.append(_outcome(
+            job, "succeeded", time.perf_counter() - start,
+            report_path=result.report_path, steps=len(result.plan), failed_steps=failed_steps,
+        ))
+    return outcomes
+
+
+def _load(job: ManifestJob) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Load a job's dataset, reusing it if this worker loaded it recently."""
+    key = job.dataset_key
+    if key in _worker_datasets:
+        _worker_datasets.move_to_end(key)
+        return _worker_datasets[key]
+
+    if job.dataset_id is not None:
+        from datasets.storage import load_dataset
+
+        loaded = load_dataset(job.dataset_id)
+    else:
+        from datasets.profile import profile_dataset
+
+        df = pd.read_csv(job.dataset_path)
+        loaded = (df, profile_dataset(df))
+    _worker_datasets[key] = loaded
+    while len(_worker_datasets) > WORKER_DATASET_CACHE:
+        _worker_datasets.popitem(last=False)
+    return loaded
+
+
+def _outcome(job: ManifestJob, status: str, seconds: float, **extra: Any) -> Dict[str, Any]:
+    """Checkpoint record of one job."""
+    return {
+        "job_id": job.id,
+        "dataset": job.dataset_id or job.dataset_path,
+        "status": status,
+        "seconds": round(seconds, 3),
+        "finished_at": time.time(),
+        **extra,
+    }
+
+
+class _Progress:
+    """Counts finished jobs and prints throughput and ETA lines."""
+
+    def __init__(self, total: int, stream: Optional[IO[str]]):
+        self.total = total
+        self.stream = stream
+        self.succeeded = 0
+        self.failed = 0
+        self._start = time.perf_counter()
+        self._last_print = 0.0
+
+    def update(self, outcomes: List[Dict[str, Any]]) -> None:
+        for outcome in outcomes:
+            if outcome["status"] == "succeeded":
+                self.succeeded += 1
+            else:
+                self.failed += 1
+        now = time.perf_counter()
+        finished = self.succeeded + self.failed
+        if self.stream is None or (now - self._last_print < PROGRESS_INTERVAL and finished < self.total):
+            return
+        self._last_print = now
+        rate = finished / max(now - self._start, 1e-9)
+        eta = (self.total - finished) / rate if rate else 0.0
+        self.stream.write(
+            f"[{finished:>{len(str(self.total))}}/{self.total}] {100 * finished / max(self.total, 1):5.1f}%"
+            f"  {rate:6.2f} jobs/s  ETA {format_clock(eta)}  failed {self.failed}\n"
+        )
+        self.stream.flush()
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._start
+        finished = self.succeeded + self.failed
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "jobs_per_second": round(finished / elapsed, 3) if elapsed else 0.0,
+        }
+
+    def finish(self, summary: Dict[str, Any]) -> None:
+        if self.stream is not None:
+            self.stream.write(
+                f"Done: {summary['succeeded']} succeeded, {summary['failed']} failed, "
+                f"{summary['skipped']} already completed; {format_clock(summary['elapsed_seconds'])} "
+                f"({summary['jobs_per_second']:.2f} jobs/s)\n"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run a batch manifest from the command line.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv)
+
+    Returns:
+        Exit status: 0 if every job succeeded, 1 otherwise
+    """
+    parser = argparse.ArgumentParser(description="Run the agent over a manifest of (dataset, prompt) jobs.")
+    parser.add_argument("manifest", help="JSONL or YAML manifest of jobs")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker processes (0: run inline)")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="directory for per-job reports")
+    parser.add_argument("--checkpoint", help="outcome log used to resume (default: <manifest>.checkpoint.jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="jobs per worker task")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and run every job")
+    args = parser.parse_args(argv)
+
+    checkpoint = args.checkpoint or f"{os.path.splitext(args.manifest)[0]}.checkpoint.jsonl"
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError, ImportError) as exc:
+        parser.error(str(exc))
+    # Only once the manifest is known to be valid: a typo must not cost the progress made so far
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    summary = run_batch(jobs, checkpoint, args.output_dir, args.workers, max(args.chunk_size, 1))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+# cli/utils.py
+# Formatting helpers shared by the command-line tools' progress output.
+
+
+def format_clock(seconds: float) -> str:
+    """Format seconds as H:MM:SS."""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
@@ -1,2 +1,294 @@
 # core/agent.py
-# The central agent that orchestrates the planner, executor, and summarizer components.
\ No newline at end of file
+# The central agent that orchestrates the planner, executor, and summarizer components.
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from core.critic import check_result, check_step, has_errors
+from core.metrics import metrics
+from core.state import Critique, PromptState, RunResult
+from executor.runner import run_plan
+from executor.schemas import ExecutionResult
+from planner.optimizer import merge_cost_reports
+from planner.router import stream_plan
+from planner.schemas import CostReport, PlanStep
+from summarizer.incremental import IncrementalReport
+
+# Constants
+STAGES = ("plan", "critic", "execute", "summarize")
+_DONE = object()  # Queue sentinel: the upstream stage has finished
+
+# Yields batches of plan steps for a prompt: (prompt_state, use_cache) -> batches
+PlanSource = Callable[[PromptState, bool], Iterable[List[PlanStep]]]
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class Agent:
+    """
+    Runs planner → critic → executor → summarizer as a pipeline.
+
+    Each stage works on its own thread and hands work downstream through a
+    queue, so the stages overlap instead of running back to back:
+
+    - **plan**: steps are pulled from the plan source as they are
+      generated (a streamed LLM plan yields each step as soon as its JSON
+      object closes) and checked by the critic before being queued.
+      Steps with critic errors are reported as failed without running.
+    - **execute**: runs queued steps in order. Steps that arrived while the
+      previous batch ran are executed together through the optimizer, so
+      a plan that arrives whole (rule-based or cached) is optimized
+      exactly as ``run_plan`` would.
+    - **summarize** (calling thread): checks each result with the critic
+      and adds it to the incremental report, which always shows every
+      step planned so far.
+
+    End-to-end latency therefore approaches the slowest stage rather than
+    the sum of all stages; ``RunResult.stage_seconds`` records how long
+    each stage was busy.
+    """
+
+    def __init__(
+        self,
+        plan_source: Optional[PlanSource] = None,
+        optimize: bool = True,
+        report_interval: float = 0.0,
+    ):
+        """
+        Initialize the agent.
+
+        Args:
+            plan_source: Where plan steps come from (defaults to the routed,
+                streaming planner)
+            optimize: Execute batches through the cost-based optimizer
+            report_interval: Minimum seconds between report rewrites
+        """
+        self.plan_source = plan_source or _route
+        self.optimize = optimize
+        self.report_interval = report_interval
+
+    def run(
+        self,
+        state: PromptState,
+        report_path: Union[str, Path],
+        use_cache: bool = True,
+        on_event: Optional[EventCallback] = None,
+    ) -> RunResult:
+        """
+        Answer a question end to end.
+
+        Events passed to on_event: "plan" (first batch of steps, with the
+        report path), "plan_extended" (later batches), and "step_started" /
+        "step_finished" as emitted by ``run_plan`` (critic-rejected steps
+        get a "step_finished" only). Events come from several threads.
+
+        Args:
+            state: Question, profile and dataset to analyse
+            report_path: Where to write the markdown report
+            use_cache: Whether the planner may serve the plan from cache
+            on_event: Progress callback receiving (event_type, payload)
+
+        Returns:
+            RunResult with the plan, results, critic findings and stage timings
+
+        Raises:
+            Exception: Whatever the plan source or executor raised; the
+                report is still finalized with the results obtained so far
+        """
+        start = time.perf_counter()
+        emit = on_event or (lambda event_type, data: None)
+        timer = _StageTimer()
+        report = IncrementalReport([], report_path, min_interval=self.report_interval)
+        run = _PipelineRun()
+
+        planner = threading.Thread(
+            target=self._plan_stage, args=(state, use_cache, report, timer, run, emit), name="agent-plan", daemon=True
+        )
+        executor = threading.Thread(
+            target=self._execute_stage, args=(state, timer, run, emit), name="agent-execute", daemon=True
+        )
+        planner.start()
+        executor.start()
+
+        first_result: Optional[float] = None
+        while True:
+            result = run.results.get()
+            if result is _DONE:
+                break
+            if first_result is None:
+                first_result = time.perf_counter() - start
+            run.by_step[result.step_id] = result
+            if result.step_id not in run.rejected:
+                with timer.measure("critic"):
+                    run.critiques.extend(check_result(run.steps[result.step_id], result))
+            with timer.measure("summarize"):
+                report.add_result(result)
+        planner.join()
+        executor.join()
+
+        results = [run.by_step.get(s.step_id) or _not_executed(s) for s in run.plan]
+        with timer.measure("summarize"):
+            report.finalize(results)
+        if run.errors:
+            raise run.errors[0]
+
+        stage_seconds = timer.as_dict()
+        wall = time.perf_counter() - start
+        for stage, seconds in stage_seconds.items():
+            metrics.observe(f"agent.{stage}_seconds", seconds)
+        metrics.observe("agent.wall_seconds", wall)
+        cost = merge_cost_reports(run.cost_reports)
+        return RunResult(
+            question=state.question,
+            dataset_id=state.dataset_id,
+            plan=[s.model_dump() for s in run.plan],
+            results=[r.model_dump() for r in results],
+            critiques=run.critiques,
+            cost_report=cost.model_dump() if cost else None,
+            report_path=str(report.report_path),
+            stage_seconds={k: round(v, 6) for k, v in stage_seconds.items()},
+            first_result_seconds=round(first_result, 6) if first_result is not None else None,
+            wall_seconds=round(wall, 6),
+        )
+
+    def _plan_stage(
+        self,
+        state: PromptState,
+        use_cache: bool,
+        report: IncrementalReport,
+        timer: "_StageTimer",
+        run: "_PipelineRun",
+        emit: EventCallback,
+    ) -> None:
+        """Pull plan batches, run the step critic and queue runnable steps."""
+        try:
+            batches = iter(self.plan_source(state, use_cache))
+            first = True
+            while True:
+                with timer.measure("plan"):
+                    batch = next(batches, None)
+                if batch is None:
+                    break
+                with timer.measure("critic"):
+                    findings = [check_step(step, state.profile) for step in batch]
+                for step in batch:
+                    run.steps[step.step_id] = step
+                run.plan.extend(batch)
+                with timer.measure("summarize"):
+                    report.add_steps(batch)
+                emit("plan" if first else "plan_extended", {
+                    "steps": [s.model_dump() for s in batch],
+                    "report_path": str(report.report_path),
+                })
+                first = False
+
+                runnable = []
+                for step, step_findings in zip(batch, findings):
+                    run.critiques.extend(step_findings)
+                    if has_errors(step_findings):
+                        rejected = _rejected(step, step_findings)
+                        run.rejected.add(step.step_id)
+                        emit("step_finished", {"step_id": step.step_id, "result": rejected.model_dump()})
+                        run.results.put(rejected)
+                    else:
+                        runnable.append(step)
+                if runnable:
+                    run.execute.put(runnable)
+            if first:
+                emit("plan", {"steps": [], "report_path": str(report.report_path)})
+        except BaseException as exc:
+            run.errors.append(exc)
+        finally:
+            run.execute.put(_DONE)
+
+    def _execute_stage(
+        self, state: PromptState, timer: "_StageTimer", run: "_PipelineRun", emit: EventCallback
+    ) -> None:
+        """Execute queued steps, batching whatever accumulated while the previous batch ran."""
+
+        def forward(event_type: str, data: Dict[str, Any]) -> None:
+            if event_type == "step_finished":
+                run.results.put(ExecutionResult.model_validate(data["result"]))
+            emit(event_type, data)
+
+        try:
+            done = False
+            while not done:
+                item = run.execute.get()
+                if item is _DONE:
+                    break
+                steps = list(item)
+                while True:
+                    try:
+                        item = run.execute.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        done = True
+                        break
+                    steps.extend(item)
+                metrics.observe("agent.execute_batch_steps", len(steps))
+                with timer.measure("execute"):
+                    _, cost = run_plan(steps, state, optimize=self.optimize, on_event=forward)
+                if cost is not None:
+                    run.cost_reports.append(cost)
+        except BaseException as exc:
+            run.errors.append(exc)
+        finally:
+            run.results.put(_DONE)
+
+
+class _PipelineRun:
+    """State shared by the stages of one agent run."""
+
+    def __init__(self) -> None:
+        self.execute: "queue.Queue[Any]" = queue.Queue()  # Batches of steps to execute
+        self.results: "queue.Queue[Any]" = queue.Queue()  # Results to critique and summarize
+        self.plan: List[PlanStep] = []  # Steps in planning order
+        self.steps: Dict[str, PlanStep] = {}
+        self.by_step: Dict[str, ExecutionResult] = {}
+        self.rejected: Set[str] = set()  # Steps the critic kept from running
+        self.critiques: List[Critique] = []
+        self.cost_reports: List[CostReport] = []
+        self.errors: List[BaseException] = []
+
+
+class _StageTimer:
+    """Thread-safe accumulator of busy seconds per stage."""
+
+    def __init__(self) -> None:
+        self._seconds = {stage: 0.0 for stage in STAGES}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._seconds[stage] += elapsed
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._seconds)
+
+
+def _route(state: PromptState, use_cache: bool) -> Iterable[List[PlanStep]]:
+    """Default plan source: the rule/LLM router in streaming mode."""
+    return stream_plan(state, use_cache=use_cache)
+
+
+def _rejected(step: PlanStep, findings: List[Critique]) -> ExecutionResult:
+    """Result recorded for a step the critic kept from running."""
+    reasons = "; ".join(f.message for f in findings if f.severity == "error")
+    return ExecutionResult(step_id=step.step_id, status="error", error=f"Rejected by critic: {reasons}")
+
+
+def _not_executed(step: PlanStep) -> ExecutionResult:
+    """Result recorded for a step that never produced one (e.g. after a failure)."""
+    return ExecutionResult(step_id=step.step_id, status="error", error="Step was not executed")
@@ -0,0 +1,140 @@
+# core/critic.py
+# Deterministic critic: cheap checks on plan steps before they run and on their results after.
+
+import math
+import os
+from typing import Any, Dict, List
+
+from core.state import Critique
+from datasets.profile import is_numeric_column
+from executor.schemas import ExecutionResult
+from executor.utils import coerce_args, validate_args
+from planner.schemas import PlanStep
+from spec.tool_specs import TOOL_SPECS
+
+# Constants
+COLUMN_ARG_TYPES = ("str", "List[str]")  # Every string argument of the tool specs names a column
+NUMERIC_ARGS: Dict[str, tuple] = {
+    "summary_stats": ("columns",),
+    "histogram": ("columns",),
+    "boxplot": ("y",),
+    "t_test": ("value_column",),
+}
+GROUP_LEVEL_ARGS: Dict[str, tuple] = {"t_test": ("group_column", 2)}  # Argument and required distinct values
+MAX_NON_FINITE_SCAN = 10_000  # Preview values inspected for NaN/inf
+
+
+def check_step(step: PlanStep, profile: Dict[str, Any]) -> List[Critique]:
+    """
+    Check a planned step against the tool specs and the dataset profile.
+
+    Runs before execution, so steps that cannot succeed are rejected
+    without touching the data. Any "error" finding means the step should
+    not be executed.
+
+    Args:
+        step: The planned analysis step
+        profile: Dataset profile (column names, dtypes, unique counts)
+
+    Returns:
+        Findings, empty when the step looks runnable
+    """
+    spec = TOOL_SPECS.get(step.tool)
+    if spec is None:
+        return [_critique(step.step_id, "unknown_tool", "error", f"Tool '{step.tool}' does not exist")]
+
+    args = coerce_args(step.tool, step.args)
+    valid, error = validate_args(step.tool, args)
+    if not valid:
+        return [_critique(step.step_id, "invalid_args", "error", error)]
+
+    columns = profile.get("columns", {})
+    findings = []
+    for name, meta in spec.items():
+        if meta["type"] not in COLUMN_ARG_TYPES or name not in args:
+            continue
+        for column in _as_list(args[name]):
+            if column not in columns:
+                findings.append(_critique(step.step_id, "unknown_column", "error", f"Unknown column '{column}' in '{name}'"))
+            elif name in NUMERIC_ARGS.get(step.tool, ()) and not is_numeric_column(columns[column]):
+                findings.append(_critique(
+                    step.step_id, "non_numeric_column", "error", f"'{name}' needs numeric columns, '{column}' is not"
+                ))
+
+    level_arg = GROUP_LEVEL_ARGS.get(step.tool)
+    if level_arg and args.get(level_arg[0]) in columns:
+        unique = columns[args[level_arg[0]]].get("num_unique")
+        if unique is not None and unique != level_arg[1]:
+            findings.append(_critique(
+                step.step_id, "group_levels", "error",
+                f"'{level_arg[0]}' needs exactly {level_arg[1]} groups, '{args[level_arg[0]]}' has {unique}",
+            ))
+    return findings
+
+
+def check_result(step: PlanStep, result: ExecutionResult) -> List[Critique]:
+    """
+    Sanity-check a step's execution result.
+
+    Args:
+        step: The planned analysis step
+        result: Its execution result
+
+    Returns:
+        Findings (failed step, missing or empty artifact, empty output,
+        invalid p-values, non-finite values, truncated preview)
+    """
+    step_id = step.step_id
+    if result.status == "error":
+        return [_critique(step_id, "step_failed", "warning", result.error or "Step failed")]
+
+    findings = []
+    if result.artifact_path:
+        if not os.path.isfile(result.artifact_path):
+            findings.append(_critique(step_id, "missing_artifact", "error", f"Artifact {result.artifact_path} does not exist"))
+        elif os.path.getsize(result.artifact_path) == 0:
+            findings.append(_critique(step_id, "empty_artifact", "error", f"Artifact {result.artifact_path} is empty"))
+    elif not result.output_preview:
+        findings.append(_critique(step_id, "empty_output", "warning", "Step succeeded but produced no output"))
+
+    preview = result.output_preview
+    if isinstance(preview, dict) and "p_value" in preview:
+        p_value = preview["p_value"]
+        if not isinstance(p_value, (int, float)) or not 0.0 <= p_value <= 1.0:
+            findings.append(_critique(step_id, "invalid_p_value", "error", f"p-value {p_value!r} is not in [0, 1]"))
+    if preview and _has_non_finite(preview):
+        findings.append(_critique(step_id, "non_finite_values", "warning", "Output contains NaN or infinite values"))
+    if result.truncation is not None:
+        findings.append(_critique(
+            step_id, "truncated_preview", "info",
+            f"Preview shows {result.truncation.preview_rows} of {result.truncation.total_rows} rows",
+        ))
+    return findings
+
+
+def has_errors(findings: List[Critique]) -> bool:
+    """Whether any finding is severe enough to block a step."""
+    return any(f.severity == "error" for f in findings)
+
+
+def _critique(step_id: str, check: str, severity: str, message: str) -> Critique:
+    return Critique(step_id=step_id, check=check, severity=severity, message=message)
+
+
+def _as_list(value: Any) -> List[str]:
+    return value if isinstance(value, list) else [value]
+
+
+def _has_non_finite(value: Any) -> bool:
+    """Whether a JSON-like preview holds NaN or inf (scans a bounded number of values)."""
+    stack, seen = [value], 0
+    while stack and seen < MAX_NON_FINITE_SCAN:
+        item = stack.pop()
+        seen += 1
+        if isinstance(item, float) and not math.isfinite(item):
+            return True
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return False
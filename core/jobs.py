@@ -0,0 +1,505 @@
+# core/jobs.py
+# Persistent run store and background worker pool for full analysis runs.
+
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from core.agent import Agent
+from core.metrics import metrics
+from core.state import PromptState, RunEvent, RunRecord
+from datasets.storage import load_dataset
+
+# Constants
+RUNS_DB_PATH = os.path.join("runs", "runs.db")
+REPORTS_DIR = "reports"
+RUN_WORKERS = int(os.getenv("AUTOSTAT_RUN_WORKERS", "2"))  # Concurrent runs per API process
+TERMINAL_EVENT = "done"  # Last event of every run; carries the final status
+# A running run whose owner has not sent a heartbeat for this long is considered orphaned
+RUN_LEASE_SECONDS = float(os.getenv("AUTOSTAT_RUN_LEASE_SECONDS", "60"))
+HEARTBEAT_INTERVAL = RUN_LEASE_SECONDS / 4
+
+
+class RunStore:
+    """
+    SQLite-backed store of RunRecords, so runs survive API restarts.
+
+    Each record is kept as JSON alongside indexed status and creation time;
+    run progress events are appended to a second table so streams can be
+    replayed from any event ID. A short-lived connection is opened per operation, which keeps the store
+    safe to use from any worker thread.
+
+    Several API processes may share one database. A run is claimed
+    atomically (``claim``) by the process that executes it, which records
+    itself as the run's owner and renews a heartbeat; ``release_orphans``
+    only hands back runs whose owner is gone.
+    """
+
+    def __init__(self, path: str = RUNS_DB_PATH):
+        """
+        Open (and if needed create) the run database.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " run_id TEXT PRIMARY KEY, status TEXT NOT NULL,"
+                " created_at REAL NOT NULL, record TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_status ON runs (status, created_at)")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+            # Databases created before runs had owners
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE runs ADD COLUMN owner TEXT")
+            if "heartbeat" not in columns:
+                conn.execute("ALTER TABLE runs ADD COLUMN heartbeat REAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS run_events ("
+                " run_id TEXT NOT NULL, seq INTEGER NOT NULL, type TEXT NOT NULL,"
+                " data TEXT NOT NULL, ts REAL NOT NULL, PRIMARY KEY (run_id, seq))"
+            )
+
+    def save(self, record: RunRecord) -> None:
+        """
+        Insert or update a run record (its owner and heartbeat are kept).
+
+        Args:
+            record: Run record to persist
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO runs (run_id, status, created_at, record) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (run_id) DO UPDATE SET"
+                " status = excluded.status, created_at = excluded.created_at, record = excluded.record",
+                (record.run_id, record.status, record.created_at, record.model_dump_json()),
+            )
+
+    def claim(self, run_id: str, owner: str) -> Optional[RunRecord]:
+        """
+        Atomically move a queued run to "running" on behalf of an owner.
+
+        Args:
+            run_id: Run identifier
+            owner: Identity of the claiming process (see RunQueue.owner)
+
+        Returns:
+            The claimed record, or None if the run is unknown or another
+            worker claimed it first
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE runs SET status = 'running', owner = ?, heartbeat = ?,"
+                " record = json_set(record, '$.status', 'running', '$.started_at', ?)"
+                " WHERE run_id = ? AND status = 'queued'",
+                (owner, now, now, run_id),
+            )
+        return self.get(run_id) if cursor.rowcount == 1 else None
+
+    def heartbeat(self, owner: str) -> None:
+        """Renew the lease of every run an owner is executing."""
+        with self._connect() as conn:
+            conn.execute("UPDATE runs SET heartbeat = ? WHERE owner = ? AND status = 'running'", (time.time(), owner))
+
+    def release_orphans(self, lease_seconds: float = RUN_LEASE_SECONDS) -> int:
+        """
+        Return running runs whose owner is gone to the queue.
+
+        An owner is gone when it is a process on this host that no longer
+        exists, or when its heartbeat is older than lease_seconds (runs
+        saved as running without an owner count as gone).
+
+        Args:
+            lease_seconds: Heartbeat age after which an owner is presumed dead
+
+        Returns:
+            Number of runs re-queued
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT run_id, owner, heartbeat FROM runs WHERE status = 'running'").fetchall()
+        released = 0
+        for run_id, owner, heartbeat in rows:
+            stale = heartbeat is None or time.time() - heartbeat > lease_seconds
+            if not (stale or _owner_exited(owner)):
+                continue
+            with self._connect() as conn:
+                # Compare-and-set: skip the run if it changed hands meanwhile
+                cursor = conn.execute(
+                    "UPDATE runs SET status = 'queued', owner = NULL, heartbeat = NULL,"
+                    " record = json_set(record, '$.status', 'queued', '$.started_at', NULL)"
+                    " WHERE run_id = ? AND status = 'running' AND owner IS ?",
+                    (run_id, owner),
+                )
+            released += cursor.rowcount
+        return released
+
+    def get(self, run_id: str) -> Optional[RunRecord]:
+        """
+        Fetch a run record.
+
+        Args:
+            run_id: Run identifier
+
+        Returns:
+            The record, or None if unknown
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT record FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return RunRecord.model_validate_json(row[0]) if row else None
+
+    def list(self, limit: int = 50, status: Optional[str] = None) -> List[RunRecord]:
+        """
+        List runs, newest first.
+
+        Args:
+            limit: Maximum number of records
+            status: Only return runs in this state
+
+        Returns:
+            Matching run records
+        """
+        query, params = "SELECT record FROM runs", []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [RunRecord.model_validate_json(r[0]) for r in rows]
+
+    def queued(self) -> List[RunRecord]:
+        """Return queued runs, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT record FROM runs WHERE status = 'queued' ORDER BY created_at").fetchall()
+        return [RunRecord.model_validate_json(r[0]) for r in rows]
+
+    def append_event(self, run_id: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Append a progress event to a run's stream.
+
+        Args:
+            run_id: Run identifier
+            event_type: Event name
+            data: JSON-serializable payload
+
+        Returns:
+            The event's sequence number
+        """
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE serializes writers so sequence numbers never collide
+            conn.execute("BEGIN IMMEDIATE")
+            (last,) = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM run_events WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO run_events (run_id, seq, type, data, ts) VALUES (?, ?, ?, ?, ?)",
+                (run_id, last + 1, event_type, json.dumps(data or {}, default=str), time.time()),
+            )
+        return last + 1
+
+    def events_after(self, run_id: str, after_seq: int = 0, limit: int = 100) -> List[RunEvent]:
+        """
+        Read a run's events following a sequence number.
+
+        Args:
+            run_id: Run identifier
+            after_seq: Last event already seen (0 for the whole stream)
+            limit: Maximum number of events
+
+        Returns:
+            Events in sequence order
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT seq, type, data, ts FROM run_events WHERE run_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (run_id, after_seq, limit),
+            ).fetchall()
+        return [RunEvent(run_id=run_id, seq=seq, type=t, data=json.loads(d), ts=ts) for seq, t, d, ts in rows]
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection, commit on success and always close it."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def _owner_exited(owner: Optional[str]) -> bool:
+    """Whether an owner ("host:pid:nonce") is a process on this host that has exited."""
+    if not owner:
+        return True
+    host, _, rest = owner.partition(":")
+    pid = rest.partition(":")[0]
+    if host != socket.gethostname() or not pid.isdigit():
+        return False  # Another host: only its heartbeat can tell
+    if int(pid) == os.getpid():
+        return owner != _process_owner()  # Same pid, earlier process (e.g. a restarted container)
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+def _process_owner() -> str:
+    """Owner identity of this process; the nonce tells it apart from earlier processes with the same pid."""
+    global _owner
+    if _owner is None or not _owner.startswith(f"{socket.gethostname()}:{os.getpid()}:"):
+        _owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    return _owner
+
+
+_owner: Optional[str] = None
+
+
+def execute_run(record: RunRecord, store: RunStore) -> None:
+    """
+    Plan, execute and summarize one run, persisting progress as it goes.
+
+    The run goes through the pipelined Agent, so steps execute while the
+    rest of the plan is still being generated. Emits "plan" (and
+    "plan_extended" for steps planned later), "step_started" /
+    "step_finished" (per step, with results and timing) and "report"
+    events to the run's event stream. The report exists from the moment
+    the plan does: it is rewritten as each step finishes, with
+    placeholders for pending steps, and finalized at the end.
+
+    Args:
+        record: Run to execute (updated in place)
+        store: Store receiving the intermediate and final record
+    """
+    df, profile = load_dataset(record.dataset_id)
+    state = PromptState(question=record.question, profile=profile, dataset_id=record.dataset_id, dataframe=df)
+    record.plan = []  # A recovered run is planned afresh
+
+    def emit(event_type: str, data: Dict[str, Any]) -> None:
+        if event_type in ("plan", "plan_extended"):
+            record.plan.extend(data["steps"])
+            record.report_path = data["report_path"]
+            store.save(record)
+        store.append_event(record.run_id, event_type, data)
+
+    result = Agent().run(
+        state, os.path.join(REPORTS_DIR, f"run_{record.run_id}.md"), use_cache=record.use_cache, on_event=emit
+    )
+    record.plan = result.plan
+    record.results = result.results
+    record.cost_report = result.cost_report
+    record.critiques = [c.model_dump() for c in result.critiques]
+    record.stage_seconds = result.stage_seconds
+    store.save(record)
+    emit("report", {
+        "report_path": record.report_path,
+        "cost_report": record.cost_report,
+        "critiques": record.critiques,
+        "stage_seconds": record.stage_seconds,
+    })
+
+
+class RunQueue:
+    """
+    Bounded pool of worker threads executing queued runs.
+
+    Submitting only persists the record and enqueues its ID, so the API
+    returns immediately. Workers start on first use and claim each run in
+    the store before executing it, so a run enqueued by several API
+    processes still executes once. While runs execute, a heartbeat thread
+    renews their lease; ``recover`` re-enqueues queued runs and runs whose
+    owning process is gone.
+    """
+
+    def __init__(
+        self,
+        store: RunStore,
+        workers: int = RUN_WORKERS,
+        executor: Callable[[RunRecord, RunStore], None] = execute_run,
+    ):
+        """
+        Initialize the queue (workers are started lazily).
+
+        Args:
+            store: Persistent run store
+            workers: Number of worker threads
+            executor: Function performing one run
+        """
+        self.store = store
+        self.workers = max(workers, 1)
+        self._execute = executor
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._busy = 0
+        self._lock = threading.Lock()
+        self.owner = _process_owner()
+
+    def submit(self, dataset_id: str, question: str, use_cache: bool = True) -> RunRecord:
+        """
+        Persist a new run and enqueue it.
+
+        Args:
+            dataset_id: Dataset to analyse
+            question: Research question
+            use_cache: Whether the planner may use the plan cache
+
+        Returns:
+            The queued run record
+        """
+        record = RunRecord(
+            run_id=uuid.uuid4().hex,
+            dataset_id=dataset_id,
+            question=question,
+            use_cache=use_cache,
+            created_at=time.time(),
+        )
+        self.store.save(record)
+        self.store.append_event(record.run_id, "queued", {"dataset_id": dataset_id, "question": question})
+        self._enqueue(record.run_id)
+        metrics.incr("runs.submitted")
+        return record
+
+    def recover(self) -> int:
+        """
+        Re-enqueue queued runs and runs interrupted by a restart.
+
+        Runs that another live process is executing are left alone; see
+        RunStore.release_orphans.
+
+        Returns:
+            Number of runs re-enqueued
+        """
+        self.store.release_orphans()
+        pending = self.store.queued()
+        for record in pending:
+            self._enqueue(record.run_id)
+        if pending:
+            metrics.incr("runs.recovered", len(pending))
+        return len(pending)
+
+    def start(self) -> None:
+        """Start the worker threads if they are not running."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping = threading.Event()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"run-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            heartbeat = threading.Thread(
+                target=self._heartbeat, args=(self._stopping,), name="run-heartbeat", daemon=True
+            )
+            heartbeat.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the workers after their current run.
+
+        Queued runs stay persisted and are picked up by ``recover`` later.
+
+        Args:
+            timeout: Seconds to wait for each worker
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+            self._stopping.set()
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def join(self) -> None:
+        """Block until every enqueued run has been processed (mainly for tests)."""
+        self._queue.join()
+
+    def _enqueue(self, run_id: str) -> None:
+        """Queue a run ID and make sure workers are running."""
+        self.start()
+        self._queue.put(run_id)
+        self._update_gauges()
+
+    def _work(self) -> None:
+        """Worker loop: take run IDs until a stop sentinel arrives."""
+        while True:
+            run_id = self._queue.get()
+            try:
+                if run_id is None:
+                    return
+                self._run(run_id)
+            finally:
+                self._queue.task_done()
+
+    def _heartbeat(self, stopping: threading.Event) -> None:
+        """Renew the lease of this process's running runs until the workers stop."""
+        while not stopping.wait(HEARTBEAT_INTERVAL):
+            with self._lock:
+                busy = self._busy
+            if busy:
+                try:
+                    self.store.heartbeat(self.owner)
+                except sqlite3.Error:
+                    metrics.incr("runs.heartbeat_errors")
+
+    def _run(self, run_id: str) -> None:
+        """Claim one run, execute it and record its outcome."""
+        record = self.store.claim(run_id, self.owner)
+        if record is None:  # Unknown, finished, or claimed by another worker
+            return
+        self.store.append_event(run_id, "started", {})
+        with self._lock:
+            self._busy += 1
+        self._update_gauges()
+
+        try:
+            self._execute(record, self.store)
+            record.status = "succeeded"
+            metrics.incr("runs.succeeded")
+        except Exception as exc:
+            record.status, record.error = "failed", str(exc)
+            metrics.incr("runs.failed")
+        finally:
+            record.finished_at = time.time()
+            self.store.save(record)
+            self.store.append_event(run_id, TERMINAL_EVENT, {"status": record.status, "error": record.error})
+            metrics.observe("runs.seconds", record.finished_at - record.started_at)
+            with self._lock:
+                self._busy -= 1
+            self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        """Publish queue depth and worker utilization."""
+        with self._lock:
+            busy = self._busy
+        metrics.set_gauge("runs.queue_depth", self._queue.qsize())
+        metrics.set_gauge("runs.workers_busy", busy)
+        metrics.set_gauge("runs.worker_utilization", busy / self.workers)
+
+
+_run_queue: Optional[RunQueue] = None
+_run_queue_lock = threading.Lock()
+
+
+def get_run_queue() -> RunQueue:
+    """Return the process-wide run queue, creating it on first use."""
+    global _run_queue
+    with _run_queue_lock:
+        if _run_queue is None:
+            _run_queue = RunQueue(RunStore())
+        return _run_queue
@@ -0,0 +1,146 @@
+# core/metrics.py
+# In-process telemetry: counters, gauges and latency histograms shared by all components.
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator
+
+# Constants
+LATENCY_WINDOW = 1024  # Recent observations kept per histogram for percentiles
+
+
+class _Histogram:
+    """Running count/sum/min/max plus a sliding window for percentiles."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.window: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, value: float) -> None:
+        """Record one observation."""
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.window.append(value)
+
+    def percentile(self, q: float) -> float:
+        """Return the q-quantile of the recent window."""
+        if not self.window:
+            return 0.0
+        ordered = sorted(self.window)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> Dict[str, float]:
+        """Return count, mean, min, max, p50 and p95."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of named counters, gauges and histograms.
+
+    Names are dotted paths such as ``planner.parse.failures``; a snapshot
+    is served by the API's /metrics endpoint.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, _Histogram] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            name: Counter name
+            value: Amount to add
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Set a gauge to its current value.
+
+        Args:
+            name: Gauge name
+            value: Current value
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Record one observation (usually a latency in seconds).
+
+        Args:
+            name: Histogram name
+            value: Observed value
+        """
+        with self._lock:
+            self._histograms.setdefault(name, _Histogram()).add(value)
+
+    def counter(self, name: str) -> float:
+        """Return the current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def percentile(self, name: str, q: float) -> float:
+        """Return the q-quantile of a histogram's recent window (0 if empty)."""
+        with self._lock:
+            hist = self._histograms.get(name)
+            return hist.percentile(q) if hist else 0.0
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        Time a block and record its duration in seconds.
+
+        Args:
+            name: Histogram name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return a JSON-serializable copy of all metrics.
+
+        Returns:
+            Dictionary with 'counters', 'gauges' and 'histograms'
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {k: h.summary() for k, h in self._histograms.items()},
+            }
+
+    def reset(self) -> None:
+        """Clear all metrics (mainly for tests)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
@@ -0,0 +1,155 @@
+# core/singleflight.py
+# Coalesces concurrent identical computations so they share one in-flight result.
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from core.metrics import metrics
+
+
+class SingleFlight:
+    """
+    Thread-based request coalescing.
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving while it runs wait for and share its result, or its exception.
+    The key is forgotten as soon as the call finishes, so nothing is cached
+    beyond the in-flight window.
+
+    Counters ``singleflight.<name>.leaders`` and ``singleflight.<name>.coalesced``
+    report how many calls ran and how many were absorbed.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the group.
+
+        Args:
+            name: Group name used in metric names (e.g. "plan", "dataset")
+        """
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        """
+        Run ``fn(*args, **kwargs)`` unless an identical call is in flight.
+
+        Args:
+            key: Identity of the computation
+            fn: Function to run if this caller leads
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Tuple of (result, shared) where shared is True for coalesced callers
+
+        Raises:
+            Exception: Whatever the leader's call raised
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            metrics.incr(f"singleflight.{self.name}.coalesced")
+            return future.result(), True
+
+        metrics.incr(f"singleflight.{self.name}.leaders")
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            metrics.incr(f"singleflight.{self.name}.errors")
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
+
+
+class _AsyncCall:
+    """An in-flight coroutine computation and the number of callers awaiting it."""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    Request coalescing for coroutines on one event loop.
+
+    The shared computation runs as its own task. A waiter that is cancelled
+    (e.g. its client disconnected) stops waiting without disturbing the
+    others; the task itself is cancelled only when every waiter has gone.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the group.
+
+        Args:
+            name: Group name used in metric names
+        """
+        self.name = name
+        self._calls: Dict[Hashable, _AsyncCall] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await ``fn()`` unless an identical call is in flight.
+
+        Args:
+            key: Identity of the computation
+            fn: Zero-argument coroutine function to run if this caller leads
+
+        Returns:
+            Tuple of (result, shared) where shared is True for coalesced callers
+
+        Raises:
+            Exception: Whatever the shared computation raised
+        """
+        call = self._calls.get(key)
+        # A finished call whose done-callback has not run yet cannot be joined
+        shared = call is not None and not call.task.done()
+        if not shared:
+            call = _AsyncCall(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _t, k=key, c=call: self._forget(k, c))
+            metrics.incr(f"singleflight.{self.name}.leaders")
+        else:
+            metrics.incr(f"singleflight.{self.name}.coalesced")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                # Last interested caller left: stop the computation
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _AsyncCall) -> None:
+        """Drop a finished call (unless a newer one replaced it)."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled() and call.task.exception() is not None:
+            metrics.incr(f"singleflight.{self.name}.errors")
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being computed."""
+        return len(self._calls)
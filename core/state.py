@@ -2,15 +2,68 @@
 # Maintains shared data models such as PromptState and RunResult
 
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Literal, Optional
 import pandas as pd
 
+# Lifecycle of a queued analysis run
+RunStatus = Literal["queued", "running", "succeeded", "failed"]
+
+# How serious a critic finding is; "error" findings on a step keep it from running
+CritiqueSeverity = Literal["info", "warning", "error"]
+
 # Represents the state of a prompt, including the question, user profile, and an optional DataFrame.
 class PromptState(BaseModel):
     question: str  # The user's question or prompt.
     profile: Dict[str, Any]  # User profile or context information.
+    dataset_id: Optional[str] = None  # Stored dataset the question refers to, if any.
     # DataFrame is used internally for data processing, not included in serialized API responses.
     dataframe: Optional[pd.DataFrame] = Field(default=None, exclude=True)
     
     class Config:
-        arbitrary_types_allowed = True  # Allow non-pydantic types like pd.DataFrame.
\ No newline at end of file
+        arbitrary_types_allowed = True  # Allow non-pydantic types like pd.DataFrame.
+
+# Persisted record of one plan -> execute -> summarize run submitted through /runs.
+class RunRecord(BaseModel):
+    run_id: str  # Unique identifier returned to the client.
+    dataset_id: str  # Dataset the run analyses.
+    question: str  # Research question.
+    use_cache: bool = True  # Whether the planner may serve the plan from cache.
+    status: RunStatus = "queued"  # Current lifecycle state.
+    created_at: float  # Submission time (epoch seconds).
+    started_at: Optional[float] = None  # When a worker picked the run up.
+    finished_at: Optional[float] = None  # When the run succeeded or failed.
+    plan: List[Dict[str, Any]] = []  # Plan steps, once planned.
+    results: List[Dict[str, Any]] = []  # One ExecutionResult per plan step, once executed.
+    cost_report: Optional[Dict[str, Any]] = None  # Optimizer estimate vs actual cost.
+    report_path: Optional[str] = None  # Markdown report, once summarized.
+    critiques: List[Dict[str, Any]] = []  # Critic findings on the plan and results.
+    stage_seconds: Dict[str, float] = {}  # Busy time per agent stage (see RunResult).
+    error: Optional[str] = None  # Failure message when status is "failed".
+
+# One progress event of a run, replayable by sequence number (the SSE event id).
+class RunEvent(BaseModel):
+    run_id: str  # Run the event belongs to.
+    seq: int  # 1-based position within the run's event stream.
+    type: str  # e.g. "plan", "step_started", "step_finished", "report", "done".
+    data: Dict[str, Any] = {}  # Event payload.
+    ts: float  # Emission time (epoch seconds).
+
+# One finding of the deterministic critic about a plan step or its result.
+class Critique(BaseModel):
+    step_id: str  # Step the finding is about.
+    check: str  # Name of the check, e.g. "unknown_column" or "missing_artifact".
+    severity: CritiqueSeverity  # "info", "warning" or "error".
+    message: str  # Human-readable explanation.
+
+# Outcome of one pipelined agent run (plan -> critic -> execute -> summarize).
+class RunResult(BaseModel):
+    question: str  # Research question.
+    dataset_id: Optional[str] = None  # Stored dataset analysed, if any.
+    plan: List[Dict[str, Any]] = []  # Plan steps in the order they were planned.
+    results: List[Dict[str, Any]] = []  # One ExecutionResult per plan step, in plan order.
+    critiques: List[Critique] = []  # Critic findings on steps and results.
+    cost_report: Optional[Dict[str, Any]] = None  # Optimizer estimate vs actual cost, over all batches.
+    report_path: Optional[str] = None  # Final markdown report.
+    stage_seconds: Dict[str, float] = {}  # Busy time of each stage: plan, critic, execute, summarize.
+    first_result_seconds: Optional[float] = None  # From start until the first step result.
+    wall_seconds: float = 0.0  # End-to-end latency; approaches max(stage_seconds) when stages overlap.
@@ -1,8 +1,21 @@
 # datasets/profile.py
 # Dataset profiling (column names, types, nulls, etc.).
 
+import math
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 import pandas as pd
 
+# Constants
+# Distinct counts of streamed profiles are exact up to this many values per column, estimated beyond
+SKETCH_SIZE = int(os.getenv("AUTOSTAT_PROFILE_SKETCH_SIZE", "65536"))
+MAX_TRACKED_VALUES = 100_000  # Value counts kept per text column between batches
+TOP_VALUES = 5  # Most frequent values reported per text column
+
+
 def profile_dataset(df: pd.DataFrame) -> dict:
     """
     Generate a simple profile of a pandas DataFrame, including row/column counts,
@@ -19,6 +32,7 @@ def profile_dataset(df: pd.DataFrame) -> dict:
         col_profile = {
             "dtype": str(series.dtype),  # Data type of the column
             "num_missing": int(series.isna().sum()),  # Number of missing (NaN) values
+            "num_unique": int(series.nunique(dropna=True)),  # Distinct non-null values (cardinality)
         }
 
         # If the column is numeric, compute basic statistics
@@ -35,3 +49,205 @@ def profile_dataset(df: pd.DataFrame) -> dict:
         profile["columns"][col] = col_profile  # Add column profile to the result
 
     return profile  # Return the complete profile dictionary
+
+
+class PartialProfile:
+    """
+    Mergeable profile of part of a dataset.
+
+    Feed record batches with ``update`` and combine the profiles of
+    different parts with ``merge``; ``finalize`` returns the same structure
+    as ``profile_dataset``. Memory is bounded per column, not per row:
+
+    - means and standard deviations are merged with Chan's parallel
+      variance algorithm;
+    - distinct counts come from a K-minimum-values sketch of 64-bit value
+      hashes: exact up to SKETCH_SIZE distinct values, within about
+      1/sqrt(SKETCH_SIZE) beyond;
+    - value counts of text columns are pruned to the most frequent
+      MAX_TRACKED_VALUES, so top values of very high-cardinality columns
+      are approximate.
+
+    Column dtypes are merged the way a full parse would infer them (e.g.
+    int64 in one part and float64 in another gives float64). When parts
+    disagree on whether a column is numeric at all, it becomes object and
+    its top values only reflect the parts that read it as text.
+    """
+
+    def __init__(self, columns: List[str]):
+        """
+        Initialize an empty profile.
+
+        Args:
+            columns: Column names, in dataset order
+        """
+        self.columns = list(columns)
+        self.num_rows = 0
+        self._stats = {col: _ColumnStats() for col in self.columns}
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Add a batch of rows (with the profile's columns) to the profile."""
+        self.num_rows += len(df)
+        if len(df) == 0:
+            return
+        for col in self.columns:
+            self._stats[col].update(df[col])
+
+    def merge(self, other: "PartialProfile") -> None:
+        """
+        Add another part's profile to this one.
+
+        Raises:
+            ValueError: If the profiles have different columns
+        """
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge profiles of different columns")
+        self.num_rows += other.num_rows
+        for col in self.columns:
+            self._stats[col].merge(other._stats[col])
+
+    def finalize(self) -> dict:
+        """Return the profile in the format of ``profile_dataset``."""
+        return {
+            "num_rows": self.num_rows,
+            "num_columns": len(self.columns),
+            "columns": {col: self._stats[col].finalize() for col in self.columns},
+        }
+
+
+class _ColumnStats:
+    """Mergeable statistics of one column."""
+
+    def __init__(self) -> None:
+        self.dtype: Optional[str] = None  # None until a non-empty batch is seen
+        self.missing = 0
+        self.count = 0  # Non-missing numeric values
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = np.empty(0, dtype=np.uint64)  # Smallest distinct value hashes, sorted
+        self.counts: Counter = Counter()
+
+    def update(self, series: pd.Series) -> None:
+        self.dtype = merge_dtypes(self.dtype, str(series.dtype))
+        missing = series.isna()
+        self.missing += int(missing.sum())
+        values = series[~missing]
+        if pd.api.types.is_numeric_dtype(series):
+            # Hash numbers as floats so parts read as int64 and float64 agree;
+            # adding 0.0 turns -0.0 into 0.0, which pandas counts as one value
+            x = values.to_numpy(dtype="float64") + 0.0
+            if len(x):
+                mean = float(x.mean())
+                self._add_moments(len(x), mean, float(((x - mean) ** 2).sum()), float(x.min()), float(x.max()))
+            hashed = x
+        else:
+            hashed = np.asarray(values)
+            if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(series):
+                self.counts.update(values.value_counts().to_dict())
+                self._prune_counts()
+        if len(hashed):
+            self._add_hashes(pd.util.hash_array(hashed))
+
+    def merge(self, other: "_ColumnStats") -> None:
+        if other.dtype is not None:
+            self.dtype = merge_dtypes(self.dtype, other.dtype)
+        self.missing += other.missing
+        if other.count:
+            self._add_moments(other.count, other.mean, other.m2, other.min, other.max)
+        if len(other.sketch):
+            self._add_hashes(other.sketch)
+        if other.counts:
+            self.counts.update(other.counts)
+            self._prune_counts()
+
+    def finalize(self) -> dict:
+        dtype = self.dtype or "object"  # What pandas infers for an empty column
+        col_profile = {
+            "dtype": dtype,
+            "num_missing": self.missing,
+            "num_unique": self._distinct(),
+        }
+        if _is_numeric(dtype):
+            nan = float("nan")
+            col_profile["mean"] = self.mean if self.count else nan
+            col_profile["std"] = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else nan
+            col_profile["min"] = self.min if self.count else nan
+            col_profile["max"] = self.max if self.count else nan
+        elif dtype in ("object", "category"):
+            col_profile["top_values"] = dict(self.counts.most_common(TOP_VALUES))
+        return col_profile
+
+    def _add_moments(self, count: int, mean: float, m2: float, minimum: float, maximum: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def _add_hashes(self, hashes: np.ndarray) -> None:
+        if len(self.sketch) >= SKETCH_SIZE:
+            hashes = hashes[hashes < self.sketch[-1]]
+        merged = np.sort(np.concatenate((self.sketch, hashes)))
+        if len(merged):
+            # Sort and drop repeats; np.unique is much slower on large uint64 arrays
+            merged = merged[np.concatenate(([True], merged[1:] != merged[:-1]))]
+        self.sketch = merged[:SKETCH_SIZE]
+
+    def _distinct(self) -> int:
+        if len(self.sketch) < SKETCH_SIZE:
+            return len(self.sketch)
+        # The k-th smallest of n uniform hashes lies near k / n of the hash range
+        fraction = (float(self.sketch[-1]) + 1.0) / 2.0**64
+        return int(round((SKETCH_SIZE - 1) / fraction))
+
+    def _prune_counts(self) -> None:
+        # Prune to half the cap so a high-cardinality column is not re-sorted every batch
+        if len(self.counts) > MAX_TRACKED_VALUES:
+            self.counts = Counter(dict(self.counts.most_common(MAX_TRACKED_VALUES // 2)))
+
+
+def merge_dtypes(a: Optional[str], b: str) -> str:
+    """
+    Dtype of a column read in parts that were inferred as a and b.
+
+    Args:
+        a: Dtype inferred so far (None if no part had values yet)
+        b: Dtype inferred for another part
+
+    Returns:
+        The common dtype: numeric parts widen to float64, anything else mixed is object
+    """
+    if a is None or a == b:
+        return b
+    if _is_numeric(a) and _is_numeric(b) and "bool" not in (a, b):
+        return "float64"
+    return "object"
+
+
+def is_numeric_column(column_profile: Dict[str, Any]) -> bool:
+    """
+    Whether a profiled column holds quantities, judged by its dtype.
+
+    Every numeric pandas dtype counts, nullable ones included, except
+    booleans: profiles summarise them like numbers, but they are flags to
+    group by rather than values to average, plot or compare with numbers.
+
+    Args:
+        column_profile: A column's entry in a profile's "columns"
+
+    Returns:
+        True for numeric, non-boolean columns
+    """
+    dtype = str(column_profile.get("dtype", ""))
+    return _is_numeric(dtype) and not dtype.lower().startswith("bool")
+
+
+def _is_numeric(dtype: str) -> bool:
+    try:
+        return pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype))
+    except TypeError:
+        return False
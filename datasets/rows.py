@@ -0,0 +1,201 @@
+# datasets/rows.py
+# Reads row ranges and column slices of stored datasets without loading them whole.
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+from datasets import storage
+from datasets.profile import is_numeric_column
+
+# Constants
+DEFAULT_LIMIT = 100  # Rows per page when the client does not ask
+MAX_LIMIT = 10_000  # Largest page served in one response
+_FILTER_PATTERN = re.compile(r"^(?P<column>[^<>=!]+)(?P<op>==|!=|>=|<=|>|<)(?P<value>.*)$")
+
+
+class RowFilter:
+    """A simple ``column <op> value`` predicate, e.g. ``price>=1000``."""
+
+    def __init__(self, column: str, op: str, value: Any):
+        """
+        Initialize the filter.
+
+        Args:
+            column: Column to compare
+            op: One of ==, !=, >=, <=, >, <
+            value: Value to compare against (already coerced to the column's type)
+        """
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"{self.column}{self.op}{self.value}"
+
+
+def parse_filters(specs: List[str], profile: Dict[str, Any]) -> List[RowFilter]:
+    """
+    Parse ``column<op>value`` filter strings against a dataset's profile.
+
+    Values of numeric columns are parsed as numbers; other values are
+    compared as strings. Rows with a missing value in a filtered column
+    never match.
+
+    Args:
+        specs: Filter strings, e.g. ["price>=1000", "fuel==diesel"]
+        profile: Dataset profile (for column names and dtypes)
+
+    Returns:
+        Parsed filters
+
+    Raises:
+        ValueError: If a filter is malformed, names an unknown column or
+            has a non-numeric value for a numeric column
+    """
+    columns = profile.get("columns", {})
+    filters = []
+    for spec in specs:
+        match = _FILTER_PATTERN.match(spec)
+        if not match:
+            raise ValueError(f"Invalid filter '{spec}', expected column<op>value with op in == != >= <= > <")
+        column, op, value = match.group("column").strip(), match.group("op"), match.group("value").strip()
+        if column not in columns:
+            raise ValueError(f"Unknown column in filter: {column}")
+        if is_numeric_column(columns[column]):
+            try:
+                value = float(value)
+            except ValueError:
+                raise ValueError(f"Filter on numeric column {column} needs a number, got '{value}'")
+        filters.append(RowFilter(column, op, value))
+    return filters
+
+
+def read_rows(
+    dataset_id: str,
+    offset: int = 0,
+    limit: int = DEFAULT_LIMIT,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[RowFilter]] = None,
+) -> Tuple[pd.DataFrame, bool]:
+    """
+    Read one page of a stored dataset.
+
+    Unfiltered pages are sliced straight out of the memory-mapped Arrow
+    copy, which touches only the selected columns' pages for the requested
+    range. Filtered pages, and datasets without an Arrow copy, are read
+    with DuckDB, which scans only the selected and filtered columns and
+    stops once the page is full.
+
+    Args:
+        dataset_id: Unique identifier for the dataset
+        offset: Number of (matching) rows to skip
+        limit: Maximum number of rows to return
+        columns: Columns to return, in order (all columns if None)
+        filters: Predicates rows must satisfy (all of them)
+
+    Returns:
+        Tuple of (page, has_more) where has_more tells whether rows remain
+        after this page
+
+    Raises:
+        FileNotFoundError: If the dataset does not exist
+        ValueError: If a requested column does not exist
+    """
+    profile = storage.load_profile(dataset_id)
+    known = list(profile.get("columns", {}))
+    columns = columns or known
+    unknown = [c for c in columns if c not in known]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+    table = storage.open_arrow(dataset_id)
+    if table is not None and not filters:
+        # Fetch one extra row to learn whether another page follows
+        page = table.select(columns).slice(offset, limit + 1).to_pandas()
+    else:
+        page = _query(dataset_id, table, offset, limit + 1, columns, filters or [])
+    return page.iloc[:limit], len(page) > limit
+
+
+def dataset_version(dataset_id: str) -> str:
+    """
+    Return a token that changes whenever the stored dataset changes.
+
+    Args:
+        dataset_id: Unique identifier for the dataset
+
+    Returns:
+        Version token derived from the CSV's size and modification time
+
+    Raises:
+        FileNotFoundError: If the dataset does not exist
+    """
+    stat = os.stat(os.path.join(storage.BASE_DIR, f"{dataset_id}{storage.CSV_EXTENSION}"))
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def page_etag(dataset_id: str, **query: Any) -> str:
+    """
+    Build an ETag for a page from the dataset version and the query.
+
+    Args:
+        dataset_id: Unique identifier for the dataset
+        **query: Every parameter that shapes the response
+
+    Returns:
+        Quoted strong ETag value
+
+    Raises:
+        FileNotFoundError: If the dataset does not exist
+    """
+    key = json.dumps([dataset_id, dataset_version(dataset_id), query], sort_keys=True, default=str)
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def _query(
+    dataset_id: str,
+    table: Any,
+    offset: int,
+    limit: int,
+    columns: List[str],
+    filters: List[RowFilter],
+) -> pd.DataFrame:
+    """Run a filtered page query with DuckDB over the Arrow copy or the CSV."""
+    select = ", ".join(_quote(c) for c in columns)
+    where = " AND ".join(_condition(f) for f in filters)
+    params: List[Any] = [f.value for f in filters]
+
+    # A private connection per call keeps this safe to use from any thread
+    with duckdb.connect() as conn:
+        if table is not None:
+            conn.register("dataset", table)
+            source = "dataset"
+        else:
+            source = "read_csv_auto(?)"
+            params.insert(0, os.path.join(storage.BASE_DIR, f"{dataset_id}{storage.CSV_EXTENSION}"))
+        sql = f"SELECT {select} FROM {source}"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " LIMIT ? OFFSET ?"
+        return conn.execute(sql, params + [limit, offset]).df()
+
+
+def _condition(row_filter: RowFilter) -> str:
+    """SQL predicate for a filter; rows with a missing value never match."""
+    column = _quote(row_filter.column)
+    condition = f"{column} {'=' if row_filter.op == '==' else row_filter.op} ?"
+    if isinstance(row_filter.value, float):
+        # The Arrow copy stores missing floats as NaN, which SQL orders above every number
+        condition += f" AND NOT isnan({column})"
+    return condition
+
+
+def _quote(column: str) -> str:
+    """Quote a column name as a SQL identifier."""
+    return '"' + column.replace('"', '""') + '"'
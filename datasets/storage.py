@@ -1,45 +1,71 @@
 # datasets/storage.py
 # Manages local file paths, identifiers, and metadata indexing.
 
+import copy
 import os
+import shutil
+import threading
 import pandas as pd
 import json
-from typing import Dict, Any, Tuple
+from functools import lru_cache
+from typing import IO, Dict, Any, Optional, Tuple
+
+from core.singleflight import SingleFlight
+from datasets.profile import profile_dataset
 
 # Constants
 BASE_DIR = "data_store"
 CSV_EXTENSION = ".csv"
 METADATA_EXTENSION = ".meta.json"
+ARROW_EXTENSION = ".arrow"
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+UPLOAD_EXTENSION = ".upload"  # Raw upload, kept only until it has been ingested
+UPLOAD_CHUNK_BYTES = 1024 * 1024  # Bytes copied at a time when spooling an upload
+REGISTER_BATCH_ROWS = 100_000  # Rows converted at a time when registering a Parquet file
+# Set AUTOSTAT_ARROW_CACHE=0 to always parse the CSV instead of memory-mapping an Arrow copy
+ARROW_CACHE = os.getenv("AUTOSTAT_ARROW_CACHE", "1") != "0"
+
+# Concurrent loads of the same dataset or profile share one read
+_inflight_datasets = SingleFlight("dataset")
+_inflight_profiles = SingleFlight("profile")
 
 
-def _ensure_dir() -> None:
+def _ensure_dir(base_dir: Optional[str] = None) -> None:
     """
     Ensure that the base directory for storing datasets exists.
     Creates the directory if it doesn't already exist.
     """
-    os.makedirs(BASE_DIR, exist_ok=True)
+    os.makedirs(base_dir or BASE_DIR, exist_ok=True)
 
 
-def save_dataset(dataset_id: str, df: pd.DataFrame, profile: Dict[str, Any]) -> None:
+def save_dataset(
+    dataset_id: str,
+    df: pd.DataFrame,
+    profile: Dict[str, Any],
+    base_dir: Optional[str] = None,
+) -> None:
     """
     Save a DataFrame and its associated profile metadata to disk.
 
     Files are saved with the dataset_id as the base filename:
     - Dataset: {dataset_id}.csv
     - Metadata: {dataset_id}.meta.json
+    - Arrow IPC copy: {dataset_id}.arrow (when pyarrow is available)
 
     Args:
         dataset_id: Unique identifier for the dataset
         df: The dataset to save as CSV
         profile: Metadata/profile information to save as JSON
+        base_dir: Storage directory (defaults to BASE_DIR)
 
     Note:
         The DataFrame is saved without the index to keep CSV files clean.
     """
-    _ensure_dir()
+    base_dir = base_dir or BASE_DIR
+    _ensure_dir(base_dir)
     
-    df_path = os.path.join(BASE_DIR, f"{dataset_id}{CSV_EXTENSION}")
-    meta_path = os.path.join(BASE_DIR, f"{dataset_id}{METADATA_EXTENSION}")
+    df_path = os.path.join(base_dir, f"{dataset_id}{CSV_EXTENSION}")
+    meta_path = os.path.join(base_dir, f"{dataset_id}{METADATA_EXTENSION}")
     
     # Save the DataFrame as a CSV file without index
     df.to_csv(df_path, index=False)
@@ -48,11 +74,253 @@ def save_dataset(dataset_id: str, df: pd.DataFrame, profile: Dict[str, Any]) ->
     with open(meta_path, "w") as f:
         json.dump(profile, f)
 
+    # Materialize the memory-mappable copy now, while the frame is in memory
+    materialize_arrow(dataset_id, df, base_dir=base_dir)
+
+
+def materialize_arrow(
+    dataset_id: str,
+    df: Optional[pd.DataFrame] = None,
+    base_dir: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Write a dataset as an uncompressed Arrow IPC file, once.
+
+    Uncompressed IPC files can be memory-mapped, so every worker process
+    reading the same dataset shares its pages through the OS page cache
+    instead of holding a private parsed copy.
+
+    Args:
+        dataset_id: Unique identifier for the dataset
+        df: The dataset, if already in memory (otherwise the CSV is parsed)
+        base_dir: Storage directory (defaults to BASE_DIR)
+
+    Returns:
+        Path of the Arrow file, or None if the cache is disabled, pyarrow
+        is not installed, or the data cannot be represented in Arrow
+    """
+    pa = arrow_module()
+    if pa is None or not ARROW_CACHE:
+        return None
+    base_dir = base_dir or BASE_DIR
+    path = os.path.join(base_dir, f"{dataset_id}{ARROW_EXTENSION}")
+    if os.path.exists(path):
+        return path
+
+    if df is None:
+        df = pd.read_csv(os.path.join(base_dir, f"{dataset_id}{CSV_EXTENSION}"))
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, column in enumerate(df.columns):
+            if df[column].dtype.kind == "f":
+                # Keep NaN as a float value rather than an Arrow null, so the
+                # column can still be read back without a copy
+                values = pa.array(df[column].to_numpy(), from_pandas=False)
+                table = table.set_column(i, table.field(i), values)
+    except pa.lib.ArrowException:
+        # e.g. object columns mixing numbers and strings: stay on CSV
+        return None
+
+    # Write to a private temp file and rename, so readers never see a partial file
+    tmp_path = f"{path}.tmp{os.getpid()}_{threading.get_ident()}"
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+@lru_cache(maxsize=None)
+def arrow_module() -> Any:
+    """Import pyarrow (with pyarrow.ipc) on first use; None when it is not installed."""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401  (registers pyarrow.ipc)
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def open_arrow(dataset_id: str) -> Any:
+    """
+    Memory-map a dataset's Arrow copy as a pyarrow Table.
+
+    Nothing is read until columns are accessed, so selecting and slicing
+    the table only touches the pages that are actually needed.
+
+    Args:
+        dataset_id: Unique identifier for the dataset
+
+    Returns:
+        A pyarrow Table, or None when no Arrow copy can be used
+    """
+    path = materialize_arrow(dataset_id)
+    if path is None:
+        return None
+    pa = arrow_module()
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+class UploadTooLarge(ValueError):
+    """Raised by spool_upload when an upload exceeds its size limit."""
+
+
+def spool_upload(
+    source: IO[bytes], dataset_id: str, base_dir: Optional[str] = None, max_bytes: Optional[int] = None
+) -> str:
+    """
+    Copy an upload stream to the storage directory, a chunk at a time.
+
+    Args:
+        source: Binary stream of the uploaded file
+        dataset_id: Identifier the upload will be stored under
+        base_dir: Storage directory (defaults to BASE_DIR)
+        max_bytes: Largest upload accepted (unlimited if None)
+
+    Returns:
+        Path of the spooled file; the caller removes it after ingest_csv
+
+    Raises:
+        UploadTooLarge: If the upload exceeds max_bytes; nothing is left on disk
+    """
+    base_dir = base_dir or BASE_DIR
+    _ensure_dir(base_dir)
+    path = os.path.join(base_dir, f"{dataset_id}{UPLOAD_EXTENSION}")
+    written = 0
+    try:
+        with open(path, "wb") as f:
+            while chunk := source.read(UPLOAD_CHUNK_BYTES):
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                f.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def ingest_csv(dataset_id: str, path: str, base_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse, profile and store an uploaded CSV in one call.
+
+    This is the CPU-heavy part of an upload and is meant to run in a worker
+    process, so only the path of the spooled upload goes in (see
+    spool_upload) and only the profile comes back; the data itself never
+    passes through the API process's memory.
+
+    Args:
+        dataset_id: Identifier to store the dataset under
+        path: CSV file to ingest
+        base_dir: Storage directory (pass it explicitly from the API process)
+
+    Returns:
+        The dataset profile
+
+    Raises:
+        ValueError: If the file cannot be parsed as CSV (pandas parser errors included)
+    """
+    df = pd.read_csv(path)
+    profile = profile_dataset(df)
+    save_dataset(dataset_id, df, profile, base_dir=base_dir)
+    return profile
+
+
+def register_file(
+    dataset_id: str,
+    path: str,
+    profile: Dict[str, Any],
+    base_dir: Optional[str] = None,
+) -> None:
+    """
+    Store a CSV or Parquet file as a dataset, with a profile computed elsewhere.
+
+    Unlike save_dataset, the data is never loaded whole, so files larger
+    than memory can be registered after being profiled by a streaming
+    pass (see cli/profile.py). CSV files are copied as they are; their
+    Arrow copy is created on first load, as for older datasets. Parquet
+    files are converted batch by batch into the stored CSV and, when
+    pyarrow allows, the Arrow copy. The metadata is written last, so a
+    dataset is not listed before its data is in place.
+
+    Args:
+        dataset_id: Identifier to store the dataset under
+        path: CSV or Parquet file
+        profile: The file's profile, in the format of profile_dataset
+        base_dir: Storage directory (defaults to BASE_DIR)
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ImportError: If a Parquet file is given and pyarrow is not installed
+    """
+    base_dir = base_dir or BASE_DIR
+    _ensure_dir(base_dir)
+    csv_path = os.path.join(base_dir, f"{dataset_id}{CSV_EXTENSION}")
+    suffix = f".tmp{os.getpid()}_{threading.get_ident()}"
+
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        _convert_parquet(path, list(profile["columns"]), csv_path, base_dir, dataset_id, suffix)
+    else:
+        shutil.copyfile(path, csv_path + suffix)
+        os.replace(csv_path + suffix, csv_path)
+        # A re-registered dataset must not be served from a stale Arrow copy
+        stale = os.path.join(base_dir, f"{dataset_id}{ARROW_EXTENSION}")
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    meta_path = os.path.join(base_dir, f"{dataset_id}{METADATA_EXTENSION}")
+    with open(meta_path + suffix, "w") as f:
+        json.dump(profile, f)
+    os.replace(meta_path + suffix, meta_path)
+
+
+def _convert_parquet(
+    path: str, columns: list, csv_path: str, base_dir: str, dataset_id: str, suffix: str
+) -> None:
+    """Stream a Parquet file into the stored CSV and Arrow copy."""
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    pa = arrow_module()
+    source = pq.ParquetFile(path)
+    arrow_path = os.path.join(base_dir, f"{dataset_id}{ARROW_EXTENSION}")
+    csv_writer = arrow_writer = None
+    try:
+        for batch in source.iter_batches(batch_size=REGISTER_BATCH_ROWS, columns=columns):
+            if csv_writer is None:
+                csv_writer = pa_csv.CSVWriter(csv_path + suffix, batch.schema)
+                if ARROW_CACHE:
+                    arrow_writer = pa.ipc.new_file(arrow_path + suffix, batch.schema)
+            csv_writer.write_batch(batch)
+            if arrow_writer is not None:
+                # Keep NaN as a float value rather than an Arrow null, as materialize_arrow does
+                arrays = [
+                    pc.fill_null(column, float("nan")) if pa.types.is_floating(column.type) else column
+                    for column in batch.columns
+                ]
+                arrow_writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=batch.schema))
+    finally:
+        for writer in (csv_writer, arrow_writer):
+            if writer is not None:
+                writer.close()
+
+    if csv_writer is None:  # No rows: just the header
+        pd.DataFrame(columns=columns).to_csv(csv_path + suffix, index=False)
+    os.replace(csv_path + suffix, csv_path)
+    if arrow_writer is not None:
+        os.replace(arrow_path + suffix, arrow_path)
+
 
 def load_dataset(dataset_id: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """
     Load a DataFrame and its associated profile metadata from disk.
 
+    When pyarrow is available the dataset is memory-mapped from its Arrow
+    IPC copy (created on first load for older datasets), so worker processes
+    share its pages; numeric columns are then read-only views. Otherwise the
+    CSV is parsed. Concurrent loads of the same dataset are coalesced;
+    callers share the DataFrame and must treat it as read-only.
+
     Args:
         dataset_id: Unique identifier for the dataset
 
@@ -63,17 +331,57 @@ def load_dataset(dataset_id: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         FileNotFoundError: If the dataset CSV file does not exist
         json.JSONDecodeError: If the metadata file is corrupted
     """
+    (df, profile), shared = _inflight_datasets.do((BASE_DIR, dataset_id), _read_dataset, dataset_id)
+    return df, (copy.deepcopy(profile) if shared else profile)
+
+
+def _read_dataset(dataset_id: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Read a dataset (Arrow copy or CSV) and its profile from disk."""
     df_path = os.path.join(BASE_DIR, f"{dataset_id}{CSV_EXTENSION}")
     meta_path = os.path.join(BASE_DIR, f"{dataset_id}{METADATA_EXTENSION}")
     
     if not os.path.exists(df_path):
         raise FileNotFoundError(f"Dataset {dataset_id} not found at {df_path}")
     
-    # Load the DataFrame from the CSV file
-    df = pd.read_csv(df_path)
+    # Prefer the memory-mapped Arrow copy; fall back to parsing the CSV.
+    # split_blocks keeps one block per column, so null-free numeric columns
+    # stay zero-copy views of the mapped file (read-only arrays)
+    table = open_arrow(dataset_id)
+    df = table.to_pandas(split_blocks=True) if table is not None else pd.read_csv(df_path)
     
     # Load the profile metadata from the JSON file
     with open(meta_path) as f:
         profile = json.load(f)
     
-    return df, profile
\ No newline at end of file
+    return df, profile
+
+
+def load_profile(dataset_id: str) -> Dict[str, Any]:
+    """
+    Load only the profile metadata of a stored dataset.
+
+    Planning needs the profile but not the data, so this avoids parsing
+    the CSV.
+
+    Args:
+        dataset_id: Unique identifier for the dataset
+
+    Returns:
+        The dataset's profile metadata
+
+    Raises:
+        FileNotFoundError: If the dataset metadata file does not exist
+    """
+    profile, shared = _inflight_profiles.do((BASE_DIR, dataset_id), _read_profile, dataset_id)
+    return copy.deepcopy(profile) if shared else profile
+
+
+def _read_profile(dataset_id: str) -> Dict[str, Any]:
+    """Read a dataset's profile metadata from disk."""
+    meta_path = os.path.join(BASE_DIR, f"{dataset_id}{METADATA_EXTENSION}")
+
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError(f"Dataset {dataset_id} not found at {meta_path}")
+
+    with open(meta_path) as f:
+        return json.load(f)
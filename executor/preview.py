@@ -0,0 +1,142 @@
+# executor/preview.py
+# Preview policy: caps tool output previews and spills full outputs to artifact files.
+
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from core.metrics import metrics
+from datasets.storage import arrow_module
+from executor.schemas import PreviewTruncation
+
+# Constants
+ARTIFACTS_DIR = "artifacts"
+PREVIEW_MAX_ROWS = int(os.getenv("AUTOSTAT_PREVIEW_MAX_ROWS", "50"))  # Records (or entries) kept in a preview
+PREVIEW_MAX_BYTES = int(os.getenv("AUTOSTAT_PREVIEW_MAX_BYTES", str(64 * 1024)))  # JSON size of a preview
+
+
+def bound_preview(
+    preview: Any,
+    tool: str,
+    max_rows: int = PREVIEW_MAX_ROWS,
+    max_bytes: int = PREVIEW_MAX_BYTES,
+) -> Tuple[Any, Optional[PreviewTruncation]]:
+    """
+    Cap a tool's preview to max_rows records and max_bytes of JSON.
+
+    Tabular previews (a DataFrame or a list of records) keep their leading
+    records; dict previews keep their leading keys, with nested lists and
+    dicts cut to max_rows entries. When anything is cut, the full output is
+    written to an artifact (Parquet when pyarrow is available, otherwise CSV;
+    JSON for dicts) so nothing is lost.
+
+    Args:
+        preview: The tool's "preview" output
+        tool: Tool name, used in the artifact file name
+        max_rows: Maximum records (or entries) kept
+        max_bytes: Maximum JSON size of the kept preview
+
+    Returns:
+        Tuple of (preview safe to embed in results, truncation metadata or None)
+    """
+    if preview is None:
+        return None, None
+    if isinstance(preview, pd.DataFrame):
+        return _bound_frame(preview, tool, max_rows, max_bytes)
+    if isinstance(preview, list):
+        if len(preview) <= max_rows and _json_size(preview) <= max_bytes:
+            return preview, None
+        return _bound_frame(pd.DataFrame(preview), tool, max_rows, max_bytes)
+    if isinstance(preview, dict):
+        return _bound_dict(preview, tool, max_rows, max_bytes)
+    return preview, None
+
+
+def _bound_frame(
+    frame: pd.DataFrame, tool: str, max_rows: int, max_bytes: int
+) -> Tuple[List[Dict[str, Any]], Optional[PreviewTruncation]]:
+    """Keep the leading records of a table that fit both limits."""
+    # to_json maps NaN to null and numpy scalars to plain JSON values
+    records = json.loads(frame.head(max_rows).to_json(orient="records", double_precision=15))
+    kept, size = _take_within(records, max_bytes)
+    if len(kept) == len(frame):
+        return kept, None
+    path = _spill_frame(frame, tool)
+    return kept, _truncation(len(frame), len(kept), size, path, tool)
+
+
+def _bound_dict(
+    preview: Dict[str, Any], tool: str, max_rows: int, max_bytes: int
+) -> Tuple[Dict[str, Any], Optional[PreviewTruncation]]:
+    """Cap nested collections and keep the leading keys of a dict that fit max_bytes."""
+    total = _json_size(preview)
+    if total <= max_bytes and not any(isinstance(v, (list, dict)) and len(v) > max_rows for v in preview.values()):
+        return preview, None
+
+    capped = {key: _cap(value, max_rows) for key, value in preview.items()}
+    kept: Dict[str, Any] = {}
+    size = 2  # "{}"
+    for key, value in capped.items():
+        item = _json_size({key: value})
+        if size + item > max_bytes:
+            break
+        kept[key] = value
+        size += item
+
+    path = os.path.join(ARTIFACTS_DIR, f"{tool}_full_{uuid.uuid4().hex[:8]}.json")
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(preview, f, default=str)
+    entries = sum(len(v) if isinstance(v, (list, dict)) else 1 for v in preview.values())
+    kept_entries = sum(len(v) if isinstance(v, (list, dict)) else 1 for v in kept.values())
+    return kept, _truncation(entries, kept_entries, size, path, tool)
+
+
+def _cap(value: Any, max_rows: int) -> Any:
+    """Cut a nested list or dict to its first max_rows entries."""
+    if isinstance(value, list):
+        return value[:max_rows]
+    if isinstance(value, dict) and len(value) > max_rows:
+        return dict(list(value.items())[:max_rows])
+    return value
+
+
+def _take_within(records: List[Dict[str, Any]], max_bytes: int) -> Tuple[List[Dict[str, Any]], int]:
+    """Leading records whose JSON array fits max_bytes, and that array's size."""
+    kept, size = [], 2  # "[]"
+    for record in records:
+        item = _json_size(record) + 2  # ", " separator
+        if size + item > max_bytes:
+            break
+        kept.append(record)
+        size += item
+    return kept, size
+
+
+def _spill_frame(frame: pd.DataFrame, tool: str) -> str:
+    """Write a full tabular output to Parquet (or CSV without pyarrow)."""
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    base = os.path.join(ARTIFACTS_DIR, f"{tool}_full_{uuid.uuid4().hex[:8]}")
+    if arrow_module() is not None:
+        try:
+            frame.to_parquet(f"{base}.parquet", index=False)
+            return f"{base}.parquet"
+        except (ValueError, TypeError, arrow_module().lib.ArrowException):
+            pass  # e.g. object columns mixing types; CSV takes anything
+    frame.to_csv(f"{base}.csv", index=False)
+    return f"{base}.csv"
+
+
+def _truncation(total: int, kept: int, size: int, path: str, tool: str) -> PreviewTruncation:
+    """Build truncation metadata and count the spill."""
+    metrics.incr("executor.previews_truncated")
+    metrics.incr(f"executor.previews_truncated.{tool}")
+    return PreviewTruncation(total_rows=total, preview_rows=kept, preview_bytes=size, full_output_path=path)
+
+
+def _json_size(value: Any) -> int:
+    """Size of a value serialized as JSON."""
+    return len(json.dumps(value, default=str))
@@ -1,13 +1,30 @@
 # executor/runner.py
 # Orchestrates the execution of PlanStep, including artefact handling.
 
-from typing import Optional
+import json
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from core.singleflight import SingleFlight
 from core.state import PromptState
-from planner.schemas import PlanStep
+from planner.optimizer import cost_report, optimize_plan, original_preview
+from planner.processing import _normalize_args
+from planner.schemas import CostReport, PlanStep
+from executor.preview import bound_preview
 from executor.schemas import ExecutionResult
 from executor.registry import TOOL_REGISTRY
 from executor.utils import coerce_args, validate_args
 
+# Identical steps on the same stored dataset, run concurrently, execute once
+_inflight_steps = SingleFlight("step")
+
+
+class _ToolRun(NamedTuple):
+    """A tool's uncapped output, shared by every original step a merged step answers."""
+
+    output: Optional[Dict[str, Any]]
+    error: Optional[str] = None
+    duration_ms: Optional[float] = None
+
 
 def run_step(step: PlanStep, ctx: PromptState) -> ExecutionResult:
     """
@@ -20,13 +37,48 @@ def run_step(step: PlanStep, ctx: PromptState) -> ExecutionResult:
     Returns:
         ExecutionResult with success/error status and any artifacts produced
     """
+    return run_merged_step(step, [step], ctx)[0]
+
+
+def run_merged_step(step: PlanStep, originals: List[PlanStep], ctx: PromptState) -> List[ExecutionResult]:
+    """
+    Execute a step once and build a result for each original step it covers.
+
+    Each original step's preview is cut from the tool's full output (see
+    original_preview) and only then capped, so its preview and truncation
+    count its own rows rather than those of the merged step.
+
+    When the context names a stored dataset, concurrent executions of the
+    same tool and arguments on it are coalesced and share the tool output.
+    If a step covering several original steps fails, each of them is run
+    on its own, so that one bad step does not fail the others.
+
+    Args:
+        step: The step to execute, possibly merged by the optimizer
+        originals: Planned steps whose results it produces
+        ctx: Context containing the dataset and other execution state
+
+    Returns:
+        One result per original step, in the given order
+    """
+    if ctx.dataset_id is None:
+        run = _execute_step(step, ctx)
+    else:
+        key = (ctx.dataset_id, step.tool, json.dumps(_normalize_args(step.args), sort_keys=True, default=str))
+        run, _ = _inflight_steps.do(key, _execute_step, step, ctx)
+    if run.output is None and len(originals) > 1:
+        return [
+            _step_result(original, step, run) if original is step else run_merged_step(original, [original], ctx)[0]
+            for original in originals
+        ]
+    return [_step_result(original, step, run) for original in originals]
+
+
+def _execute_step(step: PlanStep, ctx: PromptState) -> _ToolRun:
+    """Validate a step's arguments and run its tool."""
     tool_fn = TOOL_REGISTRY.get(step.tool)
     if not tool_fn:
-        return ExecutionResult(
-            step_id=step.step_id,
-            status="error",
-            error=f"Tool '{step.tool}' not found"
-        )
+        return _ToolRun(None, error=f"Tool '{step.tool}' not found")
 
     # Central argument coercion and validation
     safe_args = coerce_args(step.tool, step.args)
@@ -34,24 +86,94 @@ def run_step(step: PlanStep, ctx: PromptState) -> ExecutionResult:
     # Re-validate after coercion
     is_valid, validation_error = validate_args(step.tool, safe_args)
     if not is_valid:
-        return ExecutionResult(
-            step_id=step.step_id,
-            status="error",
-            error=f"Arg validation failed: {validation_error}"
-        )
+        return _ToolRun(None, error=f"Arg validation failed: {validation_error}")
 
     # Execute the tool
+    start = time.perf_counter()
     try:
         output = tool_fn(ctx.dataframe, **safe_args)
+        return _ToolRun(output, duration_ms=(time.perf_counter() - start) * 1000)
+    except Exception as exc:
+        return _ToolRun(None, error=str(exc), duration_ms=(time.perf_counter() - start) * 1000)
+
+
+def _step_result(original: PlanStep, step: PlanStep, run: _ToolRun) -> ExecutionResult:
+    """Build an original step's result from the run of the step that covers it, capping its preview."""
+    if run.output is None:
+        return ExecutionResult(step_id=original.step_id, status="error", error=run.error, duration_ms=run.duration_ms)
+    try:
+        preview = run.output.get("preview")
+        if original is not step:
+            preview = original_preview(original, preview)
+        preview, truncation = bound_preview(preview, original.tool)
         return ExecutionResult(
-            step_id=step.step_id,
+            step_id=original.step_id,
             status="success",
-            output_preview=output.get("preview"),
-            artifact_path=output.get("artifact")
+            output_preview=preview,
+            artifact_path=run.output.get("artifact"),
+            duration_ms=run.duration_ms,
+            truncation=truncation
         )
     except Exception as exc:
         return ExecutionResult(
-            step_id=step.step_id,
+            step_id=original.step_id,
             status="error",
-            error=str(exc)
+            error=str(exc),
+            duration_ms=run.duration_ms
         )
+
+
+def run_plan(
+    steps: List[PlanStep],
+    ctx: PromptState,
+    optimize: bool = True,
+    on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Tuple[List[ExecutionResult], Optional[CostReport]]:
+    """
+    Execute a whole plan, optionally through the cost-based optimizer.
+    
+    With optimization, merged steps run once (cheapest first) and their
+    outputs are expanded back so that each original step gets its own
+    result, with its own capped preview; the summarizer can therefore keep
+    working on the original plan.
+    
+    Args:
+        steps: Plan steps as produced by the planner
+        ctx: Context containing the dataset and its profile
+        optimize: If False, run the steps as planned
+        on_event: Progress callback receiving ("step_started", payload) before
+            each executed step and ("step_finished", payload) with the result
+            of every original step it covers
+        
+    Returns:
+        Tuple of (one result per original step in plan order,
+        cost report or None when not optimized)
+    """
+    optimized = optimize_plan(steps, ctx.profile) if optimize else None
+    to_run = optimized.steps if optimized else steps
+    covers: Dict[str, List[PlanStep]] = {}
+    for step in steps if optimized else []:
+        covers.setdefault(optimized.provenance.get(step.step_id, step.step_id), []).append(step)
+
+    executed = []
+    results: Dict[str, ExecutionResult] = {}
+    for step in to_run:
+        originals = covers.get(step.step_id, [step])
+        if on_event:
+            on_event("step_started", {
+                "step_id": step.step_id,
+                "tool": step.tool,
+                "description": step.description,
+                "covers": [s.step_id for s in originals],
+            })
+        finished = run_merged_step(step, originals, ctx)
+        executed.append(finished[0])  # Carries the step's measured duration
+        for item in finished:
+            results[item.step_id] = item
+            if on_event:
+                on_event("step_finished", {"step_id": item.step_id, "result": item.model_dump()})
+
+    if not optimized:
+        return executed, None
+    report = cost_report(optimized, executed, steps_before=len(steps))
+    return [results[s.step_id] for s in steps], report
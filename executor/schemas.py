@@ -8,6 +8,21 @@ from pydantic import BaseModel, Field
 ExecutionStatus = Literal["success", "error"]
 
 
+class PreviewTruncation(BaseModel):
+    """
+    Describes how a step's output preview was capped.
+
+    Set on ExecutionResult when the full output exceeded the preview limits;
+    the full output is then available at full_output_path.
+    """
+    total_rows: int = Field(..., description="Rows (or entries) in the full output")
+    preview_rows: int = Field(..., description="Rows (or entries) kept in output_preview")
+    preview_bytes: int = Field(..., description="Size of the capped preview as JSON, in bytes")
+    full_output_path: Optional[str] = Field(
+        None, description="Artifact holding the full output (Parquet, CSV or JSON)"
+    )
+
+
 class ExecutionResult(BaseModel):
     """
     Result of executing a single plan step.
@@ -25,4 +40,10 @@ class ExecutionResult(BaseModel):
     )
     error: Optional[str] = Field(
         None, description="Error message if status is 'error'"
+    )
+    duration_ms: Optional[float] = Field(
+        None, description="Wall-clock time spent executing the step, in milliseconds"
+    )
+    truncation: Optional[PreviewTruncation] = Field(
+        None, description="Set when output_preview was capped; points at the full output"
     )
\ No newline at end of file
@@ -44,7 +44,8 @@ def run_summary_stats(
         by: Optional grouping column name
         
     Returns:
-        Dictionary with 'preview' (list of records) and 'artifact' (None)
+        Dictionary with 'preview' (DataFrame of statistics, one row per column
+        or group; the runner's preview policy caps it) and 'artifact' (None)
     """
     # Ungrouped analysis: simple describe() with stats as rows
     if by is None:
@@ -54,8 +55,7 @@ def run_summary_stats(
             .T.reset_index()
             .rename(columns={"index": "column"})
         )
-        preview = preview_df.to_dict(orient="records")
-        return {"preview": preview, "artifact": None}
+        return {"preview": preview_df, "artifact": None}
 
     # Grouped analysis: describe() after groupby
     described = df.groupby(by)[columns].describe().reset_index()
@@ -65,8 +65,9 @@ def run_summary_stats(
     col_order = [by] + [c for c in described.columns if c != by]
     described = described[col_order]
 
-    preview = described.to_dict(orient="records")
-    return {"preview": preview, "artifact": None}
+    # One row per group, so the table can be huge for high-cardinality columns;
+    # returned as a frame so only the capped preview becomes records
+    return {"preview": described, "artifact": None}
 
 
 def run_eda_overview(df: pd.DataFrame) -> Dict[str, Optional[Any]]:
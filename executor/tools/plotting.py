@@ -1,16 +1,21 @@
 # executor/tools/plotting.py
 # Plotting tools for the executor component, providing visualizations like boxplots and histograms.
 
-import matplotlib.pyplot as plt
+import math
 import pandas as pd
 import uuid
 import os
+from matplotlib.figure import Figure
 from typing import Dict, List, Optional, Any
 
 # Constants
 ARTIFACTS_DIR = "artifacts"
 DEFAULT_HISTOGRAM_BINS = 20
 
+# Plots are drawn on their own Figure objects with matplotlib's Axes API. pyplot
+# and pandas' plotting helpers go through pyplot's global "current figure",
+# which steps of concurrent runs plotting on several threads would share.
+
 
 def run_histogram(df: pd.DataFrame, columns: List[str]) -> Dict[str, Optional[Any]]:
     """
@@ -26,10 +31,19 @@ def run_histogram(df: pd.DataFrame, columns: List[str]) -> Dict[str, Optional[An
     path = f"{ARTIFACTS_DIR}/hist_{uuid.uuid4().hex[:8]}.png"
     os.makedirs(ARTIFACTS_DIR, exist_ok=True)
 
-    df[columns].hist(bins=DEFAULT_HISTOGRAM_BINS)
-    plt.tight_layout()
-    plt.savefig(path)
-    plt.close()
+    # One subplot per column in a near-square grid, as DataFrame.hist lays them out
+    ncols = math.ceil(math.sqrt(len(columns)))
+    nrows = math.ceil(len(columns) / ncols)
+    fig = Figure()
+    axes = fig.subplots(nrows, ncols, squeeze=False).ravel()
+    for ax, column in zip(axes, columns):
+        ax.hist(df[column].dropna().to_numpy(), bins=DEFAULT_HISTOGRAM_BINS)
+        ax.grid(True)
+        ax.set_title(column)
+    for ax in axes[len(columns):]:
+        ax.set_visible(False)
+    fig.tight_layout()
+    fig.savefig(path)
 
     return {"preview": None, "artifact": path}
 
@@ -49,9 +63,15 @@ def run_boxplot(df: pd.DataFrame, x: str, y: str) -> Dict[str, Optional[Any]]:
     path = f"{ARTIFACTS_DIR}/box_{uuid.uuid4().hex[:8]}.png"
     os.makedirs(ARTIFACTS_DIR, exist_ok=True)
 
-    df.boxplot(column=[y], by=x)
-    plt.tight_layout()
-    plt.savefig(path)
-    plt.close()
+    groups = [(str(level), values.dropna().to_numpy()) for level, values in df.groupby(x)[y]]
+    fig = Figure()
+    ax = fig.subplots()
+    ax.boxplot([values for _, values in groups], tick_labels=[level for level, _ in groups])
+    ax.grid(True)
+    ax.set_title(y)
+    ax.set_xlabel(x)
+    fig.suptitle(f"Boxplot grouped by {x}")
+    fig.tight_layout()
+    fig.savefig(path)
 
     return {"preview": None, "artifact": path}
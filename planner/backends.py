@@ -0,0 +1,496 @@
+# planner/backends.py
+# Pool of LLM model servers with health checks, least-outstanding routing and hedged requests.
+
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from core.metrics import metrics
+
+# Constants
+DEFAULT_OLLAMA_HOST = "http://localhost:11434"
+OLLAMA_HOSTS = [h.strip() for h in os.getenv("AUTOSTAT_OLLAMA_HOSTS", DEFAULT_OLLAMA_HOST).split(",") if h.strip()]
+OLLAMA_GENERATE_ENDPOINT = "/api/generate"
+OLLAMA_HEALTH_ENDPOINT = "/api/tags"
+REQUEST_TIMEOUT = 300.0  # Seconds for a single generate call
+HEALTH_TIMEOUT = 2.0
+HEALTH_INTERVAL = 15.0  # Seconds between background health checks
+HEDGE_QUANTILE = 0.95  # Fire the hedge once the primary exceeds this latency quantile
+MIN_HEDGE_SAMPLES = 20  # Latency samples needed before the quantile is trusted
+DEFAULT_HEDGE_DELAY = 10.0  # Seconds, used until enough samples exist
+LATENCY_WINDOW = 256
+
+
+class BackendError(RuntimeError):
+    """Raised when a model server returns an error or cannot be reached."""
+
+
+class LLMBackend:
+    """
+    One model server endpoint with its own health flag and latency stats.
+    """
+
+    def __init__(self, host: str):
+        """
+        Initialize a backend.
+
+        Args:
+            host: Base URL such as ``http://gpu-1:11434``
+        """
+        parts = urlsplit(host)
+        self.host = host.rstrip("/")
+        self._hostname = parts.hostname or "localhost"
+        self._port = parts.port or (443 if parts.scheme == "https" else 80)
+        self._https = parts.scheme == "https"
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def generate(self, payload: Dict[str, Any], attempt: Optional["_Attempt"] = None) -> Dict[str, Any]:
+        """
+        Send a generate request and return the decoded JSON response.
+
+        Args:
+            payload: Ollama /api/generate payload
+            attempt: Optional handle that lets another thread abort the call
+
+        Returns:
+            Decoded response body
+
+        Raises:
+            BackendError: On connection failures or non-2xx responses
+        """
+        with self._lock:
+            self.outstanding += 1
+            self.requests += 1
+        self._publish()
+        start = time.perf_counter()
+        try:
+            status, body = self._request("POST", OLLAMA_GENERATE_ENDPOINT, payload, REQUEST_TIMEOUT, attempt)
+            if status >= 300:
+                raise BackendError(f"{self.host} returned HTTP {status}: {body[:200]!r}")
+            result = json.loads(body)
+        except (OSError, http.client.HTTPException, ValueError) as exc:
+            with self._lock:
+                self.errors += 1
+            if attempt is None or not attempt.cancelled:
+                self.healthy = False
+            raise BackendError(f"{self.host}: {exc}") from exc
+        except BackendError:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.outstanding -= 1
+            self._publish()
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._latencies.append(elapsed)
+        metrics.observe(f"llm.backend.{self.host}.seconds", elapsed)
+        return result
+
+    def generate_stream(self, payload: Dict[str, Any]) -> Iterator[str]:
+        """
+        Send a streaming generate request and yield response text as it arrives.
+
+        Args:
+            payload: Ollama /api/generate payload (``stream`` is forced on)
+
+        Yields:
+            Successive fragments of the model's response
+
+        Raises:
+            BackendError: On connection failures, non-2xx responses or an
+                error reported mid-stream
+        """
+        with self._lock:
+            self.outstanding += 1
+            self.requests += 1
+        self._publish()
+        start = time.perf_counter()
+        conn_cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        conn = conn_cls(self._hostname, self._port, timeout=REQUEST_TIMEOUT)
+        try:
+            conn.request(
+                "POST",
+                OLLAMA_GENERATE_ENDPOINT,
+                body=json.dumps({**payload, "stream": True}).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+            )
+            response = conn.getresponse()
+            if response.status >= 300:
+                raise BackendError(f"{self.host} returned HTTP {response.status}: {response.read()[:200]!r}")
+            # Ollama streams one JSON object per line
+            for line in response:
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if message.get("error"):
+                    raise BackendError(f"{self.host}: {message['error']}")
+                if message.get("response"):
+                    yield message["response"]
+                if message.get("done"):
+                    break
+        except (OSError, http.client.HTTPException, ValueError) as exc:
+            with self._lock:
+                self.errors += 1
+            self.healthy = False
+            raise BackendError(f"{self.host}: {exc}") from exc
+        except BackendError:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            conn.close()
+            with self._lock:
+                self.outstanding -= 1
+            self._publish()
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._latencies.append(elapsed)
+        metrics.observe(f"llm.backend.{self.host}.seconds", elapsed)
+
+    def check_health(self) -> bool:
+        """
+        Probe the server and update the health flag.
+
+        Returns:
+            True if the server answered successfully
+        """
+        try:
+            status, _ = self._request("GET", OLLAMA_HEALTH_ENDPOINT, None, HEALTH_TIMEOUT)
+            self.healthy = status < 300
+        except (OSError, http.client.HTTPException):
+            self.healthy = False
+        self._publish()
+        return self.healthy
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """Return the q-quantile of recent latencies, or None with too few samples."""
+        with self._lock:
+            if len(self._latencies) < MIN_HEDGE_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return _quantile(ordered, q)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return health, load and latency statistics for this backend."""
+        with self._lock:
+            ordered = sorted(self._latencies)
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "p50_seconds": _quantile(ordered, 0.50),
+            "p95_seconds": _quantile(ordered, 0.95),
+        }
+
+    def _publish(self) -> None:
+        """Mirror load and health into the metrics registry."""
+        metrics.set_gauge(f"llm.backend.{self.host}.outstanding", self.outstanding)
+        metrics.set_gauge(f"llm.backend.{self.host}.healthy", 1 if self.healthy else 0)
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]],
+        timeout: float,
+        attempt: Optional["_Attempt"] = None,
+    ) -> Tuple[int, bytes]:
+        """Perform one HTTP request on a fresh connection."""
+        conn_cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        conn = conn_cls(self._hostname, self._port, timeout=timeout)
+        if attempt is not None:
+            attempt.bind(conn)
+        try:
+            body = json.dumps(payload).encode("utf-8") if payload is not None else None
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+
+def _quantile(ordered: Sequence[float], q: float) -> Optional[float]:
+    """Return the q-quantile of a sorted sequence, or None if it is empty."""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Attempt:
+    """Handle to an in-flight request that can be aborted from another thread."""
+
+    def __init__(self) -> None:
+        self.cancelled = False
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._lock = threading.Lock()
+
+    def bind(self, conn: http.client.HTTPConnection) -> None:
+        """Attach the connection used by the request."""
+        with self._lock:
+            if self.cancelled:
+                raise ConnectionAbortedError("request cancelled before it was sent")
+            self._conn = conn
+
+    def cancel(self) -> None:
+        """Abort the request by shutting down its socket; the server stops generating."""
+        with self._lock:
+            self.cancelled = True
+            sock = self._conn.sock if self._conn is not None else None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class BackendPool:
+    """
+    Routes generate requests across several model servers.
+
+    Requests go to the healthy backend with the fewest outstanding requests
+    (ties broken by recent median latency). Failed backends are marked
+    unhealthy and the request fails over to the next one. With hedging
+    enabled, a second request is sent to another backend once the first
+    has been running longer than that backend's p95 latency; the first
+    response wins and the slower request is aborted.
+    """
+
+    def __init__(self, hosts: Iterable[str], hedge: bool = False, hedge_quantile: float = HEDGE_QUANTILE):
+        """
+        Initialize the pool.
+
+        Args:
+            hosts: Base URLs of the model servers
+            hedge: Enable hedged requests
+            hedge_quantile: Latency quantile after which the hedge is fired
+        """
+        self.backends: List[LLMBackend] = [LLMBackend(h) for h in hosts]
+        if not self.backends:
+            raise ValueError("BackendPool needs at least one host")
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self._executor = ThreadPoolExecutor(max_workers=max(4, 4 * len(self.backends)), thread_name_prefix="llm")
+        self._health_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def pick(self, exclude: Iterable[LLMBackend] = ()) -> Optional[LLMBackend]:
+        """
+        Choose the least loaded healthy backend.
+
+        Unhealthy backends are only used when no healthy one remains.
+
+        Args:
+            exclude: Backends that must not be chosen
+
+        Returns:
+            The selected backend, or None if every backend is excluded
+        """
+        excluded = set(map(id, exclude))
+        candidates = [b for b in self.backends if id(b) not in excluded]
+        if not candidates:
+            return None
+        healthy = [b for b in candidates if b.healthy] or candidates
+        return min(healthy, key=lambda b: (b.outstanding, b.latency_quantile(0.5) or 0.0))
+
+    def generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a generate request on the pool.
+
+        Args:
+            payload: Ollama /api/generate payload (non-streaming)
+
+        Returns:
+            Decoded response body from whichever backend answered first
+
+        Raises:
+            BackendError: If every backend failed
+        """
+        if self.hedge and len(self.backends) > 1:
+            return self._generate_hedged(payload)
+        return self._generate_with_failover(payload)
+
+    def generate_stream(self, payload: Dict[str, Any]) -> Iterator[str]:
+        """
+        Run a streaming generate request on the pool.
+
+        Fails over to the next backend only until the first fragment has
+        arrived; after that an error ends the stream. Streams are never
+        hedged.
+
+        Args:
+            payload: Ollama /api/generate payload
+
+        Yields:
+            Successive fragments of the model's response
+
+        Raises:
+            BackendError: If every backend failed, or the chosen one failed mid-stream
+        """
+        tried: List[LLMBackend] = []
+        last_error: Optional[BackendError] = None
+        while True:
+            backend = self.pick(exclude=tried)
+            if backend is None:
+                raise last_error or BackendError("No backend available")
+            stream = backend.generate_stream(payload)
+            try:
+                first = next(stream, None)
+            except BackendError as exc:
+                metrics.incr("llm.failovers")
+                last_error = exc
+                tried.append(backend)
+                continue
+            if first is not None:
+                yield first
+            yield from stream
+            return
+
+    def warm_up(self, payload: Dict[str, Any]) -> None:
+        """
+        Send the same request to every backend (e.g. to prefill a prompt prefix).
+
+        Args:
+            payload: Ollama /api/generate payload
+
+        Raises:
+            BackendError: If no backend could be warmed up
+        """
+        futures = [self._executor.submit(b.generate, payload) for b in self.backends]
+        errors = [f.exception() for f in futures]
+        if all(errors):
+            raise BackendError(f"Warm-up failed on all backends: {errors[0]}")
+
+    def check_health(self) -> Dict[str, bool]:
+        """Probe every backend and return host -> healthy."""
+        return {b.host: b.check_health() for b in self.backends}
+
+    def start_health_checks(self, interval: float = HEALTH_INTERVAL) -> None:
+        """
+        Probe backends periodically in a daemon thread so unhealthy ones recover.
+
+        Args:
+            interval: Seconds between probes
+        """
+        if self._health_thread is not None:
+            return
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                self.check_health()
+
+        self._health_thread = threading.Thread(target=loop, name="llm-health", daemon=True)
+        self._health_thread.start()
+
+    def close(self) -> None:
+        """Stop health checks and release worker threads."""
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-backend statistics keyed by host."""
+        return {b.host: b.stats() for b in self.backends}
+
+    def _generate_with_failover(self, payload: Dict[str, Any], tried: Optional[List[LLMBackend]] = None) -> Dict[str, Any]:
+        """Try backends in routing order until one succeeds."""
+        tried = list(tried or [])
+        last_error: Optional[BackendError] = None
+        while True:
+            backend = self.pick(exclude=tried)
+            if backend is None:
+                raise last_error or BackendError("No backend available")
+            try:
+                return backend.generate(payload)
+            except BackendError as exc:
+                metrics.incr("llm.failovers")
+                last_error = exc
+                tried.append(backend)
+
+    def _generate_hedged(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send to one backend, then hedge to a second after its p95 latency."""
+        primary = self.pick()
+        attempts: Dict[Future, _Attempt] = {}
+        backends: Dict[Future, LLMBackend] = {}
+
+        def launch(backend: LLMBackend) -> None:
+            # A dedicated thread, not the shared executor: queueing there would
+            # count towards the hedge delay and hold back the hedge itself
+            attempt = _Attempt()
+            future = _start_thread(backend.generate, payload, attempt)
+            attempts[future] = attempt
+            backends[future] = backend
+
+        launch(primary)
+        delay = primary.latency_quantile(self.hedge_quantile) or DEFAULT_HEDGE_DELAY
+        done, pending = wait(list(attempts), timeout=delay)
+        if not done:
+            secondary = self.pick(exclude=[primary])
+            if secondary is not None:
+                metrics.incr("llm.hedges")
+                launch(secondary)
+
+        pending = set(attempts)
+        errors: List[BaseException] = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        attempts[other].cancel()
+                    if backends[future] is not primary:
+                        metrics.incr("llm.hedge_wins")
+                    return future.result()
+                errors.append(future.exception())
+
+        # Every launched attempt failed: fall back to the remaining backends
+        metrics.incr("llm.failovers")
+        try:
+            return self._generate_with_failover(payload, tried=list(backends.values()))
+        except BackendError:
+            raise BackendError(f"All backends failed: {errors[0]}") from errors[0]
+
+
+def _start_thread(fn: Any, *args: Any) -> Future:
+    """Run fn(*args) on a new daemon thread and return a future of its result."""
+    future: Future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run() -> None:
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, name="llm-hedge", daemon=True).start()
+    return future
+
+
+_default_pool: Optional[BackendPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_backend_pool() -> BackendPool:
+    """Return the process-wide pool built from AUTOSTAT_OLLAMA_HOSTS."""
+    global _default_pool
+    with _pool_lock:
+        if _default_pool is None:
+            hedge = os.getenv("AUTOSTAT_LLM_HEDGE", "0") == "1"
+            _default_pool = BackendPool(OLLAMA_HOSTS, hedge=hedge)
+        return _default_pool
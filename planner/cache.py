@@ -0,0 +1,240 @@
+# planner/cache.py
+# Persistent plan cache keyed by question, profile fingerprint, model and prompt version.
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from planner.parsing import _load_plan_steps
+from planner.schemas import PlanStep
+
+# Constants
+PLAN_CACHE_DIR = os.path.join("cache", "plans")
+PLAN_CACHE_MAX_ENTRIES = 256
+PLAN_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a research question so trivially different phrasings share a key.
+
+    Lower-cases, collapses whitespace and strips trailing punctuation.
+
+    Args:
+        question: Raw question text
+
+    Returns:
+        Normalized question string
+    """
+    text = re.sub(r"\s+", " ", question.strip().lower())
+    return text.rstrip("?.! ")
+
+
+def profile_fingerprint(profile: Dict[str, Any]) -> str:
+    """
+    Compute a structural fingerprint of a dataset profile.
+
+    Only column names and dtypes are considered, so re-uploads of the same
+    schema with different values share cached plans.
+
+    Args:
+        profile: Dataset profile as produced by profile_dataset
+
+    Returns:
+        Hex digest identifying the profile structure
+    """
+    columns = profile.get("columns", {})
+    structure = sorted((name, meta.get("dtype", "")) for name, meta in columns.items())
+    return _digest(json.dumps(structure))
+
+
+def make_cache_key(question: str, profile: Dict[str, Any], model: str, prompt_version: str) -> str:
+    """
+    Build the cache key for a planning request.
+
+    Args:
+        question: Research question (normalized internally)
+        profile: Dataset profile
+        model: Model name used for generation
+        prompt_version: Hash of the prompt template and tool spec
+
+    Returns:
+        Hex digest usable as a cache key
+    """
+    parts = [normalize_question(question), profile_fingerprint(profile), model, prompt_version]
+    return _digest("\x1f".join(parts))
+
+
+def _digest(text: str) -> str:
+    """Return the SHA-256 hex digest of a string."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    """
+    Two-level plan cache: an in-memory LRU in front of an on-disk JSON store.
+
+    Entries hold the step payloads (description, tool, args) without step IDs;
+    hits are re-validated into fresh PlanStep objects with new step IDs.
+    """
+
+    def __init__(
+        self,
+        root: str = PLAN_CACHE_DIR,
+        max_entries: int = PLAN_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = PLAN_CACHE_TTL_SECONDS,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            root: Directory for the on-disk store
+            max_entries: Capacity of the in-memory LRU
+            ttl_seconds: Entry lifetime; older entries are treated as misses
+        """
+        self.root = root
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[PlanStep]]:
+        """
+        Look up a cached plan.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            Validated plan steps with fresh step IDs, or None on a miss
+        """
+        entry = self._get_entry(key)
+        steps = None
+        if entry is not None:
+            try:
+                steps = _load_plan_steps(entry)
+            except Exception:
+                # Entry no longer validates against the schema: drop it
+                self.invalidate(key)
+
+        with self._lock:
+            if steps is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return steps
+
+    def put(self, key: str, steps: List[PlanStep]) -> None:
+        """
+        Store a plan under the given key in memory and on disk.
+
+        Empty plans are not stored: they usually come from a failed
+        generation, which a later identical prompt should retry.
+
+        Args:
+            key: Cache key from make_cache_key
+            steps: Plan steps to cache (step IDs are not stored)
+        """
+        if not steps:
+            return
+        payload = [s.model_dump(exclude={"step_id"}) for s in steps]
+        created_at = time.time()
+        self._remember(key, created_at, payload)
+
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp{threading.get_ident()}"
+        with open(tmp_path, "w") as f:
+            json.dump({"created_at": created_at, "steps": payload}, f)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, key: str) -> None:
+        """
+        Remove a single entry from both cache levels.
+
+        Args:
+            key: Cache key to remove
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        """Remove every cached plan from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.root, name))
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the in-memory entry count."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._memory)}
+
+    def _get_entry(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Fetch a non-expired entry from memory, falling back to disk."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, payload = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    return payload
+                del self._memory[key]
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.invalidate(key)
+            return None
+
+        created_at = record.get("created_at", 0.0)
+        if now - created_at > self.ttl_seconds:
+            self.invalidate(key)
+            return None
+
+        self._remember(key, created_at, record["steps"])
+        return record["steps"]
+
+    def _remember(self, key: str, created_at: float, payload: List[Dict[str, Any]]) -> None:
+        """Insert into the LRU, evicting the least recently used entry if full."""
+        with self._lock:
+            self._memory[key] = (created_at, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        """Return the on-disk path for a cache key."""
+        return os.path.join(self.root, f"{key}.json")
+
+
+_default_cache: Optional[PlanCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_plan_cache() -> PlanCache:
+    """Return the process-wide plan cache, creating it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PlanCache()
+        return _default_cache
@@ -1,54 +1,228 @@
 # planner/llm_planner.py
 # Primary LLM-based planner to break down high-level prompts into actionable steps.
 
-import requests
 import json
-from typing import List
+import hashlib
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
 from importlib.resources import files
+from core.metrics import metrics
+from core.singleflight import SingleFlight
 from core.state import PromptState
-from planner.schemas import PlanStep
-from planner.parsing import parse_plan
-from planner.processing import deduplicate_steps
-from planner.prompting import build_example_block
+from planner.schemas import PlanStep, PreparedProfile, PromptStats
+from planner.parsing import JsonArrayScanner, parse_plan, parse_plan_step
+from planner.processing import _normalize_args, deduplicate_steps
+from planner.prompting import build_example_block, compact_profile, estimate_tokens
 from planner.logging import PlanLogger
-from spec.tool_specs import TOOL_SPECS, get_tool_schema_block
+from planner.backends import get_backend_pool
+from planner.cache import PlanCache, get_plan_cache, make_cache_key
+from spec.tool_specs import TOOL_SPECS, get_tool_schema_block, get_plan_json_schema
 
 # Constants
-OLLAMA_HOST = "http://localhost:11434"
 MODEL_NAME = "gemma3:12b"
-OLLAMA_GENERATE_ENDPOINT = "/api/generate"
+OLLAMA_KEEP_ALIVE = "30m"  # Keep the model (and its prompt KV cache) resident between plans
+PROMPT_TOKEN_BUDGET = 6000  # Estimated tokens; wider profiles are compacted to fit
+USER_INPUT_MARKER = "USER INPUT"  # First section of the template that varies per request
+STRUCTURED_OUTPUT = True  # Constrain generation with the plan JSON schema via Ollama's 'format'
+PLAN_MAX_ATTEMPTS = 2  # Generations per plan before a parse failure is raised
 
+# Identical plans requested concurrently share one generation
+_inflight_plans = SingleFlight("plan")
 
-def plan(prompt_state: PromptState) -> List[PlanStep]:
+
+def plan(
+    prompt_state: PromptState,
+    use_cache: bool = True,
+    prepared: Optional[PreparedProfile] = None,
+) -> List[PlanStep]:
     """
     Generate a structured plan from a user's research question.
     
+    Plans are served from the plan cache when an entry exists for the same
+    normalized question, profile structure, model and prompt version.
+    Concurrent requests for the exact same prompt share a single
+    generation. The prompt includes per-dataset values (ranges, top
+    levels), so datasets that merely share a schema are not coalesced,
+    and requests bypassing the cache only share with each other.
+    
     Args:
         prompt_state: Contains the user's question, dataset profile, and context
+        use_cache: If False, bypass the plan cache for this request
+        prepared: Precomputed profile renderings shared across a batch
         
     Returns:
         List of validated and deduplicated plan steps
     """
-    prompt = build_prompt(prompt_state)
-    response_txt = call_ollama(prompt)
+    metrics.incr("planner.requests")
+    cache = get_plan_cache()
+    cache_key = make_cache_key(prompt_state.question, prompt_state.profile, MODEL_NAME, prompt_version())
+    if use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            metrics.incr("planner.cache.hits")
+            return cached
+        metrics.incr("planner.cache.misses")
+
+    prompt, prompt_stats = build_prompt_with_stats(prompt_state, prepared=prepared)
+    flight_key = f"{hashlib.sha256(prompt.encode()).hexdigest()}:{'cached' if use_cache else 'fresh'}"
+    steps, shared = _inflight_plans.do(flight_key, _plan_uncached, prompt, prompt_stats, cache, cache_key)
+    # Coalesced callers get their own copies so no two requests share mutable steps
+    return [s.model_copy(deep=True) for s in steps] if shared else steps
+
+
+def plan_stream(
+    prompt_state: PromptState,
+    use_cache: bool = True,
+    prepared: Optional[PreparedProfile] = None,
+) -> Iterator[List[PlanStep]]:
+    """
+    Generate a plan and yield its steps while the model is still writing it.
+
+    A cached plan is yielded as a single batch. Otherwise the response is
+    streamed and each step is parsed, deduplicated and yielded as soon as
+    its object closes, so execution can start long before generation
+    ends. Elements that do not parse are skipped. If the stream yields no
+    usable step at all, the plan is regenerated without streaming (with
+    the usual retries). Complete plans are cached like those from ``plan``;
+    concurrent identical requests are not coalesced.
 
+    Args:
+        prompt_state: Contains the user's question, dataset profile, and context
+        use_cache: If False, bypass the plan cache for this request
+        prepared: Precomputed profile renderings shared across a batch
+
+    Yields:
+        Batches of new, validated plan steps in plan order
+    """
+    metrics.incr("planner.requests")
+    cache = get_plan_cache()
+    cache_key = make_cache_key(prompt_state.question, prompt_state.profile, MODEL_NAME, prompt_version())
+    if use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            metrics.incr("planner.cache.hits")
+            yield cached
+            return
+        metrics.incr("planner.cache.misses")
+
+    prompt, prompt_stats = build_prompt_with_stats(prompt_state, prepared=prepared)
+    logger = PlanLogger()
+    logger.text("prompt", prompt)
+    logger.json("prompt_stats", prompt_stats.model_dump())
+
+    scanner = JsonArrayScanner()
+    seen = set()
+    steps: List[PlanStep] = []
+    chunks: List[str] = []
+    with metrics.timer("planner.llm_seconds"):
+        for chunk in stream_ollama(prompt):
+            chunks.append(chunk)
+            batch = []
+            for element in scanner.feed(chunk):
+                try:
+                    step = parse_plan_step(element)
+                except (ValueError, KeyError, TypeError) as exc:
+                    metrics.incr("planner.stream.invalid_steps")
+                    logger.text("parse_warn", f"Skipped streamed step:\n{exc}\n\n{element}")
+                    continue
+                signature = (step.tool, json.dumps(_normalize_args(step.args), sort_keys=True))
+                if signature not in seen:
+                    seen.add(signature)
+                    batch.append(step)
+            if batch:
+                steps.extend(batch)
+                yield batch
+    metrics.incr("planner.generations")
+    logger.text("raw", "".join(chunks))
+
+    complete = scanner.done
+    if not steps:
+        metrics.incr("planner.parse.failures")
+        _update_parse_rates()
+        steps = deduplicate_steps(_generate_steps(prompt, logger))
+        complete = True
+        yield steps
+    logger.json("clean", [s.model_dump() for s in steps])
+    # A stream cut off before the array closed is not worth caching
+    if complete:
+        cache.put(cache_key, steps)
+
+
+def _plan_uncached(
+    prompt: str,
+    prompt_stats: PromptStats,
+    cache: PlanCache,
+    cache_key: str,
+) -> List[PlanStep]:
+    """Generate, deduplicate and cache a plan (the body of a cache miss)."""
     logger = PlanLogger()
 
     logger.text("prompt", prompt)
-    logger.text("raw", response_txt)
+    logger.json("prompt_stats", prompt_stats.model_dump())
 
-    steps = parse_plan(response_txt, log_dir=logger.dir)
+    with metrics.timer("planner.plan_seconds"):
+        steps = _generate_steps(prompt, logger)
     logger.json("clean", [s.model_dump() for s in steps])
 
     steps = deduplicate_steps(steps)
     logger.json("dedup", [s.model_dump() for s in steps])
 
+    cache.put(cache_key, steps)
     return steps
 
 
+def _generate_steps(prompt: str, logger: PlanLogger) -> List[PlanStep]:
+    """
+    Generate and parse a plan, regenerating when the output does not parse.
+    
+    Parse failures and retries are counted in the planner telemetry, along
+    with the derived failure and retry rates.
+    
+    Args:
+        prompt: The formatted prompt string to send
+        logger: Run logger receiving raw responses and parse diagnostics
+        
+    Returns:
+        Parsed plan steps
+        
+    Raises:
+        ValueError: If no attempt produces a parseable plan
+    """
+    last_error: Exception = ValueError("no generation attempted")
+    for attempt in range(1, PLAN_MAX_ATTEMPTS + 1):
+        with metrics.timer("planner.llm_seconds"):
+            response_txt = call_ollama(prompt)
+        metrics.incr("planner.generations")
+        logger.text("raw" if attempt == 1 else f"raw_{attempt}", response_txt)
+
+        try:
+            steps = parse_plan(response_txt, logger=logger)
+        except (ValueError, KeyError, TypeError) as exc:
+            metrics.incr("planner.parse.failures")
+            if attempt < PLAN_MAX_ATTEMPTS:
+                metrics.incr("planner.retries")
+            last_error = exc
+            continue
+        finally:
+            _update_parse_rates()
+        return steps
+
+    raise ValueError(f"Plan parsing failed after {PLAN_MAX_ATTEMPTS} attempts: {last_error}") from last_error
+
+
+def _update_parse_rates() -> None:
+    """Refresh the parse-failure and retry rate gauges from the counters."""
+    generations = metrics.counter("planner.generations")
+    planned = metrics.counter("planner.requests")
+    if generations:
+        metrics.set_gauge("planner.parse.failure_rate", metrics.counter("planner.parse.failures") / generations)
+    if planned:
+        metrics.set_gauge("planner.retry_rate", metrics.counter("planner.retries") / planned)
+
+
 def call_ollama(prompt: str) -> str:
     """
-    Send a prompt to the local Ollama instance and return the response.
+    Send a prompt to the Ollama backend pool and return the response.
     
     Args:
         prompt: The formatted prompt string to send
@@ -57,24 +231,75 @@ def call_ollama(prompt: str) -> str:
         The raw text response from the model
         
     Raises:
-        requests.HTTPError: If the API call fails
+        BackendError: If no model server could answer
         KeyError: If response format is unexpected
     """
     payload = {
         "model": MODEL_NAME,
         "prompt": prompt,
-        "stream": False
+        "stream": False,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
     }
+    if STRUCTURED_OUTPUT:
+        payload["format"] = get_plan_json_schema()
+
+    return get_backend_pool().generate(payload)["response"]
+
 
-    response = requests.post(f"{OLLAMA_HOST}{OLLAMA_GENERATE_ENDPOINT}", json=payload)
-    response.raise_for_status()
-    return response.json()["response"]
+def stream_ollama(prompt: str) -> Iterator[str]:
+    """
+    Send a prompt to the Ollama backend pool and yield the response as it is generated.
+
+    Args:
+        prompt: The formatted prompt string to send
+
+    Yields:
+        Successive fragments of the model's response
+
+    Raises:
+        BackendError: If no model server could answer
+    """
+    payload = {
+        "model": MODEL_NAME,
+        "prompt": prompt,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+    }
+    if STRUCTURED_OUTPUT:
+        payload["format"] = get_plan_json_schema()
 
+    yield from get_backend_pool().generate_stream(payload)
 
+
+def warm_up() -> None:
+    """
+    Load the model and prefill the static prompt prefix.
+    
+    Ollama reuses the KV cache of a resident model for the longest matching
+    prompt prefix, so after warm-up each plan only pays prefill for the
+    question and profile. Intended to run once at API startup.
+    
+    Every backend in the pool is warmed up.
+    
+    Raises:
+        BackendError: If no model server could be warmed up
+    """
+    payload = {
+        "model": MODEL_NAME,
+        "prompt": get_static_prefix(),
+        "stream": False,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": {"num_predict": 1},
+    }
+    get_backend_pool().warm_up(payload)
+
+
+@lru_cache(maxsize=None)
 def _get_prompt_template() -> str:
     """
     Reads the system prompt template from the prompts directory.
     
+    The file is read once per process.
+    
     Returns:
         The prompt template as a string
     """
@@ -82,21 +307,120 @@ def _get_prompt_template() -> str:
     return path.read_text()
 
 
-def build_prompt(prompt_state: PromptState) -> str:
+@lru_cache(maxsize=None)
+def get_static_prefix() -> str:
+    """
+    Assemble the request-independent part of the prompt once.
+    
+    Everything before the USER INPUT section (role, tool catalog, data
+    contract, examples) is identical for every plan, so it is formatted once
+    and kept byte-stable to maximise KV-cache reuse on the model server.
+    
+    Returns:
+        The formatted static prompt prefix
+    """
+    template = _get_prompt_template()
+    head = template[:template.index(USER_INPUT_MARKER)]
+    return head.format(
+        schema_block=get_tool_schema_block(),
+        example_block=build_example_block(),
+    ).lstrip()
+
+
+@lru_cache(maxsize=None)
+def _get_dynamic_template() -> str:
+    """Return the per-request tail of the template (question and profile)."""
+    template = _get_prompt_template()
+    return template[template.index(USER_INPUT_MARKER):]
+
+
+@lru_cache(maxsize=None)
+def prompt_version() -> str:
+    """
+    Hash the prompt template and tool specification.
+    
+    Cached plans are only reused while the template, tool schema and
+    examples they were generated from are unchanged.
+    
+    Returns:
+        Short hex digest identifying the prompt version
+    """
+    material = "\x1f".join([get_static_prefix(), _get_dynamic_template()])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+def build_prompt(prompt_state: PromptState, token_budget: int = PROMPT_TOKEN_BUDGET) -> str:
     """
     Build the complete prompt by filling the template with context.
     
     Args:
         prompt_state: Contains question, profile, and other context
+        token_budget: Estimated token budget for the whole prompt
         
     Returns:
         The formatted prompt ready for the LLM
     """
-    template = _get_prompt_template()
+    prompt, _ = build_prompt_with_stats(prompt_state, token_budget)
+    return prompt
 
-    return template.format(
-        schema_block=get_tool_schema_block(),
-        example_block=build_example_block(),
-        question=prompt_state.question,
-        profile_json=json.dumps(prompt_state.profile, indent=2),
-    ).strip()
\ No newline at end of file
+
+def build_prompt_with_stats(
+    prompt_state: PromptState,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    prepared: Optional[PreparedProfile] = None,
+) -> Tuple[str, PromptStats]:
+    """
+    Build the prompt, compacting the dataset profile if it exceeds the budget.
+    
+    Prompts that fit the budget embed the full JSON profile unchanged. Larger
+    ones switch to schema-style column lines, keeping the columns most
+    relevant to the question until the budget is reached.
+    
+    Args:
+        prompt_state: Contains question, profile, and other context
+        token_budget: Estimated token budget for the whole prompt
+        prepared: Precomputed profile renderings (computed here if omitted)
+        
+    Returns:
+        Tuple of (formatted prompt, compaction statistics)
+    """
+    prefix = get_static_prefix()
+    tail = _get_dynamic_template()
+    num_columns = len(prompt_state.profile.get("columns", {}))
+
+    def render(profile_text: str) -> str:
+        # Static prefix first so consecutive prompts share the longest possible prefix
+        return prefix + tail.format(
+            question=prompt_state.question,
+            profile_json=profile_text,
+        ).rstrip()
+
+    profile_json = prepared.profile_json if prepared else json.dumps(prompt_state.profile, indent=2)
+    prompt = render(profile_json)
+    original_tokens = estimate_tokens(prompt)
+    if original_tokens <= token_budget:
+        return prompt, PromptStats(
+            budget_tokens=token_budget,
+            original_tokens=original_tokens,
+            final_tokens=original_tokens,
+            columns_kept=num_columns,
+        )
+
+    fixed_tokens = estimate_tokens(render(""))
+    profile_text, kept = compact_profile(
+        prompt_state.profile,
+        prompt_state.question,
+        max(token_budget - fixed_tokens, 0),
+        column_lines=prepared.column_lines if prepared else None,
+    )
+    prompt = render(profile_text)
+    final_tokens = estimate_tokens(prompt)
+    return prompt, PromptStats(
+        budget_tokens=token_budget,
+        original_tokens=original_tokens,
+        final_tokens=final_tokens,
+        compacted=True,
+        columns_kept=kept,
+        columns_dropped=num_columns - kept,
+        tokens_saved=original_tokens - final_tokens,
+    )
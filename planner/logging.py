@@ -1,72 +1,289 @@
 # planner/logging.py
 # Logging utilities for plan generation and debugging.
 
+import atexit
+import glob
+import gzip
 import json
-import uuid
 import os
-from typing import Any
+import queue
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: rotation is only safe within one process
+    fcntl = None
+
+# Constants
+AUDIT_LOG_ROOT = "logs"
+AUDIT_LOG_FILE = "audit.jsonl"
+AUDIT_LOCK_FILE = "audit.lock"  # Serializes appends and rotation across processes
+AUDIT_MAX_BYTES = 64 * 1024 * 1024  # Rotate the active file beyond this size
+AUDIT_BATCH_SIZE = 256  # Records written per batch
+AUDIT_FLUSH_INTERVAL = 0.5  # Seconds a partial batch may wait before being written
+AUDIT_QUEUE_SIZE = 10_000  # Records buffered before new ones are dropped
+
+
+class AuditLog:
+    """
+    Append-only JSONL audit log with a background writer thread.
+
+    Callers only enqueue records; the writer batches them into the active
+    file, rotates it when it exceeds ``max_bytes`` and gzips rotated files.
+    If the queue is full, records are dropped and counted rather than
+    blocking the caller. Several processes (API workers, batch workers)
+    may share one log directory: appends and rotation happen under a
+    file lock.
+    """
+
+    def __init__(
+        self,
+        root: str = AUDIT_LOG_ROOT,
+        max_bytes: int = AUDIT_MAX_BYTES,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        queue_size: int = AUDIT_QUEUE_SIZE,
+    ):
+        """
+        Initialize the log and start its writer thread.
+
+        Args:
+            root: Directory holding the active and rotated log files
+            max_bytes: Size at which the active file is rotated
+            batch_size: Maximum records written per batch
+            flush_interval: Maximum seconds a partial batch waits
+            queue_size: Capacity of the in-memory record queue
+        """
+        self.root = os.path.abspath(root)
+        self.path = os.path.join(self.root, AUDIT_LOG_FILE)
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        os.makedirs(self.root, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        Enqueue a record for writing without blocking.
+
+        Args:
+            record: JSON-serializable record; a 'ts' timestamp is added if absent
+        """
+        record.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr("audit.dropped")
+
+    def flush(self) -> None:
+        """Block until every record enqueued so far has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def query_run(self, run_id: str) -> List[Dict[str, Any]]:
+        """
+        Return every record of one run, oldest first.
+
+        Pending records are flushed first; rotated (gzipped) files are
+        searched along with the active file.
+
+        Args:
+            run_id: Run identifier as recorded by PlanLogger
+
+        Returns:
+            Matching records in write order
+        """
+        if not self._closed:
+            self.flush()
+        return query_run(run_id, self.root)
+
+    def _run(self) -> None:
+        """Writer loop: collect batches from the queue and append them."""
+        stop = False
+        while not stop:
+            batch: List[Dict[str, Any]] = []
+            record = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if record is None:
+                    stop = True
+                else:
+                    batch.append(record)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception:
+                metrics.incr("audit.write_errors", len(batch))
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Append a batch as JSON lines, rotating first if the file is full."""
+        if not batch:
+            return
+        data = "".join(json.dumps(r, default=str) + "\n" for r in batch).encode("utf-8")
+        rotated = None
+        with self._locked():
+            # Another process may have appended or rotated since our last batch
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+                rotated = self._rotate()
+            with open(self.path, "ab") as f:
+                f.write(data)
+        if rotated is not None:
+            _compress(rotated)  # Outside the lock: other writers need not wait for gzip
+        metrics.incr("audit.written", len(batch))
+        metrics.set_gauge("audit.queue_depth", self._queue.qsize())
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the log directory's exclusive file lock."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.root, AUDIT_LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _rotate(self) -> str:
+        """Move the active file aside (under the lock) and return its new path."""
+        # Nanosecond stamps keep rotated files in write order when sorted by name
+        rotated = os.path.join(self.root, f"audit-{time.time_ns():020d}-{os.getpid()}.jsonl")
+        os.replace(self.path, rotated)
+        return rotated
+
+
+def _compress(path: str) -> None:
+    """Gzip a rotated file and remove the original."""
+    with open(path, "rb") as src, gzip.open(f"{path}.gz.tmp", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    # Readers only glob finished .gz files
+    os.replace(f"{path}.gz.tmp", f"{path}.gz")
+    os.remove(path)
+
+
+def query_run(run_id: str, root: str = AUDIT_LOG_ROOT) -> List[Dict[str, Any]]:
+    """
+    Read all audit records for a run from the files under ``root``.
+
+    Rotated files still uncompressed (a writer stopped before gzipping
+    them) are read as well, unless their gzipped copy already exists.
+
+    Args:
+        run_id: Run identifier to filter on
+        root: Audit log directory
+
+    Returns:
+        Matching records, rotated files first, in write order
+    """
+    rotated = set(glob.glob(os.path.join(root, "audit-*.jsonl")))
+    compressed = set(glob.glob(os.path.join(root, "audit-*.jsonl.gz")))
+    paths = sorted(compressed | {p for p in rotated if f"{p}.gz" not in compressed})
+    paths.append(os.path.join(root, AUDIT_LOG_FILE))
+    needle = f'"run_id": "{run_id}"'
+    records = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, "rt") as f:
+                for line in f:
+                    # Cheap substring test before decoding each line; it also
+                    # matches other runs' records whose content mentions run_id
+                    if needle in line:
+                        record = json.loads(line)
+                        if record.get("run_id") == run_id:
+                            records.append(record)
+        except FileNotFoundError:
+            continue  # Compressed (or rotated) by a writer since the listing
+    return records
+
+
+_audit_logs: Dict[str, AuditLog] = {}
+_audit_lock = threading.Lock()
+
+
+def get_audit_log(root: str = AUDIT_LOG_ROOT) -> AuditLog:
+    """Return the process-wide audit log of a directory, starting it on first use."""
+    key = os.path.abspath(root)
+    with _audit_lock:
+        if key not in _audit_logs:
+            _audit_logs[key] = AuditLog(root)
+            atexit.register(_audit_logs[key].close)
+        return _audit_logs[key]
 
 
 class PlanLogger:
     """
-    Create a run-specific log directory and dump text/JSON artifacts to it.
-    
+    Record the artifacts of one planning run in the audit log.
+
     Useful for debugging plan generation by capturing prompts, raw responses,
-    and processed results in separate files.
+    and processed results; retrieve them later with ``query_run(run_id)``.
     """
-    
-    def __init__(self, root: str = "logs"):
+
+    def __init__(self, root: str = AUDIT_LOG_ROOT, audit_log: Optional[AuditLog] = None):
         """
         Initialize logger with a unique run ID.
-        
+
         Args:
-            root: Base directory for log storage
+            root: Base directory for log storage (its process-wide audit log is used)
+            audit_log: Sink for records, overriding root
         """
         self.run_id = uuid.uuid4().hex
-        self.dir = os.path.join(root, f"plan_{self.run_id}")
-        os.makedirs(self.dir, exist_ok=True)
+        self._sink = audit_log or get_audit_log(root)
 
     def text(self, name: str, content: str) -> None:
         """
-        Write text content to a .txt file.
-        
+        Record a text artifact.
+
         Args:
-            name: Base filename (without extension)
-            content: Text content to write
+            name: Stage name (e.g. "prompt", "raw")
+            content: Text content to record
         """
-        self._write(name, content, ".txt")
+        self._sink.write({"run_id": self.run_id, "stage": name, "kind": "text", "content": content})
 
     def json(self, name: str, obj: Any) -> None:
         """
-        Write object as formatted JSON to a .json file.
-        
-        Args:
-            name: Base filename (without extension)  
-            obj: Object to serialize as JSON
-        """
-        self._write(name, json.dumps(obj, indent=2), ".json")
+        Record a structured artifact.
 
-    def _write(self, stem: str, payload: str, ext: str) -> None:
-        """
-        Internal method to write content to file.
-        
         Args:
-            stem: Base filename
-            payload: Content to write
-            ext: File extension
+            name: Stage name (e.g. "clean", "dedup")
+            obj: JSON-serializable object to record
         """
-        path = os.path.join(self.dir, f"{stem}{ext}")
-        with open(path, "w") as f:
-            f.write(payload)
+        self._sink.write({"run_id": self.run_id, "stage": name, "kind": "json", "content": obj})
 
 
 def log_plan_stage(log_dir: str, filename: str, content: str) -> None:
     """
     Write content to a specific file in the log directory.
-    
+
     Creates the directory if it doesn't exist. Useful for logging
     errors and warnings during plan parsing.
-    
+
     Args:
         log_dir: Directory to write to
         filename: Name of the file to create
@@ -75,4 +292,4 @@ def log_plan_stage(log_dir: str, filename: str, content: str) -> None:
     os.makedirs(log_dir, exist_ok=True)
     path = os.path.join(log_dir, filename)
     with open(path, "w") as f:
-        f.write(content) 
\ No newline at end of file
+        f.write(content)
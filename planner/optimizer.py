@@ -0,0 +1,304 @@
+# planner/optimizer.py
+# Cost-based plan optimizer: merges subsumed/mergeable steps and orders cheap steps first.
+
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from core.metrics import metrics
+from datasets.profile import is_numeric_column
+from executor.schemas import ExecutionResult
+from planner.processing import _normalize_args
+from planner.schemas import CostReport, OptimizedPlan, PlanStep
+
+# Constants
+MAX_HISTOGRAM_COLUMNS = 9  # Columns per merged histogram figure (3x3 grid)
+DEFAULT_CARDINALITY = 50  # Assumed groups when the profile has no cardinality info
+DESCRIBE_STATS = ("count", "mean", "std", "min", "25%", "50%", "75%", "max")
+OBJECT_DESCRIBE_STATS = ("count", "unique", "top", "freq")  # describe() of non-numeric columns
+
+# Per-tool cost model, in approximate milliseconds (calibrated on pandas/matplotlib):
+#   fixed: per-call overhead, per_column: per plotted/summarised column,
+#   per_cell: per row x column scanned, per_group: per group x column
+TOOL_COSTS: Dict[str, Dict[str, float]] = {
+    "eda_overview": {"fixed": 0.5, "per_column": 0.0, "per_cell": 2e-5, "per_group": 0.0},
+    "summary_stats": {"fixed": 4.0, "per_column": 0.0, "per_cell": 4.5e-5, "per_group": 0.9},
+    "histogram": {"fixed": 60.0, "per_column": 110.0, "per_cell": 2e-5, "per_group": 0.0},
+    "boxplot": {"fixed": 100.0, "per_column": 0.0, "per_cell": 1.2e-3, "per_group": 9.0},
+    "t_test": {"fixed": 3.0, "per_column": 0.0, "per_cell": 2.5e-4, "per_group": 0.0},
+}
+_UNKNOWN_TOOL_COST = {"fixed": 10.0, "per_column": 0.0, "per_cell": 1e-4, "per_group": 0.0}
+
+
+def estimate_step_cost(step: PlanStep, profile: Dict[str, Any]) -> float:
+    """
+    Estimate the cost of one step from the profile's row count and cardinalities.
+
+    Args:
+        step: Plan step to cost
+        profile: Dataset profile (num_rows, columns with num_unique/top_values)
+
+    Returns:
+        Estimated cost in approximate milliseconds
+    """
+    model = TOOL_COSTS.get(step.tool, _UNKNOWN_TOOL_COST)
+    rows = profile.get("num_rows") or 0
+    args = step.args
+
+    if step.tool == "eda_overview":
+        columns = max(profile.get("num_columns") or len(profile.get("columns", {})), 1)
+    elif step.tool == "boxplot":
+        columns = 1
+    else:
+        columns = max(len(args.get("columns") or []), 1)
+
+    group_column = args.get("by") or (args.get("x") if step.tool == "boxplot" else None)
+    groups = _cardinality(profile, group_column) if group_column else 0
+
+    return (
+        model["fixed"]
+        + model["per_column"] * columns
+        + model["per_cell"] * rows * columns
+        + model["per_group"] * groups * columns
+    )
+
+
+def estimate_plan_cost(steps: List[PlanStep], profile: Dict[str, Any]) -> float:
+    """Return the summed estimated cost of a list of steps."""
+    return sum(estimate_step_cost(s, profile) for s in steps)
+
+
+def optimize_plan(steps: List[PlanStep], profile: Dict[str, Any]) -> OptimizedPlan:
+    """
+    Merge redundant steps and order the plan cheapest-first.
+
+    - Exact duplicates (same tool and normalized args) collapse into one step.
+    - ``summary_stats`` steps sharing the same ``by`` merge into one step over
+      the union of their columns, which also absorbs subsumed column sets.
+      Only steps whose columns all exist in the profile and are all numeric,
+      or all non-numeric, are merged: describe() drops non-numeric columns
+      from a mixed frame, and one unknown column would fail the whole merge.
+    - ``histogram`` steps merge into figures of up to MAX_HISTOGRAM_COLUMNS
+      columns.
+
+    Steps are independent (each reads the dataset only), so reordering is
+    safe; ties keep plan order. Every original step ID is mapped to the
+    step that now produces its result, see original_preview.
+
+    Args:
+        steps: Validated plan steps
+        profile: Dataset profile used by the cost model
+
+    Returns:
+        OptimizedPlan with the new steps, provenance and cost estimates
+    """
+    merged: List[PlanStep] = []
+    provenance: Dict[str, str] = {}
+    by_signature: Dict[Tuple[str, str], PlanStep] = {}
+    summaries: Dict[Tuple[Optional[str], bool], List[PlanStep]] = {}
+    histograms: List[PlanStep] = []
+
+    for step in steps:
+        numeric = _summary_kind(step, profile) if step.tool == "summary_stats" else None
+        if numeric is not None:
+            summaries.setdefault((step.args.get("by"), numeric), []).append(step)
+            continue
+        if step.tool == "histogram":
+            histograms.append(step)
+            continue
+        sig = (step.tool, json.dumps(_normalize_args(step.args), sort_keys=True))
+        if sig not in by_signature:
+            by_signature[sig] = step
+            merged.append(step)
+        provenance[step.step_id] = by_signature[sig].step_id
+
+    for (by, _), group in summaries.items():
+        merged.append(_merge_columns(group, provenance, by))
+    for chunk in _chunk_histograms(histograms):
+        merged.append(_merge_columns(chunk, provenance, None))
+
+    costs = {s.step_id: estimate_step_cost(s, profile) for s in merged}
+    order = {s.step_id: i for i, s in enumerate(steps)}
+    merged.sort(key=lambda s: (costs[s.step_id], order.get(s.step_id, len(order))))
+
+    before = estimate_plan_cost(steps, profile)
+    after = sum(costs.values())
+    metrics.incr("planner.optimizer.steps_in", len(steps))
+    metrics.incr("planner.optimizer.steps_out", len(merged))
+    return OptimizedPlan(
+        steps=merged,
+        provenance=provenance,
+        estimated_cost_before=round(before, 3),
+        estimated_cost_after=round(after, 3),
+    )
+
+
+def original_preview(step: PlanStep, preview: Any) -> Any:
+    """
+    Cut an original step's part out of the full preview of the step that ran it.
+
+    A merged ``summary_stats`` preview keeps only the original step's
+    columns (rows when ungrouped, ``<column>_<stat>`` fields when grouped);
+    other previews, such as a merged histogram's, are shared as they are.
+    Previews are cut before they are capped, so that each original step's
+    preview and truncation reflect its own rows.
+
+    Args:
+        step: Original step, before optimization
+        preview: Uncapped preview of the step that produced its result
+
+    Returns:
+        The step's own preview
+    """
+    if step.tool != "summary_stats" or not isinstance(preview, (pd.DataFrame, list)):
+        return preview
+    frame = preview if isinstance(preview, pd.DataFrame) else pd.DataFrame(preview)
+    columns = list(step.args.get("columns") or [])
+    by = step.args.get("by")
+    if by is None:
+        return frame[frame["column"].isin(columns)].reset_index(drop=True) if "column" in frame else frame
+    stats = DESCRIBE_STATS + OBJECT_DESCRIBE_STATS
+    keys = {by} | {f"{c}_{stat}" for c in columns for stat in stats}
+    return frame[[k for k in frame.columns if k in keys]]
+
+
+def cost_report(optimized: OptimizedPlan, results: List[ExecutionResult], steps_before: int) -> CostReport:
+    """
+    Compare the optimizer's estimates with measured execution time.
+
+    The measured time of the executed plan calibrates the cost model
+    (``estimate_ratio``), which converts the estimated savings into
+    projected milliseconds saved.
+
+    Args:
+        optimized: The executed optimized plan
+        results: Its execution results (with duration_ms)
+        steps_before: Number of steps in the original plan
+
+    Returns:
+        CostReport with estimated and actual figures
+    """
+    before = optimized.estimated_cost_before
+    after = optimized.estimated_cost_after
+    actual = sum(r.duration_ms or 0.0 for r in results)
+    ratio = actual / after if after else 0.0
+    report = CostReport(
+        steps_before=steps_before,
+        steps_after=len(optimized.steps),
+        estimated_cost_before=before,
+        estimated_cost_after=after,
+        estimated_savings=round(1 - after / before, 4) if before else 0.0,
+        actual_ms=round(actual, 3),
+        estimate_ratio=round(ratio, 4),
+        projected_ms_saved=round((before - after) * ratio, 3),
+    )
+    metrics.set_gauge("planner.optimizer.estimate_ratio", report.estimate_ratio)
+    metrics.observe("planner.optimizer.projected_ms_saved", report.projected_ms_saved)
+    return report
+
+
+def merge_cost_reports(reports: List[CostReport]) -> Optional[CostReport]:
+    """
+    Combine the cost reports of a plan executed in several batches.
+
+    Args:
+        reports: One report per executed batch
+
+    Returns:
+        A report over all batches, or None if there are none
+    """
+    if not reports:
+        return None
+    if len(reports) == 1:
+        return reports[0]
+    before = sum(r.estimated_cost_before for r in reports)
+    after = sum(r.estimated_cost_after for r in reports)
+    actual = sum(r.actual_ms for r in reports)
+    ratio = actual / after if after else 0.0
+    return CostReport(
+        steps_before=sum(r.steps_before for r in reports),
+        steps_after=sum(r.steps_after for r in reports),
+        estimated_cost_before=round(before, 3),
+        estimated_cost_after=round(after, 3),
+        estimated_savings=round(1 - after / before, 4) if before else 0.0,
+        actual_ms=round(actual, 3),
+        estimate_ratio=round(ratio, 4),
+        projected_ms_saved=round((before - after) * ratio, 3),
+    )
+
+
+def _merge_columns(group: List[PlanStep], provenance: Dict[str, str], by: Optional[str]) -> PlanStep:
+    """Merge same-tool steps into one over the union of their columns."""
+    columns: List[str] = []
+    for step in group:
+        for col in step.args.get("columns") or []:
+            if col not in columns:
+                columns.append(col)
+
+    # A step covering every column already describes the merge best
+    target = next((s for s in group if set(s.args.get("columns") or []) >= set(columns)), None)
+    if target is None:
+        target = group[0].model_copy(update={
+            "args": dict(group[0].args, columns=columns),
+            "description": _merged_description(group[0].tool, columns, by),
+        })
+
+    for step in group:
+        provenance[step.step_id] = target.step_id
+    return target
+
+
+def _summary_kind(step: PlanStep, profile: Dict[str, Any]) -> Optional[bool]:
+    """
+    Dtype class of a summary_stats step's columns, which decides what it may merge with.
+
+    Returns:
+        True if every column is numeric, False if none is, None if the
+        columns are mixed or not all in the profile (the step is not merged)
+    """
+    meta = profile.get("columns", {})
+    columns = step.args.get("columns") or []
+    if not columns or any(c not in meta for c in columns):
+        return None
+    kinds = {is_numeric_column(meta[c]) for c in columns}
+    return kinds.pop() if len(kinds) == 1 else None
+
+
+def _merged_description(tool: str, columns: List[str], by: Optional[str]) -> str:
+    """Describe a merged step."""
+    cols = ", ".join(columns)
+    if tool == "histogram":
+        return f"Plot the distributions of {cols}"
+    return f"Summarise {cols} by {by}" if by else f"Summarise {cols}"
+
+
+def _chunk_histograms(steps: List[PlanStep]) -> List[List[PlanStep]]:
+    """Group histogram steps so each group covers at most MAX_HISTOGRAM_COLUMNS columns."""
+    chunks: List[List[PlanStep]] = []
+    current: List[PlanStep] = []
+    current_cols: set = set()
+    for step in steps:
+        cols = set(step.args.get("columns") or [])
+        if current and len(current_cols | cols) > MAX_HISTOGRAM_COLUMNS:
+            chunks.append(current)
+            current, current_cols = [], set()
+        current.append(step)
+        current_cols |= cols
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _cardinality(profile: Dict[str, Any], column: str) -> int:
+    """Distinct values of a column, from the profile or a conservative guess."""
+    meta = profile.get("columns", {}).get(column) or {}
+    if "num_unique" in meta:
+        return int(meta["num_unique"])
+    top = meta.get("top_values") or {}
+    if 0 < len(top) < 5:
+        # Profiles keep the top 5 values, so fewer means that is every level
+        return len(top)
+    rows = profile.get("num_rows") or 0
+    return min(DEFAULT_CARDINALITY, max(int(math.sqrt(rows)), 1))
@@ -4,11 +4,29 @@
 import json
 import uuid
 import re
-from typing import List, Optional
+from typing import List, Optional, TYPE_CHECKING
 from planner.schemas import PlanStep
+from core.metrics import metrics
 
+if TYPE_CHECKING:
+    from planner.logging import PlanLogger
 
-def parse_plan(response_text: str, log_dir: Optional[str] = None) -> List[PlanStep]:
+# Structural characters the scanner stops at outside / inside strings
+_STRUCTURAL = re.compile(r"[\[\]{}\"']")
+_STRING_END = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+
+# Tokens rewritten by _repair_json; strings are matched first so their contents stay intact
+_REPAIR_TOKENS = re.compile(
+    r'"(?:[^"\\]|\\.)*"'          # double-quoted string (kept)
+    r"|'(?:[^'\\]|\\.)*'"         # single-quoted string (converted)
+    r"|,(?=\s*[\]}])"             # trailing comma (dropped)
+    r"|\b(?:True|False|None)\b",  # Python literals (converted)
+    re.DOTALL,
+)
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def parse_plan(response_text: str, logger: Optional["PlanLogger"] = None) -> List[PlanStep]:
     """
     Parse the raw LLM response into PlanStep list.
     
@@ -17,7 +35,7 @@ def parse_plan(response_text: str, log_dir: Optional[str] = None) -> List[PlanSt
     
     Args:
         response_text: Raw text response from the LLM
-        log_dir: Optional directory to write parsing error logs
+        logger: Optional run logger receiving parse warnings and errors
         
     Returns:
         List of validated PlanStep objects
@@ -25,38 +43,73 @@ def parse_plan(response_text: str, log_dir: Optional[str] = None) -> List[PlanSt
     Raises:
         ValueError: If no valid JSON array can be extracted
     """
-    from planner.logging import log_plan_stage
-    
     try:
         # First try strict JSON parse
         raw_steps = json.loads(response_text)
-        return _load_plan_steps(raw_steps)
+        steps = _load_plan_steps(raw_steps)
+        metrics.incr("planner.parse.strict")
+        return steps
 
     except json.JSONDecodeError as e:
-        if log_dir:
-            log_plan_stage(log_dir, "parse_warn.txt", f"Strict parse failed:\n{e}\n\nRaw:\n{response_text}")
+        metrics.incr("planner.parse.fallback")
+        if logger:
+            logger.text("parse_warn", f"Strict parse failed:\n{e}")
 
         # Try to extract first array block from the response
         cleaned = _extract_json_array(response_text)
         if not cleaned:
-            if log_dir:
-                log_plan_stage(log_dir, "parse_error.txt", f"Could not extract JSON array from:\n\n{response_text}")
+            if logger:
+                logger.text("parse_error", "Could not extract JSON array from model output")
             raise ValueError("Failed to extract JSON array from model output.")
 
         try:
-            raw_steps = json.loads(cleaned)
+            try:
+                raw_steps = json.loads(cleaned)
+            except json.JSONDecodeError:
+                # Common LLM slips: trailing commas, single quotes, Python literals
+                cleaned = _repair_json(cleaned)
+                raw_steps = json.loads(cleaned)
+                metrics.incr("planner.parse.repaired")
             return _load_plan_steps(raw_steps)
         except Exception as e2:
-            if log_dir:
-                log_plan_stage(log_dir, "parse_error.txt", f"Cleaned parse failed:\n{e2}\n\nCleaned:\n{cleaned}")
+            if logger:
+                logger.text("parse_error", f"Cleaned parse failed:\n{e2}\n\nCleaned:\n{cleaned}")
             raise
 
 
+def parse_plan_step(element_text: str) -> PlanStep:
+    """
+    Parse one step object as reported by JsonArrayScanner.feed.
+    
+    Used to act on a streamed plan before the whole array has arrived;
+    applies the same repairs as parse_plan.
+    
+    Args:
+        element_text: Raw JSON text of one top-level array element
+        
+    Returns:
+        The validated PlanStep
+        
+    Raises:
+        ValueError: If the element is not valid JSON even after repair
+        KeyError: If a required field is missing
+    """
+    try:
+        raw_step = json.loads(element_text)
+    except json.JSONDecodeError:
+        raw_step = json.loads(_repair_json(element_text))
+        metrics.incr("planner.parse.repaired")
+    if not isinstance(raw_step, dict):
+        raise ValueError(f"Plan step is not an object: {element_text[:80]!r}")
+    return _load_plan_steps([raw_step])[0]
+
+
 def _extract_json_array(text: str) -> Optional[str]:
     """
     Extract JSON array from text that may contain markdown fences or prose.
     
-    Uses regex to find the first occurrence of a JSON array pattern.
+    Runs a single JsonArrayScanner pass and returns the first complete
+    top-level array of objects.
     
     Args:
         text: Input text that may contain a JSON array
@@ -64,9 +117,166 @@ def _extract_json_array(text: str) -> Optional[str]:
     Returns:
         Extracted JSON array string, or None if not found
     """
-    # Strip markdown fences and prose — return only the array block
-    match = re.search(r"\[\s*{.*?}\s*\]", text, re.DOTALL)
-    return match.group(0).strip() if match else None
+    scanner = JsonArrayScanner()
+    scanner.feed(text)
+    return scanner.result
+
+
+class JsonArrayScanner:
+    """
+    Single-pass, string- and escape-aware scanner for the first JSON array.
+    
+    Text can be fed in arbitrary chunks (e.g. a streamed model response).
+    The scanner skips prose and markdown fences, starts a candidate at a
+    '[' whose first non-space character is '{', and tracks nesting while
+    ignoring brackets inside single- or double-quoted strings. Each
+    top-level object is reported as soon as it closes, and ``result`` holds
+    the whole array once its closing ']' arrives.
+    
+    Work per character is constant, so scanning is linear in input size.
+    """
+    
+    def __init__(self):
+        """Initialize an empty scanner."""
+        self.result: Optional[str] = None
+        self._depth = 0          # Nesting depth inside the candidate array
+        self._pending = False    # Saw '[' but not yet its first non-space char
+        self._quote = ""         # Active string delimiter, or "" outside strings
+        self._escape = False     # Previous char inside a string was a backslash
+        self._in_elem = False    # Inside a top-level object element
+        self._array_parts: List[str] = []
+        self._elem_parts: List[str] = []
+    
+    @property
+    def done(self) -> bool:
+        """True once a complete array has been found."""
+        return self.result is not None
+    
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Consume the next piece of text.
+        
+        Args:
+            chunk: Next slice of the model output
+            
+        Returns:
+            Raw JSON text of each top-level array element completed in this chunk
+        """
+        completed: List[str] = []
+        if self.done or not chunk:
+            return completed
+        
+        n = len(chunk)
+        i = 0
+        array_start = 0 if (self._depth or self._pending) else -1
+        elem_start = 0 if self._in_elem else -1
+        
+        while i < n:
+            if self._quote:
+                # Inside a string: jump to the next quote or backslash
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                m = _STRING_END[self._quote].search(chunk, i)
+                if m is None:
+                    break
+                i = m.start()
+                if chunk[i] == "\\":
+                    self._escape = True
+                else:
+                    self._quote = ""
+                i += 1
+                continue
+            
+            if self._pending:
+                ch = chunk[i]
+                if ch.isspace():
+                    i += 1
+                    continue
+                self._pending = False
+                if ch == "{":
+                    self._depth = 1
+                else:
+                    # Not an array of objects (e.g. "[1]" or "[note]"): restart
+                    self._array_parts = []
+                    array_start = -1
+                    continue
+            
+            if not self._depth:
+                i = chunk.find("[", i)
+                if i < 0:
+                    break
+                self._pending = True
+                self._array_parts = []
+                array_start = i
+                i += 1
+                continue
+            
+            m = _STRUCTURAL.search(chunk, i)
+            if m is None:
+                break
+            i = m.start()
+            ch = chunk[i]
+            if ch in "\"'":
+                self._quote = ch
+            elif ch in "[{":
+                self._depth += 1
+                if self._depth == 2 and ch == "{":
+                    self._in_elem = True
+                    self._elem_parts = []
+                    elem_start = i
+            elif self._depth == 1 and ch == "}":
+                pass  # Stray '}' cannot close the array; treat it as noise
+            else:
+                self._depth -= 1
+                if self._depth == 1 and self._in_elem:
+                    self._elem_parts.append(chunk[elem_start:i + 1])
+                    completed.append("".join(self._elem_parts))
+                    self._elem_parts = []
+                    self._in_elem = False
+                    elem_start = -1
+                elif self._depth == 0:
+                    self._array_parts.append(chunk[array_start:i + 1])
+                    self.result = "".join(self._array_parts).strip()
+                    self._array_parts = []
+                    return completed
+            i += 1
+        
+        # Carry partial candidate / element text over to the next chunk
+        if array_start >= 0:
+            self._array_parts.append(chunk[array_start:])
+        if elem_start >= 0:
+            self._elem_parts.append(chunk[elem_start:])
+        return completed
+
+
+def _repair_json(text: str) -> str:
+    """
+    Fix common LLM JSON mistakes in an extracted array.
+    
+    Converts single-quoted strings to double-quoted ones, drops trailing
+    commas before ']' or '}', and maps Python True/False/None to JSON.
+    String contents are never modified otherwise.
+    
+    Args:
+        text: JSON-like text with balanced strings (as produced by the scanner)
+        
+    Returns:
+        Repaired JSON text
+    """
+    def fix(match: "re.Match[str]") -> str:
+        token = match.group(0)
+        if token.startswith('"'):
+            return token
+        if token.startswith("'"):
+            inner = token[1:-1].replace("\\'", "'").replace('"', '\\"')
+            return f'"{inner}"'
+        if token.startswith(","):
+            return ""
+        return _PY_LITERALS[token]
+    
+    return _REPAIR_TOKENS.sub(fix, text)
 
 
 def _load_plan_steps(raw_steps: List[dict]) -> List[PlanStep]:
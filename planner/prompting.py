@@ -2,9 +2,16 @@
 # LLM prompt generation utilities for tool examples and demonstrations.
 
 import json
-from typing import Dict, Any, Tuple
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from planner.schemas import PreparedProfile
 from spec.tool_specs import TOOL_SPECS
 
+# Constants
+CHARS_PER_TOKEN = 4  # Rough average for English text and JSON on common tokenizers
+COMPACT_TOP_VALUES = 3
+COMPACT_VALUE_CHARS = 20
+
 
 def build_example(tool: str) -> Dict[str, Any]:
     """
@@ -61,4 +68,165 @@ def build_example_block(tools: Tuple[str, ...] = ("summary_stats", "boxplot")) -
         Formatted JSON string ready for embedding in prompts
     """
     examples = [build_example(t) for t in tools]
-    return json.dumps(examples, indent=2) 
\ No newline at end of file
+    return json.dumps(examples, indent=2)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a prompt without loading a tokenizer.
+    
+    Args:
+        text: Prompt text
+        
+    Returns:
+        Approximate number of tokens
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_column_line(name: str, meta: Dict[str, Any]) -> str:
+    """
+    Render one profile column as a schema-style line with abbreviated stats.
+    
+    Example: ``age:int64 missing=0 mean=34.2 std=5.1 range=[18,65]``
+    
+    Args:
+        name: Column name
+        meta: Column profile from profile_dataset
+        
+    Returns:
+        Single-line column summary
+    """
+    parts = [f"{name}:{meta.get('dtype', '?')}"]
+    if meta.get("num_missing"):
+        parts.append(f"missing={meta['num_missing']}")
+    if "mean" in meta:
+        parts.append(f"mean={_fmt_num(meta['mean'])} std={_fmt_num(meta.get('std'))}")
+        parts.append(f"range=[{_fmt_num(meta.get('min'))},{_fmt_num(meta.get('max'))}]")
+    top_values = meta.get("top_values")
+    if top_values:
+        shown = list(top_values.items())[:COMPACT_TOP_VALUES]
+        values = ",".join(f"{_abbrev(v)}({c})" for v, c in shown)
+        more = ",…" if len(top_values) > COMPACT_TOP_VALUES else ""
+        parts.append(f"top={values}{more}")
+    return " ".join(parts)
+
+
+def rank_columns(profile: Dict[str, Any], question: str) -> List[str]:
+    """
+    Order profile columns by relevance to the research question.
+    
+    Columns named in the question come first, then columns sharing words
+    with it; ties keep the original column order.
+    
+    Args:
+        profile: Dataset profile
+        question: Research question
+        
+    Returns:
+        Column names, most relevant first
+    """
+    q = question.lower()
+    q_words = set(re.findall(r"[a-z0-9]+", q))
+    scores = {}
+    for position, name in enumerate(profile.get("columns", {})):
+        lowered = str(name).lower()
+        score = 0
+        if _mentions(q, lowered) or _mentions(q, lowered.replace("_", " ")):
+            score += 10
+        score += len(q_words.intersection(re.findall(r"[a-z0-9]+", lowered)))
+        scores[name] = (-score, position)
+    return sorted(scores, key=scores.__getitem__)
+
+
+def _mentions(text: str, phrase: str) -> bool:
+    """Whether phrase occurs in text as whole words ("age" is not in "average")."""
+    return re.search(rf"(?<!\w){re.escape(phrase)}(?!\w)", text) is not None
+
+
+def prepare_profile(profile: Dict[str, Any]) -> PreparedProfile:
+    """
+    Render the question-independent forms of a profile once.
+    
+    Batch planning over one dataset reuses the result for every question,
+    so only column ranking and selection happen per prompt.
+    
+    Args:
+        profile: Dataset profile
+        
+    Returns:
+        PreparedProfile with the JSON rendering and compact column lines
+    """
+    return PreparedProfile(
+        profile_json=json.dumps(profile, indent=2),
+        column_lines={
+            name: compact_column_line(name, meta)
+            for name, meta in profile.get("columns", {}).items()
+        },
+    )
+
+
+def compact_profile(
+    profile: Dict[str, Any],
+    question: str,
+    max_tokens: int,
+    column_lines: Optional[Dict[str, str]] = None,
+) -> Tuple[str, int]:
+    """
+    Render a profile as compact schema lines that fit a token budget.
+    
+    Columns are kept in relevance order until the budget is exhausted; the
+    names of omitted columns are listed while they still fit.
+    
+    Args:
+        profile: Dataset profile
+        question: Research question used to rank columns
+        max_tokens: Token budget for the rendered profile
+        column_lines: Precomputed compact lines (see prepare_profile)
+        
+    Returns:
+        Tuple of (compact profile text, number of columns kept)
+    """
+    columns = profile.get("columns", {})
+    header = f"rows={profile.get('num_rows', '?')} columns={profile.get('num_columns', len(columns))}"
+    used = estimate_tokens(header) + 1
+
+    ranked = rank_columns(profile, question)
+    rendered = {}
+    for name in ranked:
+        line = column_lines[name] if column_lines else compact_column_line(name, columns[name])
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        rendered[name] = line
+        used += cost
+
+    # Schema order reads more naturally than relevance order
+    lines = [header] + [rendered[name] for name in columns if name in rendered]
+
+    omitted = ranked[len(rendered):]
+    if omitted:
+        note = f"(+{len(omitted)} more columns omitted)"
+        names: List[str] = []
+        length = len(f"omitted:  {note}")  # Running length of the line, without the names' ", " joins
+        for name in omitted:
+            length += len(str(name)) + (2 if names else 0)
+            if used + (length + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN + 1 > max_tokens:
+                break
+            names.append(str(name))
+        lines.append(f"omitted: {', '.join(names)} {note}" if names else note)
+
+    return "\n".join(lines), len(rendered)
+
+
+def _fmt_num(value: Any) -> str:
+    """Format a number with four significant digits."""
+    if isinstance(value, (int, float)):
+        return f"{value:.4g}"
+    return str(value)
+
+
+def _abbrev(value: Any) -> str:
+    """Truncate long category values."""
+    text = str(value)
+    return text if len(text) <= COMPACT_VALUE_CHARS else text[:COMPACT_VALUE_CHARS - 1] + "…"
@@ -0,0 +1,91 @@
+# planner/router.py
+# Routes planning requests between the rule-based fast path and the LLM planner.
+
+from typing import Iterator, List, Optional
+
+from core.metrics import metrics
+from core.state import PromptState
+from planner import llm_planner
+from planner.rule_planner import plan_rules
+from planner.schemas import PlanStep, PreparedProfile
+
+# Constants
+RULE_CONFIDENCE_THRESHOLD = 0.8  # Minimum rule confidence to skip the LLM
+
+
+def route_plan(
+    prompt_state: PromptState,
+    use_cache: bool = True,
+    threshold: float = RULE_CONFIDENCE_THRESHOLD,
+    prepared: Optional[PreparedProfile] = None,
+) -> List[PlanStep]:
+    """
+    Plan with the rule-based planner when it is confident, else with the LLM.
+    
+    Every decision is counted, and the share of requests answered without
+    the LLM is published as the ``planner.route.rule_share`` gauge.
+    
+    Args:
+        prompt_state: Contains the user's question, dataset profile, and context
+        use_cache: Passed through to the LLM planner's plan cache
+        threshold: Minimum rule confidence required to skip the LLM
+        prepared: Precomputed profile renderings passed to the LLM planner
+        
+    Returns:
+        List of validated plan steps
+    """
+    with metrics.timer("planner.route.rules_seconds"):
+        match = plan_rules(prompt_state)
+
+    if match.steps and match.confidence >= threshold:
+        metrics.incr("planner.route.rules")
+        metrics.incr(f"planner.route.intent.{match.intent}")
+        _update_rule_share()
+        return match.steps
+
+    metrics.incr("planner.route.llm")
+    _update_rule_share()
+    return llm_planner.plan(prompt_state, use_cache=use_cache, prepared=prepared)
+
+
+def stream_plan(
+    prompt_state: PromptState,
+    use_cache: bool = True,
+    threshold: float = RULE_CONFIDENCE_THRESHOLD,
+    prepared: Optional[PreparedProfile] = None,
+) -> Iterator[List[PlanStep]]:
+    """
+    Route like ``route_plan``, yielding steps in batches as they are planned.
+
+    Rule-based and cached plans arrive as a single batch; LLM plans are
+    streamed step by step (see ``llm_planner.plan_stream``).
+
+    Args:
+        prompt_state: Contains the user's question, dataset profile, and context
+        use_cache: Passed through to the LLM planner's plan cache
+        threshold: Minimum rule confidence required to skip the LLM
+        prepared: Precomputed profile renderings passed to the LLM planner
+
+    Yields:
+        Batches of validated plan steps in plan order
+    """
+    with metrics.timer("planner.route.rules_seconds"):
+        match = plan_rules(prompt_state)
+
+    if match.steps and match.confidence >= threshold:
+        metrics.incr("planner.route.rules")
+        metrics.incr(f"planner.route.intent.{match.intent}")
+        _update_rule_share()
+        yield match.steps
+        return
+
+    metrics.incr("planner.route.llm")
+    _update_rule_share()
+    yield from llm_planner.plan_stream(prompt_state, use_cache=use_cache, prepared=prepared)
+
+
+def _update_rule_share() -> None:
+    """Publish the fraction of routed requests served by rules."""
+    rules = metrics.counter("planner.route.rules")
+    total = rules + metrics.counter("planner.route.llm")
+    metrics.set_gauge("planner.route.rule_share", rules / total if total else 0.0)
@@ -0,0 +1,163 @@
+# planner/rule_planner.py
+# Deterministic rule-based planner for common question patterns.
+
+import re
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.state import PromptState
+from datasets.profile import is_numeric_column
+from planner.processing import deduplicate_steps
+from planner.schemas import PlanStep, RuleMatch
+
+# Constants
+MAX_RULE_STEPS = 10
+MAX_OVERVIEW_COLUMNS = 8
+GROUPING_WORDS = ("by", "across", "per", "between", "among", "each")
+
+# Requests the rule set cannot express; the LLM planner handles these
+_UNSUPPORTED = re.compile(
+    r"\b(correlat\w*|regress\w*|predict\w*|trend\w*|forecast\w*|anova|chi|outlier\w*|"
+    r"cluster\w*|relationship|associat\w*|impact|effect|cause\w*|over time)\b"
+)
+_OVERVIEW = re.compile(r"\b(overview|explore|exploration|eda|describe the (data|dataset)|look at the data)\b")
+_COMPARE = re.compile(r"\b(compare|comparison|differ\w*|versus|vs\.?|higher|lower)\b")
+_DISTRIBUTION = re.compile(r"\b(distribution\w*|distributed|histogram\w*|spread|shape)\b")
+_SUMMARY = re.compile(r"\b(summary|summari[sz]e|statistics|stats|average|mean|median)\b")
+
+
+def plan_rules(prompt_state: PromptState) -> RuleMatch:
+    """
+    Match the question against known intents and build a plan directly.
+
+    Recognized intents are "overview", "compare X between A and B",
+    "distribution of X (by Y)" and "summary of X by Y". Confidence reflects
+    how completely the intent's slots (columns, groups) were resolved
+    against the dataset profile; unsupported analyses score zero.
+
+    Args:
+        prompt_state: Contains the user's question and dataset profile
+
+    Returns:
+        RuleMatch with the intent, confidence and plan steps (may be empty)
+    """
+    question = prompt_state.question.lower()
+    columns = prompt_state.profile.get("columns", {})
+    if _UNSUPPORTED.search(question):
+        return RuleMatch(intent="unsupported", confidence=0.0)
+
+    numeric = [c for c, m in columns.items() if is_numeric_column(m)]
+    mentioned = _mentioned_columns(question, columns)
+    targets = [c for c, _ in mentioned if c in numeric]
+    group = _grouping_column(question, mentioned, columns)
+
+    if _COMPARE.search(question) or " between " in f" {question} ":
+        match = _compare(question, targets, group, columns)
+        if match is not None:
+            return match
+
+    if _DISTRIBUTION.search(question) and targets:
+        steps = [_step("histogram", f"Plot the distribution of {', '.join(targets)}", columns=targets)]
+        if group:
+            steps.append(_summary_by(targets, group))
+            steps += [_boxplot(group, t) for t in targets]
+        else:
+            steps.append(_step("summary_stats", f"Summarise {', '.join(targets)}", columns=targets))
+        return _finish("distribution", 0.9, steps)
+
+    if _SUMMARY.search(question) and group:
+        cols = targets or [c for c in numeric if c != group][:MAX_OVERVIEW_COLUMNS]
+        if cols:
+            return _finish("summary_by", 0.85 if targets else 0.8, [_summary_by(cols, group)])
+
+    if _OVERVIEW.search(question) and not mentioned:
+        cols = numeric[:MAX_OVERVIEW_COLUMNS]
+        steps = [_step("eda_overview", "Overview of dataset structure and missing values")]
+        if cols:
+            steps.append(_step("summary_stats", "Summarise the numeric columns", columns=cols))
+            steps.append(_step("histogram", "Plot distributions of the numeric columns", columns=cols))
+        return _finish("overview", 0.9, steps)
+
+    return RuleMatch(intent="unknown", confidence=0.0)
+
+
+def _compare(
+    question: str,
+    targets: List[str],
+    group: Optional[str],
+    columns: Dict[str, Dict[str, Any]],
+) -> Optional[RuleMatch]:
+    """Build a two-group comparison plan, or None if slots are unresolved."""
+    if not group:
+        group = _column_with_levels(question, columns)
+    if not targets or not group:
+        return None
+
+    steps = [_summary_by(targets, group)] + [_boxplot(group, t) for t in targets]
+    levels = columns[group].get("top_values") or {}
+    if len(levels) == 2:
+        steps += [
+            _step("t_test", f"Test whether {t} differs between {group} groups",
+                  group_column=group, value_column=t)
+            for t in targets
+        ]
+        return _finish("compare", 0.9, steps)
+    # Without exactly two known levels a t-test would fail; describe only
+    return _finish("compare", 0.75, steps)
+
+
+def _mentioned_columns(question: str, columns: Dict[str, Any]) -> List[Tuple[str, int]]:
+    """Return (column, position) for columns named in the question, in order."""
+    found = []
+    for name in columns:
+        for form in {str(name).lower(), str(name).lower().replace("_", " ")}:
+            m = re.search(rf"(?<![\w]){re.escape(form)}(?![\w])", question)
+            if m:
+                found.append((name, m.start()))
+                break
+    return sorted(found, key=lambda item: item[1])
+
+
+def _grouping_column(
+    question: str,
+    mentioned: List[Tuple[str, int]],
+    columns: Dict[str, Dict[str, Any]],
+) -> Optional[str]:
+    """Return a mentioned categorical column introduced by a grouping word."""
+    for name, pos in mentioned:
+        if is_numeric_column(columns[name]):
+            continue
+        preceding = question[:pos].split()[-2:]
+        if any(word in GROUPING_WORDS for word in preceding):
+            return name
+    return None
+
+
+def _column_with_levels(question: str, columns: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """Find a categorical column with at least two of its levels named in the question."""
+    for name, meta in columns.items():
+        levels = [str(v).lower() for v in (meta.get("top_values") or {})]
+        named = [lv for lv in levels if re.search(rf"(?<![\w]){re.escape(lv)}(?![\w])", question)]
+        if len(named) >= 2:
+            return name
+    return None
+
+
+def _summary_by(columns: List[str], group: str) -> PlanStep:
+    """Grouped summary statistics step."""
+    return _step("summary_stats", f"Summarise {', '.join(columns)} by {group}", columns=columns, by=group)
+
+
+def _boxplot(group: str, value: str) -> PlanStep:
+    """Box plot of one numeric column per group."""
+    return _step("boxplot", f"Compare the distribution of {value} across {group}", x=group, y=value)
+
+
+def _step(tool: str, description: str, **args: Any) -> PlanStep:
+    """Create a PlanStep with a fresh step ID."""
+    return PlanStep(step_id=str(uuid.uuid4()), description=description, tool=tool, args=args)
+
+
+def _finish(intent: str, confidence: float, steps: List[PlanStep]) -> RuleMatch:
+    """Deduplicate, cap and wrap steps into a RuleMatch."""
+    return RuleMatch(intent=intent, confidence=confidence, steps=deduplicate_steps(steps)[:MAX_RULE_STEPS])
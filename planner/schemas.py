@@ -13,3 +13,42 @@ class PlanStep(BaseModel):
 
 class Plan(BaseModel):
     steps: List[PlanStep]
+
+# Records how the dataset profile was fitted into the prompt token budget.
+class PromptStats(BaseModel):
+    budget_tokens: int  # Configured token budget for the full prompt.
+    original_tokens: int  # Estimated tokens with the full JSON profile.
+    final_tokens: int  # Estimated tokens of the prompt actually sent.
+    compacted: bool = False  # True if the profile was rewritten in compact form.
+    columns_kept: int = 0  # Number of profile columns included in the prompt.
+    columns_dropped: int = 0  # Number of columns omitted to fit the budget.
+    tokens_saved: int = 0  # original_tokens - final_tokens.
+
+# Outcome of the rule-based planner: the recognized intent, how sure it is, and its plan.
+class RuleMatch(BaseModel):
+    intent: str  # Recognized intent, e.g. "distribution", or "unknown".
+    confidence: float  # 0.0-1.0; below the routing threshold the LLM planner is used.
+    steps: List[PlanStep] = []  # Plan produced for the intent (empty when unmatched).
+
+# Profile renderings computed once and shared by every prompt over the same dataset.
+class PreparedProfile(BaseModel):
+    profile_json: str  # Full profile as indented JSON (used when within budget).
+    column_lines: Dict[str, str]  # Compact schema line per column (used when compacting).
+
+# Plan rewritten by the optimizer, with the mapping back to the steps it replaced.
+class OptimizedPlan(BaseModel):
+    steps: List[PlanStep]  # Steps to execute, cheapest first.
+    provenance: Dict[str, str]  # Original step_id -> step_id of the step that produces its result.
+    estimated_cost_before: float  # Estimated cost of the original plan (approx. milliseconds).
+    estimated_cost_after: float  # Estimated cost of the optimized plan.
+
+# Estimated versus measured cost of an executed optimized plan.
+class CostReport(BaseModel):
+    steps_before: int  # Steps in the original plan.
+    steps_after: int  # Steps actually executed.
+    estimated_cost_before: float  # Estimated cost of the original plan.
+    estimated_cost_after: float  # Estimated cost of the executed plan.
+    estimated_savings: float  # Fraction of the estimated cost removed by optimizing.
+    actual_ms: float  # Measured execution time of the executed steps.
+    estimate_ratio: float  # actual_ms / estimated_cost_after (1.0 = perfectly calibrated).
+    projected_ms_saved: float  # Estimated savings converted to milliseconds via estimate_ratio.
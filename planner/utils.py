@@ -7,7 +7,9 @@
 # Re-export parsing functionality
 from planner.parsing import (
     parse_plan,
+    JsonArrayScanner,
     _extract_json_array,
+    _repair_json,
     _load_plan_steps
 )
 
@@ -20,20 +22,28 @@ from planner.processing import (
 # Re-export prompting functionality
 from planner.prompting import (
     build_example,
-    build_example_block
+    build_example_block,
+    compact_profile,
+    estimate_tokens,
+    rank_columns
 )
 
 # Re-export logging functionality
 from planner.logging import (
+    AuditLog,
     PlanLogger,
-    log_plan_stage
+    get_audit_log,
+    log_plan_stage,
+    query_run
 )
 
 # Expose all functions at module level for convenience
 __all__ = [
     # Parsing
     "parse_plan",
+    "JsonArrayScanner",
     "_extract_json_array", 
+    "_repair_json",
     "_load_plan_steps",
     # Processing
     "deduplicate_steps",
@@ -41,7 +51,13 @@ __all__ = [
     # Prompting
     "build_example",
     "build_example_block", 
+    "compact_profile",
+    "estimate_tokens",
+    "rank_columns",
     # Logging
+    "AuditLog",
     "PlanLogger",
-    "log_plan_stage"
+    "get_audit_log",
+    "log_plan_stage",
+    "query_run"
 ]
@@ -10,6 +10,16 @@ ToolArgMeta = Dict[str, Any]  # Contains: {"type": str, "required": bool, "descr
 ToolSpec = Dict[str, ToolArgMeta]
 ToolSpecRegistry = Dict[str, ToolSpec]
 
+# JSON-schema fragments for the argument types used in TOOL_SPECS
+_JSON_SCHEMA_TYPES: Dict[str, Dict[str, Any]] = {
+    "str": {"type": "string"},
+    "List[str]": {"type": "array", "items": {"type": "string"}},
+    "float": {"type": "number"},
+    "int": {"type": "integer"},
+    "bool": {"type": "boolean"},
+}
+MAX_PLAN_STEPS = 10
+
 # Hard-coded specification for all available tools
 # Format: {tool_name: {arg_name: {"type": str, "required": bool, "description": str}}}
 TOOL_SPECS: ToolSpecRegistry = {
@@ -101,3 +111,44 @@ def get_tool_schema_block() -> str:
         lines.append("  " + _spec_line(tool_name, spec))
     return "\n".join(lines)
 
+
+def get_plan_json_schema() -> Dict[str, Any]:
+    """
+    Build a JSON schema describing a valid plan for structured generation.
+    
+    The plan is an array of step objects; each step is one branch of an
+    ``anyOf`` that pins "tool" to a single name and "args" to that tool's
+    argument schema, so the model cannot emit unknown tools or keys.
+    
+    Returns:
+        JSON schema dictionary suitable for a model server's ``format`` option
+    """
+    branches = []
+    for tool_name, spec in TOOL_SPECS.items():
+        properties = {
+            arg: dict(_JSON_SCHEMA_TYPES.get(meta["type"], {}), description=meta["description"])
+            for arg, meta in spec.items()
+        }
+        required = [arg for arg, meta in spec.items() if meta["required"]]
+        branches.append({
+            "type": "object",
+            "properties": {
+                "description": {"type": "string"},
+                "tool": {"type": "string", "enum": [tool_name]},
+                "args": {
+                    "type": "object",
+                    "properties": properties,
+                    "required": required,
+                    "additionalProperties": False,
+                },
+            },
+            "required": ["description", "tool", "args"],
+            "additionalProperties": False,
+        })
+
+    return {
+        "type": "array",
+        "minItems": 1,
+        "maxItems": MAX_PLAN_STEPS,
+        "items": {"anyOf": branches},
+    }
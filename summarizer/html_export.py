@@ -0,0 +1,338 @@
+# summarizer/html_export.py
+# Self-contained HTML export of markdown reports with optimized, cached images.
+
+import base64
+import hashlib
+import html
+import io
+import logging
+import mimetypes
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from core.metrics import metrics
+from summarizer.render import markdown_to_html, wrap_html
+
+logger = logging.getLogger(__name__)
+
+# Constants
+EXPORT_MODES = ("inline", "bundle")
+IMAGE_FORMAT = os.getenv("AUTOSTAT_EXPORT_IMAGE_FORMAT", "webp")  # "webp" or "png"
+THUMBNAIL_SIZE = int(os.getenv("AUTOSTAT_EXPORT_THUMBNAIL_PX", "640"))  # Longest side of the embedded preview
+FULL_SIZE = int(os.getenv("AUTOSTAT_EXPORT_FULL_PX", "2048"))  # Larger full-size images are downscaled
+WEBP_QUALITY = 80
+EXPORT_WORKERS = int(os.getenv("AUTOSTAT_EXPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+CONVERSION_CACHE_DIR = os.getenv("AUTOSTAT_EXPORT_CACHE", os.path.join("artifacts", "html_cache"))
+_IMAGE_PATTERN = re.compile(r"!\[(?P<alt>[^\]]*)\]\((?P<path>[^)\s]+)\)")
+
+
+class ConvertedImage:
+    """The thumbnail and full-size renditions of one source image."""
+
+    def __init__(self, digest: str, thumbnail: Path, full: Path):
+        """
+        Initialize the record.
+
+        Args:
+            digest: Conversion key (source content plus conversion settings)
+            thumbnail: Path to the downscaled preview
+            full: Path to the optimized full-size image
+        """
+        self.digest = digest
+        self.thumbnail = thumbnail
+        self.full = full
+
+
+class ConversionCache:
+    """
+    On-disk cache of converted images keyed by source content.
+
+    Identical artifacts (the same plot produced by several runs, or the
+    same file referenced twice) are converted once; later exports reuse
+    the files. Hits and misses are counted as
+    ``summarizer.html_export.cache_hits`` / ``.conversions``.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path] = CONVERSION_CACHE_DIR,
+        image_format: str = IMAGE_FORMAT,
+        thumbnail_size: int = THUMBNAIL_SIZE,
+        full_size: int = FULL_SIZE,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding converted images
+            image_format: "webp" or "png"
+            thumbnail_size: Longest side of thumbnails, in pixels
+            full_size: Longest side of full-size images, in pixels
+
+        Raises:
+            ValueError: If image_format is not supported
+        """
+        if image_format not in ("webp", "png"):
+            raise ValueError(f"Unsupported image format '{image_format}', expected webp or png")
+        self.cache_dir = Path(cache_dir)
+        self.image_format = image_format
+        self.thumbnail_size = thumbnail_size
+        self.full_size = full_size
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, threading.Event] = {}
+
+    def key(self, source: Path) -> str:
+        """
+        Conversion key of a source image.
+
+        Args:
+            source: Path to the source image
+
+        Returns:
+            Hex digest of the file content and the conversion settings
+        """
+        digest = hashlib.sha256(f"{self.image_format}:{self.thumbnail_size}:{self.full_size}:".encode())
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()[:32]
+
+    def convert(self, source: Path) -> ConvertedImage:
+        """
+        Return a source image's renditions, converting it only on a miss.
+
+        Concurrent requests for the same content wait for a single conversion.
+
+        Args:
+            source: Path to the source image
+
+        Returns:
+            The converted image
+
+        Raises:
+            OSError: If the source cannot be read or decoded
+        """
+        digest = self.key(source)
+        converted = ConvertedImage(
+            digest,
+            self.cache_dir / f"{digest}_thumb.{self.image_format}",
+            self.cache_dir / f"{digest}_full.{self.image_format}",
+        )
+        while True:
+            if converted.thumbnail.exists() and converted.full.exists():
+                metrics.incr("summarizer.html_export.cache_hits")
+                return converted
+            with self._lock:
+                event = self._in_flight.get(digest)
+                if event is None:
+                    event = self._in_flight[digest] = threading.Event()
+                    break
+            event.wait()
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            _convert_image(source, converted, self.image_format, self.thumbnail_size, self.full_size)
+            metrics.incr("summarizer.html_export.conversions")
+        finally:
+            with self._lock:
+                del self._in_flight[digest]
+            event.set()
+        return converted
+
+
+def export_html(
+    markdown_path: Union[str, Path],
+    output_path: Union[str, Path],
+    mode: str = "inline",
+    cache: Optional[ConversionCache] = None,
+    workers: int = EXPORT_WORKERS,
+) -> Path:
+    """
+    Export a markdown report as HTML that keeps working when moved.
+
+    Every image is converted once (thumbnail and optimized full-size
+    rendition, WebP or PNG) in a pool of worker threads; Pillow releases
+    the GIL while decoding, resampling and encoding, so conversions run in
+    parallel. The page shows lazy-loaded thumbnails that link to the
+    full-size image.
+
+    In "inline" mode the images are embedded as data URIs in a single HTML
+    file. In "bundle" mode output_path is a zip archive holding
+    ``index.html`` and an ``images/`` directory referenced relatively.
+
+    Args:
+        markdown_path: The markdown report
+        output_path: Where to write the HTML file (inline) or zip archive (bundle)
+        mode: "inline" or "bundle"
+        cache: Conversion cache (defaults to the process-wide one)
+        workers: Number of conversion threads
+
+    Returns:
+        Path to the written file
+
+    Raises:
+        ValueError: If mode is not supported
+        ImportError: If the markdown package is not installed
+    """
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"Unsupported export mode '{mode}', expected one of: {', '.join(EXPORT_MODES)}")
+    markdown_path = Path(markdown_path)
+    output_path = Path(output_path)
+    cache = get_conversion_cache() if cache is None else cache
+    text = markdown_path.read_text(encoding="utf-8")
+
+    images = convert_images(_image_sources(text, markdown_path.parent), cache, workers)
+    links = {src: (f"images/{img.thumbnail.name}", f"images/{img.full.name}") for src, img in images.items()}
+    page = wrap_html(markdown_to_html(_rewrite_images(text, links)))
+    if mode == "inline":
+        # Embedded after conversion: the markdown parser never scans the (large) data URIs
+        for image in images.values():
+            for file in (image.thumbnail, image.full):
+                page = page.replace(f'"images/{file.name}"', f'"{_data_uri(file)}"')
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if mode == "inline":
+            tmp_path.write_text(page, encoding="utf-8")
+        else:
+            _write_bundle(tmp_path, page, images.values())
+        os.replace(tmp_path, output_path)
+    finally:
+        if tmp_path.exists():
+            os.unlink(tmp_path)
+    return output_path
+
+
+def convert_images(
+    sources: Dict[str, Path], cache: ConversionCache, workers: int = EXPORT_WORKERS
+) -> Dict[str, ConvertedImage]:
+    """
+    Convert report images in parallel.
+
+    Sources that cannot be read or decoded are skipped with a warning; the
+    report keeps their original reference.
+
+    Args:
+        sources: Map of the reference used in the report to the resolved file
+        cache: Conversion cache
+        workers: Number of conversion threads
+
+    Returns:
+        Map of reference to converted image, for the images that converted
+    """
+    converted: Dict[str, ConvertedImage] = {}
+    if not sources:
+        return converted
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sources)))) as pool:
+        futures = {ref: pool.submit(cache.convert, path) for ref, path in sources.items()}
+        for ref, future in futures.items():
+            try:
+                converted[ref] = future.result()
+            except OSError as exc:
+                logger.warning("Could not convert report image %s: %s", ref, exc)
+    return converted
+
+
+def _image_sources(text: str, base_dir: Path) -> Dict[str, Path]:
+    """Resolve the image references of a report (relative to it, else to the working directory)."""
+    sources: Dict[str, Path] = {}
+    for match in _IMAGE_PATTERN.finditer(text):
+        ref = match.group("path")
+        if ref in sources or ref.startswith(("http://", "https://", "data:")):
+            continue
+        for candidate in (base_dir / ref, Path(ref)):
+            if candidate.is_file():
+                sources[ref] = candidate
+                break
+    return sources
+
+
+def _rewrite_images(text: str, links: Dict[str, Tuple[str, str]]) -> str:
+    """Replace converted image references by a lazy-loaded thumbnail linking to the full image."""
+
+    def replace(match: "re.Match[str]") -> str:
+        target = links.get(match.group("path"))
+        if target is None:
+            return match.group(0)
+        thumbnail, full = target
+        alt = html.escape(match.group("alt"))
+        return (
+            f'<a href="{full}" target="_blank">'
+            f'<img src="{thumbnail}" alt="{alt}" loading="lazy" decoding="async"></a>'
+        )
+
+    return _IMAGE_PATTERN.sub(replace, text)
+
+
+def _write_bundle(path: Path, page: str, images: Any) -> None:
+    """Write the page and its images to a zip archive."""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("index.html", page)
+        written = set()
+        for image in images:
+            for file in (image.thumbnail, image.full):
+                if file.name not in written:
+                    # Already compressed, deflating again only costs time
+                    archive.write(file, f"images/{file.name}", compress_type=zipfile.ZIP_STORED)
+                    written.add(file.name)
+
+
+def _data_uri(path: Path) -> str:
+    """Embed a file as a base64 data URI."""
+    return _cached_data_uri(str(path), path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=256)
+def _cached_data_uri(path: str, mtime_ns: int) -> str:
+    """Encode a converted image once per version of the file."""
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+
+def _convert_image(
+    source: Path, converted: ConvertedImage, image_format: str, thumbnail_size: int, full_size: int
+) -> None:
+    """Write the thumbnail and full-size renditions of an image."""
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.load()
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        full = image.copy()
+        full.thumbnail((full_size, full_size), Image.Resampling.LANCZOS)
+        thumbnail = image.copy()
+        thumbnail.thumbnail((thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS)
+
+    for rendition, path in ((thumbnail, converted.thumbnail), (full, converted.full)):
+        buffer = io.BytesIO()
+        if image_format == "webp":
+            rendition.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+        else:
+            rendition.save(buffer, "PNG", optimize=True)
+        # Write then rename, so a concurrent reader never sees a partial image
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+
+_conversion_cache: Optional[ConversionCache] = None
+_conversion_cache_lock = threading.Lock()
+
+
+def get_conversion_cache() -> ConversionCache:
+    """Return the process-wide conversion cache."""
+    global _conversion_cache
+    with _conversion_cache_lock:
+        if _conversion_cache is None:
+            _conversion_cache = ConversionCache()
+        return _conversion_cache
+
@@ -0,0 +1,190 @@
+# summarizer/incremental.py
+# Incremental report builder that keeps a partial report up to date while a run executes.
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from executor.schemas import ExecutionResult
+from planner.schemas import PlanStep
+from summarizer.narrative import create_summary_overview, section_title
+from summarizer.render import render_html_from_markdown
+from summarizer.writer import ReportWriter, SectionCache, get_section_cache
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalReport:
+    """
+    Markdown (and optionally HTML) report that grows as step results arrive.
+
+    Results may be added in any order; sections always follow plan order,
+    with a placeholder for every step still pending. Each update rewrites
+    the report atomically (unchanged sections come from the section cache),
+    so readers always see a complete file. ``finalize`` replaces the
+    progress header with the usual summary overview.
+    """
+
+    def __init__(
+        self,
+        plan_steps: List[PlanStep],
+        report_path: Union[str, Path],
+        html_path: Optional[Union[str, Path]] = None,
+        cache: Optional[SectionCache] = None,
+        min_interval: float = 0.0,
+    ):
+        """
+        Initialize the report and write its first, all-pending version.
+
+        Args:
+            plan_steps: Steps of the plan, in report order
+            report_path: Markdown report path
+            html_path: Also keep an HTML rendering here (needs the markdown package)
+            cache: Section cache (defaults to the process-wide one)
+            min_interval: Minimum seconds between rewrites; skipped updates
+                are written by the next update or by finalize
+        """
+        self.plan_steps = list(plan_steps)
+        self.report_path = Path(report_path)
+        self.html_path = Path(html_path) if html_path else None
+        self.min_interval = min_interval
+        self._cache = get_section_cache() if cache is None else cache
+        self._step_ids = {step.step_id for step in self.plan_steps}
+        self._results: Dict[str, ExecutionResult] = {}
+        self._finalized = False
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+        self.flush()
+
+    @property
+    def completed(self) -> int:
+        """Number of steps with a result."""
+        with self._lock:
+            return len(self._results)
+
+    @property
+    def pending(self) -> List[str]:
+        """IDs of steps still waiting for a result, in plan order."""
+        with self._lock:
+            return [s.step_id for s in self.plan_steps if s.step_id not in self._results]
+
+    def add_steps(self, steps: List[PlanStep]) -> None:
+        """
+        Append steps to the plan (for plans that arrive while the run executes).
+
+        Args:
+            steps: New steps, shown as pending until their results arrive
+
+        Raises:
+            ValueError: If the report was already finalized
+        """
+        with self._lock:
+            if self._finalized:
+                raise ValueError("Report already finalized")
+            new = [s for s in steps if s.step_id not in self._step_ids]
+            self.plan_steps.extend(new)
+            self._step_ids.update(s.step_id for s in new)
+            due = time.monotonic() - self._last_write >= self.min_interval
+        if due:
+            self.flush()
+
+    def add_result(self, result: ExecutionResult) -> None:
+        """
+        Record a step's result and refresh the partial report.
+
+        Args:
+            result: Result of one of the plan's steps (a later result for
+                the same step replaces the earlier one)
+
+        Raises:
+            ValueError: If the result belongs to no step of the plan, or the
+                report was already finalized
+        """
+        if result.step_id not in self._step_ids:
+            raise ValueError(f"Result for unknown step '{result.step_id}'")
+        with self._lock:
+            if self._finalized:
+                raise ValueError("Report already finalized")
+            self._results[result.step_id] = result
+            due = time.monotonic() - self._last_write >= self.min_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> Path:
+        """
+        Rewrite the report with every result received so far.
+
+        Returns:
+            Path to the markdown report
+        """
+        with self._lock:
+            self._write(final=self._finalized)
+        return self.report_path
+
+    def finalize(self, results: Optional[List[ExecutionResult]] = None) -> Path:
+        """
+        Write the final report with the complete summary overview.
+
+        Steps that never produced a result are reported as failed.
+
+        Args:
+            results: Final results to record first (e.g. the full list from run_plan)
+
+        Returns:
+            Path to the markdown report
+        """
+        with self._lock:
+            for result in results or []:
+                if result.step_id in self._step_ids:
+                    self._results[result.step_id] = result
+            self._finalized = True
+            self._write(final=True)
+        return self.report_path
+
+    def _write(self, final: bool) -> None:
+        """Render and atomically replace the report (caller holds the lock)."""
+        results = [self._results.get(s.step_id) for s in self.plan_steps]
+        if final:
+            results = [r or _not_executed(s) for s, r in zip(self.plan_steps, results)]
+
+        with ReportWriter(self.report_path) as writer:
+            writer.write_header()
+            writer.write(create_summary_overview(self.plan_steps, results) if final else self._progress())
+            for step, result in zip(self.plan_steps, results):
+                writer.write("\n")
+                writer.write(self._cache.render(step, result) if result else _placeholder(step))
+        self._last_write = time.monotonic()
+        if self.html_path is not None:
+            self._write_html()
+
+    def _progress(self) -> str:
+        """Overview shown while the run is in progress."""
+        total = len(self.plan_steps)
+        done = len(self._results)
+        failed = sum(1 for r in self._results.values() if r.status == "error")
+        return (
+            "# Analysis Summary (in progress)\n\n"
+            f"**Completed:** {done} of {total} steps"
+            + (f" ({failed} failed)" if failed else "")
+            + "\n\n---\n\n"
+        )
+
+    def _write_html(self) -> None:
+        """Refresh the HTML rendering; disabled if the markdown package is missing."""
+        try:
+            render_html_from_markdown(self.report_path, self.html_path)
+        except ImportError as exc:
+            logger.warning("HTML report disabled: %s", exc)
+            self.html_path = None
+
+
+def _placeholder(step: PlanStep) -> str:
+    """Section shown for a step whose result has not arrived yet."""
+    return f"## {section_title(step)}\n\n**Description:** {step.description}\n\n⏳ *Pending…*\n\n"
+
+
+def _not_executed(step: PlanStep) -> ExecutionResult:
+    """Result recorded for a step that never ran."""
+    return ExecutionResult(step_id=step.step_id, status="error", error="Step was not executed")
@@ -7,8 +7,7 @@ from datetime import datetime
 
 from planner.schemas import PlanStep
 from executor.schemas import ExecutionResult
-from summarizer.narrative import generate_narrative, create_summary_overview
-from summarizer.render import render_markdown_report
+from summarizer.writer import write_report
 
 
 def create_analysis_report(
@@ -20,6 +19,10 @@ def create_analysis_report(
     """
     Create a comprehensive analysis report from plan steps and execution results.
     
+    Sections are streamed to the file as they are produced, and sections
+    whose step and result are unchanged since an earlier report are served
+    from the section cache.
+    
     Args:
         plan_steps: List of analysis steps that were planned
         results: List of execution results for each step
@@ -46,18 +49,8 @@ def create_analysis_report(
     
     report_path = output_path / report_name
     
-    # Generate narrative sections
-    overview = create_summary_overview(plan_steps, results)
-    sections = generate_narrative(plan_steps, results)
-    
-    # Combine overview with detailed sections
-    all_sections = {"overview": overview}
-    all_sections.update(sections)
-    
-    # Render to markdown file
-    final_path = render_markdown_report(all_sections, report_path)
-    
-    return final_path
+    # Stream the overview and one section per step to the markdown file
+    return write_report(plan_steps, results, report_path)
 
 
 def quick_summary(plan_steps: List[PlanStep], results: List[ExecutionResult]) -> str:
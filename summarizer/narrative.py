@@ -3,11 +3,15 @@
 
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from planner.schemas import PlanStep
 from executor.schemas import ExecutionResult
 
+# Constants
+JSON_ARTIFACT_CACHE_SIZE = 1024  # Rendered JSON artifacts kept in memory
+
 
 def generate_narrative(plan_steps: List[PlanStep], results: List[ExecutionResult]) -> Dict[str, str]:
     """
@@ -20,62 +24,97 @@ def generate_narrative(plan_steps: List[PlanStep], results: List[ExecutionResult
     Returns:
         Dictionary with section titles and corresponding markdown text
     """
-    section_texts = {}
+    return {section_title(step): render_section(step, result) for step, result in zip(plan_steps, results)}
+
+
+def section_title(step: PlanStep) -> str:
+    """Section title of a step, derived from its tool name."""
+    return step.tool.replace('_', ' ').title()
+
+
+def render_section(step: PlanStep, result: ExecutionResult) -> str:
+    """
+    Render the markdown section for one step and its result.
+    
+    Args:
+        step: The planned analysis step
+        result: Its execution result
+        
+    Returns:
+        Markdown text of the section
+    """
+    title = section_title(step)
+    parts = [f"## {title}\n\n", f"**Description:** {step.description}\n\n"]
 
-    for step, result in zip(plan_steps, results):
-        # Create section title from tool name
-        title = step.tool.replace('_', ' ').title()
-        summary = f"## {title}\n\n"
-        summary += f"**Description:** {step.description}\n\n"
+    if result.status == "error":
+        parts.append(f"❌ **Error:** {result.error}\n\n")
+        return "".join(parts)
 
-        if result.status == "error":
-            summary += f"❌ **Error:** {result.error}\n\n"
+    parts.append("✅ **Status:** Completed successfully\n\n")
+
+    # Add preview data if available
+    preview = result.output_preview
+    if preview:
+        parts.append("**Results:**\n\n")
+        if isinstance(preview, dict):
+            # Format as key-value pairs
+            parts.extend(f"- **{key}:** {value}\n" for key, value in preview.items())
+        elif isinstance(preview, list):
+            # Format as table if it's a list of dicts
+            if isinstance(preview[0], dict):
+                total = result.truncation.total_rows if result.truncation else None
+                parts.append(_format_table(preview, total_rows=total))
+            else:
+                parts.append(f"- {', '.join(map(str, preview))}\n")
+        parts.append("\n")
+
+    # Previews are capped by the executor; point at the full output
+    if result.truncation:
+        parts.append(
+            f"*Preview truncated to {result.truncation.preview_rows} of "
+            f"{result.truncation.total_rows} rows; full output: "
+            f"`{result.truncation.full_output_path}`*\n\n"
+        )
+
+    # Add artifact reference if available
+    if result.artifact_path:
+        artifact_name = Path(result.artifact_path).name
+        if result.artifact_path.endswith(('.png', '.jpg', '.jpeg')):
+            parts.append(f"**Visualization:**\n\n![{title}]({result.artifact_path})\n\n")
+        elif result.artifact_path.endswith('.json'):
+            # Try to read and display JSON artifacts
+            try:
+                if os.path.exists(result.artifact_path):
+                    parts.append(_json_artifact_block(result.artifact_path))
+            except Exception as e:
+                parts.append(f"**Artifact:** {artifact_name} (could not display: {e})\n\n")
         else:
-            summary += "✅ **Status:** Completed successfully\n\n"
-            
-            # Add preview data if available
-            if result.output_preview:
-                summary += "**Results:**\n\n"
-                if isinstance(result.output_preview, dict):
-                    # Format as key-value pairs
-                    for key, value in result.output_preview.items():
-                        summary += f"- **{key}:** {value}\n"
-                elif isinstance(result.output_preview, list) and result.output_preview:
-                    # Format as table if it's a list of dicts
-                    if isinstance(result.output_preview[0], dict):
-                        summary += _format_table(result.output_preview)
-                    else:
-                        summary += f"- {', '.join(map(str, result.output_preview))}\n"
-                summary += "\n"
-            
-            # Add artifact reference if available
-            if result.artifact_path:
-                artifact_name = Path(result.artifact_path).name
-                if result.artifact_path.endswith(('.png', '.jpg', '.jpeg')):
-                    summary += f"**Visualization:**\n\n![{title}]({result.artifact_path})\n\n"
-                elif result.artifact_path.endswith('.json'):
-                    # Try to read and display JSON artifacts
-                    try:
-                        if os.path.exists(result.artifact_path):
-                            with open(result.artifact_path, 'r') as f:
-                                data = json.load(f)
-                            summary += f"**Statistical Results:**\n\n```json\n{json.dumps(data, indent=2)}\n```\n\n"
-                    except Exception as e:
-                        summary += f"**Artifact:** {artifact_name} (could not display: {e})\n\n"
-                else:
-                    summary += f"**Generated file:** `{artifact_name}`\n\n"
-
-        section_texts[title] = summary
-
-    return section_texts
-
-
-def _format_table(data: List[Dict[str, Any]]) -> str:
+            parts.append(f"**Generated file:** `{artifact_name}`\n\n")
+
+    return "".join(parts)
+
+
+def _json_artifact_block(path: str) -> str:
+    """Pretty-printed JSON artifact block, re-read only when the file changes."""
+    stat = os.stat(path)
+    return _render_json_artifact(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=JSON_ARTIFACT_CACHE_SIZE)
+def _render_json_artifact(path: str, mtime_ns: int, size: int) -> str:
+    """Read and pretty-print a JSON artifact (cached by path, mtime and size)."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return f"**Statistical Results:**\n\n```json\n{json.dumps(data, indent=2)}\n```\n\n"
+
+
+def _format_table(data: List[Dict[str, Any]], total_rows: Optional[int] = None) -> str:
     """
     Format list of dictionaries as a markdown table.
     
     Args:
         data: List of dictionaries with consistent keys
+        total_rows: Rows in the full output, when data is a capped preview
         
     Returns:
         Markdown table string
@@ -95,8 +134,9 @@ def _format_table(data: List[Dict[str, Any]]) -> str:
         values = [str(row.get(h, "")) for h in headers]
         table += "| " + " | ".join(values) + " |\n"
     
-    if len(data) > 10:
-        table += f"\n*Showing first 10 of {len(data)} rows*\n"
+    total_rows = total_rows or len(data)
+    if total_rows > 10:
+        table += f"\n*Showing first {min(len(data), 10)} of {total_rows} rows*\n"
     
     return table + "\n"
 
@@ -116,23 +156,25 @@ def create_summary_overview(plan_steps: List[PlanStep], results: List[ExecutionR
     successful_steps = sum(1 for r in results if r.status == "success")
     failed_steps = total_steps - successful_steps
     
-    overview = "# Analysis Summary\n\n"
-    overview += f"**Total Steps:** {total_steps}\n"
-    overview += f"**Successful:** {successful_steps} ✅\n"
-    overview += f"**Failed:** {failed_steps} ❌\n\n"
+    parts = [
+        "# Analysis Summary\n\n",
+        f"**Total Steps:** {total_steps}\n",
+        f"**Successful:** {successful_steps} ✅\n",
+        f"**Failed:** {failed_steps} ❌\n\n",
+    ]
     
     if failed_steps > 0:
-        overview += "## ⚠️ Issues Encountered\n\n"
+        parts.append("## ⚠️ Issues Encountered\n\n")
         for step, result in zip(plan_steps, results):
             if result.status == "error":
-                overview += f"- **{step.tool}**: {result.error}\n"
-        overview += "\n"
+                parts.append(f"- **{step.tool}**: {result.error}\n")
+        parts.append("\n")
     
     # List the analysis steps performed
-    overview += "## Analysis Steps Performed\n\n"
-    for i, step in enumerate(plan_steps, 1):
-        status_icon = "✅" if results[i-1].status == "success" else "❌"
-        overview += f"{i}. {status_icon} **{step.tool.replace('_', ' ').title()}**: {step.description}\n"
+    parts.append("## Analysis Steps Performed\n\n")
+    for i, (step, result) in enumerate(zip(plan_steps, results), 1):
+        status_icon = "✅" if result.status == "success" else "❌"
+        parts.append(f"{i}. {status_icon} **{section_title(step)}**: {step.description}\n")
     
-    overview += "\n---\n\n"
-    return overview
\ No newline at end of file
+    parts.append("\n---\n\n")
+    return "".join(parts)
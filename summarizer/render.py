@@ -1,33 +1,63 @@
 # summarizer/render.py
 # HTML renderer and asset embedding logic for summarization reports.
 
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict
-from datetime import datetime
+
+from summarizer.writer import ReportWriter
+
+# Constants
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables"]
+
+# Markdown converters are stateful, so each thread keeps its own
+_converters = threading.local()
 
 def render_markdown_report(narrative_sections: Dict[str, str], output_path: Path) -> Path:
     """
     Assemble full Markdown report from narrative sections and write to file.
-    """
-    header = "# AutoStat-Agent Report\n\n"
-    header += f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-
-    body = "\n".join(narrative_sections.values())
-    full_report = header + body
 
-    output_path.write_text(full_report)
+    Sections are streamed to the file rather than joined in memory.
+    """
+    with ReportWriter(output_path) as writer:
+        writer.write_header()
+        for i, text in enumerate(narrative_sections.values()):
+            if i:
+                writer.write("\n")
+            writer.write(text)
     return output_path
 
 def render_html_from_markdown(markdown_path: Path, html_path: Path) -> Path:
     """
     Convert Markdown to HTML with basic styling.
     """
-    import markdown
+    html_path.write_text(wrap_html(markdown_to_html(markdown_path.read_text())))
+    return html_path
+
+
+def markdown_to_html(md_text: str) -> str:
+    """
+    Convert Markdown text to an HTML fragment.
+
+    The converter (and its extensions) is built once per thread and reset
+    between documents instead of being recreated for every report.
 
-    md_text = markdown_path.read_text()
-    html_content = markdown.markdown(md_text, extensions=["fenced_code", "tables"])
+    Raises:
+        ImportError: If the markdown package is not installed
+    """
+    converter = getattr(_converters, "markdown", None)
+    if converter is None:
+        converter = _markdown_module().Markdown(extensions=MARKDOWN_EXTENSIONS)
+        _converters.markdown = converter
+    return converter.reset().convert(md_text)
 
-    full_html = f"""<!DOCTYPE html>
+
+def wrap_html(html_content: str) -> str:
+    """
+    Wrap an HTML fragment in the report page template.
+    """
+    return f"""<!DOCTYPE html>
 <html>
 <head>
   <meta charset="UTF-8">
@@ -44,5 +74,10 @@ def render_html_from_markdown(markdown_path: Path, html_path: Path) -> Path:
 </body>
 </html>"""
 
-    html_path.write_text(full_html)
-    return html_path
+
+@lru_cache(maxsize=None)
+def _markdown_module():
+    """Import the optional markdown package once."""
+    import markdown
+
+    return markdown
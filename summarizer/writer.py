@@ -0,0 +1,175 @@
+# summarizer/writer.py
+# Streaming markdown report writer with an LRU cache of rendered sections.
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, List, Optional, Union
+
+from core.metrics import metrics
+from executor.schemas import ExecutionResult
+from planner.schemas import PlanStep
+from summarizer.narrative import create_summary_overview, render_section
+
+# Constants
+SECTION_CACHE_SIZE = int(os.getenv("AUTOSTAT_SECTION_CACHE_SIZE", "4096"))  # Rendered sections kept in memory
+REPORT_TITLE = "# AutoStat-Agent Report\n\n"
+
+
+def section_key(step: PlanStep, result: ExecutionResult) -> str:
+    """
+    Hash everything that shapes a step's rendered section.
+
+    Step and result IDs and the step's duration do not appear in the
+    section, so re-running an unchanged step hits the cache.
+
+    Args:
+        step: The planned analysis step
+        result: Its execution result
+
+    Returns:
+        Hex digest identifying the section's content
+    """
+    payload = (
+        step.model_dump_json(include={"tool", "description"})
+        + result.model_dump_json(exclude={"step_id", "duration_ms"})
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SectionCache:
+    """
+    Thread-safe LRU cache of rendered report sections keyed by section_key.
+
+    Regenerating a report after one step changed re-renders only that
+    step's section. Hits and misses are counted as
+    ``summarizer.section_cache.hits`` / ``.misses``.
+    """
+
+    def __init__(self, max_size: int = SECTION_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of sections kept
+        """
+        self.max_size = max_size
+        self._sections: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, step: PlanStep, result: ExecutionResult) -> str:
+        """
+        Return a step's rendered section, rendering it only on a miss.
+
+        Args:
+            step: The planned analysis step
+            result: Its execution result
+
+        Returns:
+            Markdown text of the section
+        """
+        key = section_key(step, result)
+        with self._lock:
+            text = self._sections.get(key)
+            if text is not None:
+                self._sections.move_to_end(key)
+        if text is not None:
+            metrics.incr("summarizer.section_cache.hits")
+            return text
+
+        metrics.incr("summarizer.section_cache.misses")
+        text = render_section(step, result)
+        with self._lock:
+            self._sections[key] = text
+            while len(self._sections) > self.max_size:
+                self._sections.popitem(last=False)
+        return text
+
+    def clear(self) -> None:
+        """Drop every cached section."""
+        with self._lock:
+            self._sections.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sections)
+
+
+class ReportWriter:
+    """
+    Writes a markdown report to disk piece by piece.
+
+    Text goes to a temporary file next to the report, which replaces the
+    report only when the writer closes without error; readers never see a
+    half-written report, and no full copy of it is held in memory.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Initialize the writer (the file is opened on enter).
+
+        Args:
+            path: Final report path
+        """
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        self._file: Optional[IO[str]] = None
+
+    def __enter__(self) -> "ReportWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._tmp_path, "w", encoding="utf-8")
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self._file.close()
+        if exc_type is None:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.unlink(self._tmp_path)
+
+    def write(self, text: str) -> None:
+        """Append text to the report."""
+        self._file.write(text)
+
+    def write_header(self) -> None:
+        """Write the report title and generation time."""
+        self.write(REPORT_TITLE + f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+
+_section_cache = SectionCache()
+
+
+def get_section_cache() -> SectionCache:
+    """Return the process-wide section cache."""
+    return _section_cache
+
+
+def write_report(
+    plan_steps: List[PlanStep],
+    results: List[ExecutionResult],
+    report_path: Union[str, Path],
+    cache: Optional[SectionCache] = None,
+) -> Path:
+    """
+    Stream a full report (header, overview, one section per step) to disk.
+
+    Args:
+        plan_steps: List of analysis steps that were planned
+        results: List of execution results for each step
+        report_path: Where to write the report
+        cache: Section cache (defaults to the process-wide one)
+
+    Returns:
+        Path to the written report
+    """
+    cache = _section_cache if cache is None else cache
+    with ReportWriter(report_path) as writer:
+        writer.write_header()
+        writer.write(create_summary_overview(plan_steps, results))
+        for step, result in zip(plan_steps, results):
+            writer.write("\n")
+            writer.write(cache.render(step, result))
+    return writer.path
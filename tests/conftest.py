@@ -0,0 +1,29 @@
+# tests/conftest.py
+# Shared fixtures for the test suite.
+
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from api.main import app
+
+
+@pytest.fixture
+def live_server():
+    """
+    Serve the API from a real uvicorn server on a free port.
+
+    Unlike TestClient, this exercises genuine concurrency and streaming
+    (TestClient buffers whole responses). Yields the base URL.
+    """
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(5)
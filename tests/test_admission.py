@@ -0,0 +1,139 @@
+# tests/test_admission.py
+# Tests for admission control: limits, 429 backpressure, fairness and memory budgets.
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import admission
+from api.admission import AdmissionClass, AdmissionController, AdmissionMiddleware
+from api.routers import datasets as datasets_router
+from datasets import storage
+
+MB = 1024 * 1024
+
+
+def _controller(concurrency=1, queue_size=4, budget=100 * MB, max_wait=5.0):
+    return AdmissionController({"llm": AdmissionClass("llm", concurrency, queue_size)}, budget, max_wait)
+
+
+def test_queue_full_is_rejected_with_retry_after():
+    async def scenario():
+        ctl = _controller(concurrency=1, queue_size=1)
+        cls = ctl.classes["llm"]
+        assert await ctl.acquire(cls, "a", MB) is None
+        waiting = asyncio.create_task(ctl.acquire(cls, "a", MB))
+        await asyncio.sleep(0)
+        status, _, headers = await ctl.acquire(cls, "a", MB)
+        assert status == 429 and int(headers["Retry-After"]) >= 1
+        ctl.release(cls, MB, 0.1)
+        assert await waiting is None  # the queued request got the freed slot
+        assert cls.active == 1 and cls.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiters_are_served_round_robin_across_clients():
+    async def scenario():
+        ctl = _controller(concurrency=1, queue_size=10)
+        cls = ctl.classes["llm"]
+        await ctl.acquire(cls, "holder", MB)
+        order = []
+
+        async def request(client, tag):
+            await ctl.acquire(cls, client, MB)
+            order.append(tag)
+
+        tasks = [asyncio.create_task(request("greedy", f"g{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("polite", "p0")))
+        await asyncio.sleep(0)
+        for _ in range(4):
+            ctl.release(cls, MB, 0.1)
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        assert order == ["g0", "p0", "g1", "g2"]
+
+    asyncio.run(scenario())
+
+
+def test_memory_budget_limits_concurrency_and_rejects_oversized():
+    async def scenario():
+        ctl = _controller(concurrency=10, budget=100 * MB, max_wait=0.05)
+        cls = ctl.classes["llm"]
+        assert await ctl.acquire(cls, "a", 60 * MB) is None
+        status, _, _ = await ctl.acquire(cls, "b", 60 * MB)  # fits no earlier than max_wait
+        assert status == 429
+        status, _, _ = await ctl.acquire(cls, "c", 200 * MB)
+        assert status == 413
+        assert ctl.reserved == 60 * MB and cls.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_middleware_rejects_when_saturated():
+    inner = FastAPI()
+
+    @inner.post("/analyze")
+    async def analyze():
+        return {"ok": True}
+
+    ctl = _controller(concurrency=1, queue_size=0)
+    app = AdmissionMiddleware(inner, ctl)
+    client = TestClient(app)
+    assert client.post("/analyze").status_code == 200
+    assert ctl.classes["llm"].active == 0  # released after the response
+
+    ctl.classes["llm"].active = 1  # simulate a request in flight
+    resp = client.post("/analyze")
+    assert resp.status_code == 429 and "retry-after" in resp.headers
+    assert client.get("/docs").status_code == 200  # unmatched routes are not limited
+
+
+def test_row_page_cost_reads_profiles_off_loop_and_caches_misses(monkeypatch):
+    reads = []
+
+    def load_profile(dataset_id):
+        reads.append(dataset_id)
+        if dataset_id == "missing":
+            raise FileNotFoundError(dataset_id)
+        return {"num_rows": 1_000_000, "num_columns": 200}
+
+    monkeypatch.setattr(admission, "load_profile", load_profile)
+    monkeypatch.setattr(admission, "_shapes", admission.OrderedDict())
+    scope = {"query_string": b"limit=10000"}
+
+    async def scenario():
+        for _ in range(3):
+            assert await admission.rows_cost(scope, {"dataset_id": "missing"}) == admission.PLAN_REQUEST_BYTES
+            assert await admission.rows_cost(scope, {"dataset_id": "wide"}) == 10_000 * 200 * admission.BYTES_PER_CELL
+
+    asyncio.run(scenario())
+    assert reads == ["missing", "wide"]
+
+
+def test_chunked_upload_larger_than_its_reservation_is_rejected(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(admission, "DEFAULT_UPLOAD_BYTES", 4096)
+    inner = FastAPI()
+    inner.include_router(datasets_router.router)
+    ctl = AdmissionController({"cpu": AdmissionClass("cpu", 1, 4)}, 100 * MB, 5.0)
+
+    boundary = "x" * 16
+    csv = b"a,b\n" + b"1,2\n" * 4096
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"d.csv\"\r\n"
+        f"Content-Type: text/csv\r\n\r\n".encode() + csv + f"\r\n--{boundary}--\r\n".encode()
+    )
+
+    def chunks():  # A generator body is sent chunked, without Content-Length
+        for start in range(0, len(body), 1024):
+            yield body[start:start + 1024]
+
+    resp = TestClient(AdmissionMiddleware(inner, ctl)).post(
+        "/datasets/upload", content=chunks(), headers={"content-type": f"multipart/form-data; boundary={boundary}"}
+    )
+    assert resp.status_code == 413
+    assert not list(tmp_path.iterdir())  # Nothing spooled is left behind
+    assert ctl.classes["cpu"].active == 0 and ctl.reserved == 0
@@ -0,0 +1,110 @@
+# tests/test_agent.py
+# Tests for the pipelined agent and the deterministic critic.
+
+import threading
+import uuid
+
+import pandas as pd
+import pytest
+
+from core.agent import Agent
+from core.critic import check_result, check_step
+from core.state import PromptState
+from datasets.profile import is_numeric_column, profile_dataset
+from executor.schemas import ExecutionResult
+from planner.schemas import PlanStep
+
+
+def _step(tool, **args):
+    return PlanStep(step_id=uuid.uuid4().hex, description=f"Run {tool}", tool=tool, args=args)
+
+
+@pytest.fixture
+def state(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # Artifacts and reports are relative
+    df = pd.DataFrame({"age": [25, 32, 47, 51, 38, 29], "gender": ["f", "m", "f", "m", "f", "m"]})
+    return PromptState(question="q", profile=profile_dataset(df), dataframe=df)
+
+
+def test_steps_execute_while_the_plan_is_still_being_generated(state, tmp_path):
+    first, second = _step("summary_stats", columns=["age"]), _step("histogram", columns=["age"])
+    first_done = threading.Event()
+    overlapped = []
+
+    def plan_source(prompt_state, use_cache):
+        yield [first]
+        # Planning of the second step waits until the first has finished executing
+        overlapped.append(first_done.wait(5))
+        yield [second]
+
+    events = []
+    def on_event(event_type, data):
+        events.append(event_type)
+        if event_type == "step_finished" and data["step_id"] == first.step_id:
+            first_done.set()
+
+    result = Agent(plan_source).run(state, tmp_path / "report.md", on_event=on_event)
+
+    assert overlapped == [True]
+    assert [r["status"] for r in result.results] == ["success", "success"]
+    assert events[0] == "plan" and "plan_extended" in events
+    assert set(result.stage_seconds) == {"plan", "critic", "execute", "summarize"}
+    assert result.first_result_seconds < result.wall_seconds
+    report = (tmp_path / "report.md").read_text()
+    assert "Pending" not in report and report.count("**Description:**") == 2
+
+
+def test_critic_rejects_unrunnable_steps_without_executing_them(state, tmp_path):
+    good, bad = _step("summary_stats", columns=["age"]), _step("histogram", columns=["salary"])
+    started = []
+    result = Agent(lambda s, c: [[good, bad]]).run(
+        state, tmp_path / "report.md", on_event=lambda t, d: started.extend(d["covers"]) if t == "step_started" else None
+    )
+
+    assert bad.step_id not in started
+    by_id = {r["step_id"]: r for r in result.results}
+    assert by_id[good.step_id]["status"] == "success"
+    assert by_id[bad.step_id]["error"].startswith("Rejected by critic")
+    assert [(c.step_id, c.check) for c in result.critiques if c.severity == "error"] == [(bad.step_id, "unknown_column")]
+
+
+def test_planning_failure_is_raised_after_finalizing_the_report(state, tmp_path):
+    step = _step("summary_stats", columns=["age"])
+
+    def plan_source(prompt_state, use_cache):
+        yield [step]
+        raise RuntimeError("model server went away")
+
+    with pytest.raises(RuntimeError, match="went away"):
+        Agent(plan_source).run(state, tmp_path / "report.md")
+    assert "in progress" not in (tmp_path / "report.md").read_text()
+
+
+def test_critic_checks_steps_against_the_profile_and_results_for_sanity(state, tmp_path):
+    profile = state.profile
+    assert check_step(_step("summary_stats", columns=["age"]), profile) == []
+    assert [c.check for c in check_step(_step("boxplot", x="age", y="gender"), profile)] == ["non_numeric_column"]
+    assert [c.check for c in check_step(_step("t_test", group_column="age", value_column="age"), profile)] == [
+        "group_levels"
+    ]
+    assert [c.check for c in check_step(_step("regression", y="age"), profile)] == ["unknown_tool"]
+
+    step = _step("t_test", group_column="gender", value_column="age")
+    missing = ExecutionResult(step_id=step.step_id, status="success", artifact_path=str(tmp_path / "gone.json"),
+                              output_preview={"p_value": 1.5})
+    assert [c.check for c in check_result(step, missing)] == ["missing_artifact", "invalid_p_value"]
+
+
+def test_numeric_columns_are_judged_by_dtype_alone():
+    df = pd.DataFrame({
+        "score": pd.array([1.5, None, 3.0], dtype="Float64"),
+        "count": pd.array([1, 2, None], dtype="Int64"),
+        "flag": [True, False, True],
+        "name": ["a", "b", "c"],
+    })
+    profile = profile_dataset(df)
+    assert [is_numeric_column(profile["columns"][c]) for c in df.columns] == [True, True, False, False]
+    # A stray "mean" does not make a text column numeric
+    assert not is_numeric_column({"dtype": "object", "mean": 1.0})
+    assert [c.check for c in check_step(_step("histogram", columns=["flag"]), profile)] == ["non_numeric_column"]
+    assert check_step(_step("histogram", columns=["score", "count"]), profile) == []
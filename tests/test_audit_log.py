@@ -0,0 +1,66 @@
+# tests/test_audit_log.py
+# Unit tests for the buffered audit log that replaced per-plan log directories.
+
+import glob
+import os
+
+from planner.logging import AuditLog, PlanLogger, get_audit_log, query_run
+
+
+def test_plan_logger_records_are_queryable_by_run(tmp_path):
+    log = AuditLog(root=str(tmp_path))
+    first, second = PlanLogger(audit_log=log), PlanLogger(audit_log=log)
+    first.text("prompt", "What is the age distribution?")
+    second.text("prompt", "Other question")
+    first.json("clean", [{"tool": "histogram", "args": {"columns": ["age"]}}])
+
+    records = log.query_run(first.run_id)
+
+    assert [(r["stage"], r["kind"]) for r in records] == [("prompt", "text"), ("clean", "json")]
+    assert records[1]["content"][0]["tool"] == "histogram"
+    assert sorted(os.listdir(tmp_path)) == ["audit.jsonl", "audit.lock"]
+    log.close()
+
+
+def test_rotation_compresses_old_files_and_query_spans_them(tmp_path):
+    log = AuditLog(root=str(tmp_path), max_bytes=2_000, batch_size=5)
+    logger = PlanLogger(audit_log=log)
+    for i in range(100):
+        logger.text("raw", f"response {i} " + "x" * 50)
+    log.close()
+
+    assert glob.glob(str(tmp_path / "audit-*.jsonl.gz"))
+    assert os.path.getsize(tmp_path / "audit.jsonl") <= 2_000
+    contents = [r["content"] for r in query_run(logger.run_id, str(tmp_path))]
+    assert contents == [f"response {i} " + "x" * 50 for i in range(100)]
+
+
+def test_rotation_measures_encoded_bytes(tmp_path):
+    log = AuditLog(root=str(tmp_path), max_bytes=2_000, batch_size=1)
+    logger = PlanLogger(audit_log=log)
+    for i in range(40):
+        logger.text("raw", "é" * 60)
+    log.close()
+
+    assert os.path.getsize(tmp_path / "audit.jsonl") <= 2_000
+    assert len(query_run(logger.run_id, str(tmp_path))) == 40
+
+
+def test_plan_logger_root_selects_that_directory_log(tmp_path):
+    logger = PlanLogger(str(tmp_path))
+    logger.text("prompt", "q")
+    get_audit_log(str(tmp_path)).flush()
+    assert [r["content"] for r in query_run(logger.run_id, str(tmp_path))] == ["q"]
+
+
+def test_query_matches_the_record_run_id_and_reads_uncompressed_rotations(tmp_path):
+    log = AuditLog(root=str(tmp_path))
+    first, second = PlanLogger(audit_log=log), PlanLogger(audit_log=log)
+    first.text("prompt", "q")
+    second.json("clean", {"run_id": first.run_id})  # Content that mentions another run
+    log.close()
+
+    # A writer that crashed between rotating and gzipping leaves a plain rotated file
+    os.replace(tmp_path / "audit.jsonl", tmp_path / "audit-00000000000000000001-1.jsonl")
+    records = query_run(first.run_id, str(tmp_path))
+    assert [(r["run_id"], r["stage"]) for r in records] == [(first.run_id, "prompt")]
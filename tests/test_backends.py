@@ -0,0 +1,148 @@
+# tests/test_backends.py
+# Backend pool tests against local stub model servers with injected latency.
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from planner.backends import BackendError, BackendPool
+
+
+class StubServer:
+    """Minimal Ollama-like server answering /api/generate after a fixed delay."""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name, self.delay, self.fail = name, delay, fail
+        self.calls = 0
+        self.aborted = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.send_response(500 if stub.fail else 200)
+                self.end_headers()
+                self.wfile.write(b'{"models": []}')
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.calls += 1
+                time.sleep(stub.delay)
+                try:
+                    self.send_response(500 if stub.fail else 200)
+                    self.send_header("Content-Type", "application/json")
+                    self.end_headers()
+                    if payload.get("stream"):
+                        # One NDJSON message per character, like a token stream
+                        for ch in stub.name:
+                            self.wfile.write(json.dumps({"response": ch, "done": False}).encode() + b"\n")
+                        self.wfile.write(b'{"response": "", "done": true}\n')
+                    else:
+                        self.wfile.write(json.dumps({"response": stub.name}).encode())
+                except OSError:
+                    stub.aborted += 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.host = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+@pytest.fixture
+def stubs():
+    servers = []
+
+    def make(*args, **kwargs):
+        servers.append(StubServer(*args, **kwargs))
+        return servers[-1]
+
+    yield make
+    for s in servers:
+        s.close()
+
+
+def test_least_outstanding_routing_spreads_concurrent_load(stubs):
+    a, b, c = stubs("a", delay=0.2), stubs("b", delay=0.2), stubs("c", delay=0.2)
+    pool = BackendPool([a.host, b.host, c.host])
+
+    threads = [threading.Thread(target=pool.generate, args=({"prompt": "x"},)) for _ in range(6)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert (a.calls, b.calls, c.calls) == (2, 2, 2)
+    assert time.perf_counter() - start < 0.8
+    assert pool.stats()[a.host]["requests"] == 2
+
+
+def test_failover_marks_unhealthy_backend_and_health_check_detects_it(stubs):
+    bad, good = stubs("bad", fail=True), stubs("good")
+    pool = BackendPool([bad.host, good.host])
+    bad_backend = pool.backends[0]
+
+    # Force the first pick onto the failing server
+    pool.backends[1].outstanding = 1
+    assert pool.generate({"prompt": "x"})["response"] == "good"
+    pool.backends[1].outstanding = 0
+
+    assert pool.check_health() == {bad.host: False, good.host: True}
+    assert bad_backend.errors == 1 and pool.pick() is pool.backends[1]
+
+    with pytest.raises(BackendError):
+        BackendPool([bad.host, stubs("also-bad", fail=True).host]).generate({"prompt": "x"})
+
+
+def test_hedged_request_returns_fast_backend_and_cancels_slow_one(stubs):
+    slow, fast = stubs("slow", delay=1.5), stubs("fast", delay=0.05)
+    pool = BackendPool([slow.host, fast.host], hedge=True)
+    for backend in pool.backends:
+        backend._latencies.extend([0.1] * 50)  # p95 of 100 ms -> hedge after 100 ms
+
+    start = time.perf_counter()
+    result = pool.generate({"prompt": "x"})
+    elapsed = time.perf_counter() - start
+
+    assert result["response"] == "fast"
+    assert elapsed < 1.0
+    assert (slow.calls, fast.calls) == (1, 1)
+    assert pool.backends[0].healthy  # cancelling the loser is not a failure
+
+
+def test_hedge_delay_is_not_spent_queueing_behind_other_requests(stubs):
+    fast, spare = stubs("fast", delay=0.05), stubs("spare")
+    pool = BackendPool([fast.host, spare.host], hedge=True)
+    for backend in pool.backends:
+        backend._latencies.extend([0.2] * 50)
+    # Every worker of the pool's shared executor is busy
+    release = threading.Event()
+    for _ in range(pool._executor._max_workers):
+        pool._executor.submit(release.wait, 5)
+
+    try:
+        start = time.perf_counter()
+        assert pool.generate({"prompt": "x"})["response"] == "fast"
+        assert time.perf_counter() - start < 0.5
+        assert spare.calls == 0  # The primary answered within its p95: no hedge
+    finally:
+        release.set()
+
+
+def test_streamed_generation_fails_over_before_the_first_fragment(stubs):
+    bad, good = stubs("bad", fail=True), stubs("streamed")
+    pool = BackendPool([bad.host, good.host])
+    pool.backends[1].outstanding = 1  # Force the first pick onto the failing server
+
+    fragments = list(pool.generate_stream({"prompt": "x"}))
+
+    assert fragments == list("streamed")
+    assert (bad.calls, good.calls) == (1, 1)
+    assert pool.backends[0].errors == 1
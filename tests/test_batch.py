@@ -0,0 +1,123 @@
+# tests/test_batch.py
+# Tests for the batch planning endpoint.
+
+import json
+import threading
+import time
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.admission import AdmissionClass, AdmissionController, AdmissionMiddleware
+from api.main import app
+from api.pools import IO_WORKERS
+from api.routers import analyze
+from api.routers.analyze import BATCH_MAX_CONCURRENCY
+from api.schemas import BATCH_MAX_PROMPTS
+from datasets import storage
+from datasets.profile import profile_dataset
+from planner import llm_planner
+from planner.schemas import PlanStep
+
+
+def test_batch_streams_plans_with_bounded_concurrency(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    df = pd.read_csv("example_data.csv")
+    storage.save_dataset("ds1", df, profile_dataset(df))
+
+    prepared_seen = set()
+
+    def slow_plan(state, use_cache=True, prepared=None):
+        prepared_seen.add(id(prepared))
+        time.sleep(0.3)
+        return [PlanStep(step_id="s", description=state.question, tool="eda_overview", args={})]
+
+    monkeypatch.setattr(llm_planner, "plan", slow_plan)
+    prompts = [f"What drives income? ({i})" for i in range(8)]  # no rule match -> LLM path
+
+    client = TestClient(app)
+    start = time.perf_counter()
+    with client.stream("POST", "/analyze/batch", json={"dataset_id": "ds1", "prompts": prompts, "concurrency": 4}) as resp:
+        assert resp.status_code == 200
+        lines = [json.loads(line) for line in resp.iter_lines() if line]
+    elapsed = time.perf_counter() - start
+
+    assert sorted(line["index"] for line in lines) == list(range(8))
+    assert all(line["plan"][0]["description"] == prompts[line["index"]] for line in lines)
+    assert len(prepared_seen) == 1  # profile rendered once for the whole batch
+    assert 0.6 <= elapsed < 1.5  # 8 prompts x 0.3 s at concurrency 4 -> ~2 rounds
+
+
+def test_batch_unknown_dataset_is_404(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    resp = TestClient(app).post("/analyze/batch", json={"dataset_id": "missing", "prompts": ["x"]})
+    assert resp.status_code == 404
+
+
+def test_batch_rejects_too_many_prompts(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    prompts = ["x"] * (BATCH_MAX_PROMPTS + 1)
+    resp = TestClient(app).post("/analyze/batch", json={"dataset_id": "ds1", "prompts": prompts})
+    assert resp.status_code == 422
+
+
+def test_batch_concurrency_stays_below_the_io_pool(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    df = pd.read_csv("example_data.csv")
+    storage.save_dataset("ds1", df, profile_dataset(df))
+
+    lock = threading.Lock()
+    in_flight, peak = [0], [0]
+
+    def slow_plan(state, use_cache=True, prepared=None):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return [PlanStep(step_id="s", description=state.question, tool="eda_overview", args={})]
+
+    monkeypatch.setattr(llm_planner, "plan", slow_plan)
+    prompts = [f"What drives income? ({i})" for i in range(3 * IO_WORKERS)]
+
+    body = {"dataset_id": "ds1", "prompts": prompts, "concurrency": 10_000}
+    with TestClient(app).stream("POST", "/analyze/batch", json=body) as resp:
+        lines = [json.loads(line) for line in resp.iter_lines() if line]
+
+    assert sorted(line["index"] for line in lines) == list(range(len(prompts)))
+    assert peak[0] <= BATCH_MAX_CONCURRENCY < IO_WORKERS
+
+
+def test_each_batch_planner_call_takes_an_admission_slot(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    df = pd.read_csv("example_data.csv")
+    storage.save_dataset("ds1", df, profile_dataset(df))
+
+    lock = threading.Lock()
+    in_flight, peak = [0], [0]
+
+    def slow_plan(state, use_cache=True, prepared=None):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return [PlanStep(step_id="s", description=state.question, tool="eda_overview", args={})]
+
+    monkeypatch.setattr(llm_planner, "plan", slow_plan)
+    inner = FastAPI()
+    inner.include_router(analyze.router)
+    llm = AdmissionClass("llm", max_concurrency=2, queue_size=64)
+    ctl = AdmissionController({"llm": llm}, memory_budget=1024 ** 3, max_wait=10)
+    prompts = [f"What drives income? ({i})" for i in range(8)]
+
+    body = {"dataset_id": "ds1", "prompts": prompts, "concurrency": 8}
+    with TestClient(AdmissionMiddleware(inner, ctl)).stream("POST", "/analyze/batch", json=body) as resp:
+        lines = [json.loads(line) for line in resp.iter_lines() if line]
+
+    assert all(line["error"] is None for line in lines) and len(lines) == 8
+    assert peak[0] == 2  # the "llm" class limit, not the batch's own concurrency
+    assert llm.active == 0 and ctl.reserved == 0
@@ -0,0 +1,79 @@
+# tests/test_cli_run.py
+# Tests for the batch manifest runner: grouping, checkpoint/resume and the worker pool.
+
+import json
+
+import pandas as pd
+import pytest
+
+from cli import run as batch
+from datasets import storage
+from datasets.profile import profile_dataset
+
+PROMPTS = ["Give me an overview of the data", "Show the distribution of age by gender"]
+
+
+@pytest.fixture
+def manifest(monkeypatch, tmp_path):
+    """Two stored datasets with two rule-planned prompts each (no LLM needed)."""
+    df = pd.read_csv("example_data.csv")
+    monkeypatch.chdir(tmp_path)  # data_store, reports and checkpoints are relative
+    jobs = []
+    for dataset_id in ("ds_a", "ds_b"):
+        storage.save_dataset(dataset_id, df, profile_dataset(df))
+        jobs += [{"dataset_id": dataset_id, "prompt": p} for p in PROMPTS]
+    path = tmp_path / "jobs.jsonl"
+    path.write_text("\n".join(json.dumps(j) for j in jobs) + "\n")
+    return path
+
+
+def test_inline_batch_loads_each_dataset_once_and_resumes_from_checkpoint(manifest, monkeypatch, tmp_path):
+    loads = []
+    real_load = storage.load_dataset
+    monkeypatch.setattr(storage, "load_dataset", lambda dataset_id: loads.append(dataset_id) or real_load(dataset_id))
+    monkeypatch.setattr(batch, "_worker_datasets", batch.OrderedDict())
+
+    assert batch.main([str(manifest), "--workers", "0", "--chunk-size", "1"]) == 0
+    assert sorted(loads) == ["ds_a", "ds_b"]
+    outcomes = batch.load_checkpoint(str(tmp_path / "jobs.checkpoint.jsonl"))
+    assert len(outcomes) == 4 and all(o["status"] == "succeeded" for o in outcomes.values())
+    assert len(list((tmp_path / "reports" / "batch").glob("*.md"))) == 4
+
+    # Simulate an interrupted batch: one job never completed
+    lines = (tmp_path / "jobs.checkpoint.jsonl").read_text().splitlines()
+    (tmp_path / "jobs.checkpoint.jsonl").write_text("\n".join(lines[:3]) + "\n" + lines[3][:10])
+    summary = batch.run_batch(batch.load_manifest(str(manifest)), str(tmp_path / "jobs.checkpoint.jsonl"),
+                              workers=0, progress=None)
+    assert (summary["succeeded"], summary["skipped"]) == (1, 3)
+
+
+def test_manifest_validation_and_stable_ids(tmp_path):
+    path = tmp_path / "m.jsonl"
+    path.write_text(
+        '{"dataset_id": "d", "question": "q"}\n\n{"dataset_id": "d", "prompt": "q"}\n{"id": "x", "dataset_path": "a.csv", "prompt": "p"}\n'
+    )
+    jobs = batch.load_manifest(str(path))
+    assert jobs[0].id != jobs[1].id and jobs[1].id.startswith(jobs[0].id)
+    assert [j.id for j in batch.load_manifest(str(path))] == [j.id for j in jobs]
+    assert [len(c) for c in batch.group_jobs(jobs, chunk_size=1)] == [1, 1, 1]
+
+    path.write_text('{"prompt": "no dataset"}\n')
+    with pytest.raises(ValueError, match="job #1"):
+        batch.load_manifest(str(path))
+
+    # An invalid manifest leaves the checkpoint of an earlier run alone, even with --restart
+    checkpoint = tmp_path / "m.checkpoint.jsonl"
+    checkpoint.write_text('{"job_id": "x", "status": "succeeded"}\n')
+    with pytest.raises(SystemExit):
+        batch.main([str(path), "--restart"])
+    assert checkpoint.exists()
+
+
+def test_yaml_manifest_runs_in_worker_processes(manifest, tmp_path):
+    yaml = pytest.importorskip("yaml")
+    jobs = [json.loads(line) for line in manifest.read_text().splitlines()][:2]
+    path = tmp_path / "jobs.yaml"
+    path.write_text(yaml.safe_dump({"jobs": jobs}))
+
+    summary = batch.run_batch(batch.load_manifest(str(path)), str(tmp_path / "cp.jsonl"), workers=2, progress=None)
+    assert (summary["succeeded"], summary["failed"]) == (2, 0)
@@ -0,0 +1,74 @@
+# tests/test_html_export.py
+# Tests for self-contained HTML export and the image conversion cache.
+
+import shutil
+import zipfile
+
+import pytest
+from PIL import Image
+
+from core.metrics import metrics
+from summarizer.html_export import ConversionCache, export_html
+
+pytest.importorskip("markdown")
+
+
+def _report(tmp_path):
+    """A report referencing a large plot twice and an identical copy of it once."""
+    plots = tmp_path / "artifacts"
+    plots.mkdir()
+    Image.new("RGB", (1600, 1200), (30, 90, 200)).save(plots / "hist_a.png")
+    shutil.copy(plots / "hist_a.png", plots / "hist_b.png")
+    md = tmp_path / "report.md"
+    md.write_text(
+        "# Report\n\n![A](artifacts/hist_a.png)\n\n![A again](artifacts/hist_a.png)\n\n"
+        "![B](artifacts/hist_b.png)\n\n![Missing](artifacts/gone.png)\n"
+    )
+    return md
+
+
+def test_inline_export_embeds_thumbnails_and_converts_identical_images_once(tmp_path):
+    md = _report(tmp_path)
+    cache = ConversionCache(tmp_path / "cache", image_format="webp", thumbnail_size=320)
+
+    metrics.reset()
+    out = export_html(md, tmp_path / "out" / "report.html", cache=cache)
+    page = out.read_text()
+    assert page.count('src="data:image/webp;base64,') == 3
+    assert page.count('loading="lazy"') == 3
+    assert 'href="data:image/webp;base64,' in page
+    assert "artifacts/gone.png" in page  # Unresolvable references are left alone
+    counters = metrics.snapshot()["counters"]
+    assert counters["summarizer.html_export.conversions"] == 1
+    assert counters.get("summarizer.html_export.cache_hits", 0) == 1
+
+    thumbnail = next((tmp_path / "cache").glob("*_thumb.webp"))
+    with Image.open(thumbnail) as image:
+        assert max(image.size) == 320
+
+    metrics.reset()
+    export_html(md, tmp_path / "again.html", cache=cache)
+    assert "summarizer.html_export.conversions" not in metrics.snapshot()["counters"]
+
+
+def test_bundle_export_writes_relative_images_to_a_zip(tmp_path):
+    md = _report(tmp_path)
+    cache = ConversionCache(tmp_path / "cache", image_format="png")
+    out = export_html(md, tmp_path / "report.zip", mode="bundle", cache=cache)
+
+    with zipfile.ZipFile(out) as archive:
+        names = archive.namelist()
+        page = archive.read("index.html").decode()
+    images = [n for n in names if n.startswith("images/")]
+    assert len(images) == 2 and all(n.endswith(".png") for n in images)
+    for name in images:
+        assert f'"{name}"' in page
+    assert "data:" not in page
+
+
+def test_invalid_mode_and_format_are_rejected(tmp_path):
+    md = _report(tmp_path)
+    with pytest.raises(ValueError):
+        export_html(md, tmp_path / "r.html", mode="pdf", cache=ConversionCache(tmp_path / "cache"))
+    with pytest.raises(ValueError):
+        ConversionCache(tmp_path / "cache", image_format="gif")
@@ -0,0 +1,49 @@
+# tests/test_incremental_report.py
+# Tests for the incremental report that is rewritten as step results arrive.
+
+import pytest
+
+from executor.schemas import ExecutionResult
+from planner.schemas import PlanStep
+from summarizer.incremental import IncrementalReport
+from summarizer.writer import SectionCache
+
+
+def _steps(n):
+    return [PlanStep(step_id=f"s{i}", description=f"Step number {i}", tool="eda_overview", args={}) for i in range(n)]
+
+
+def _result(i):
+    return ExecutionResult(step_id=f"s{i}", status="success", output_preview={"marker": f"value-{i}"})
+
+
+def test_results_in_any_order_with_placeholders(tmp_path):
+    report = IncrementalReport(_steps(3), tmp_path / "run.md", cache=SectionCache())
+    text = report.report_path.read_text()
+    assert "Completed:** 0 of 3 steps" in text and text.count("Pending") == 3
+
+    report.add_result(_result(2))
+    text = report.report_path.read_text()
+    assert "Completed:** 1 of 3 steps" in text and "value-2" in text and text.count("Pending") == 2
+    # Sections keep plan order even though step 2 finished first
+    assert text.index("Step number 0") < text.index("Step number 1") < text.index("value-2")
+    assert report.pending == ["s0", "s1"]
+
+    report.add_result(_result(0))
+    path = report.finalize()
+    text = path.read_text()
+    assert "# Analysis Summary\n" in text and "in progress" not in text and "Pending" not in text
+    assert "Step was not executed" in text and "**Failed:** 1" in text
+
+    with pytest.raises(ValueError):
+        report.add_result(_result(1))
+    with pytest.raises(ValueError):
+        IncrementalReport(_steps(1), tmp_path / "other.md").add_result(_result(5))
+
+
+def test_finalize_with_complete_results_matches_plan(tmp_path):
+    report = IncrementalReport(_steps(2), tmp_path / "run.md", cache=SectionCache(), min_interval=60)
+    report.add_result(_result(1))  # Throttled: not written yet
+    assert "value-1" not in report.report_path.read_text()
+    text = report.finalize([_result(0), _result(1)]).read_text()
+    assert "**Successful:** 2" in text and "value-0" in text and "value-1" in text
@@ -0,0 +1,135 @@
+# tests/test_optimizer.py
+# Tests for the cost-based plan optimizer.
+
+import numpy as np
+import pandas as pd
+
+from core.state import PromptState
+from datasets.profile import profile_dataset
+from executor.runner import run_plan
+from planner.optimizer import estimate_step_cost, optimize_plan
+from planner.schemas import PlanStep
+
+
+def _step(step_id, tool, **args):
+    return PlanStep(step_id=step_id, description=f"{tool} {args}", tool=tool, args=args)
+
+
+def _frame(rows=2000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "age": rng.integers(18, 80, rows),
+        "income": rng.normal(50_000, 10_000, rows),
+        "gender": rng.choice(["male", "female"], rows),
+        "city": rng.choice([f"c{i}" for i in range(40)], rows),
+    })
+
+
+def test_merges_subsumed_summaries_and_histograms():
+    profile = profile_dataset(_frame())
+    steps = [
+        _step("h1", "histogram", columns=["age"]),
+        _step("s1", "summary_stats", columns=["age"]),
+        _step("s2", "summary_stats", columns=["age", "income"]),
+        _step("g1", "summary_stats", columns=["age"], by="gender"),
+        _step("h2", "histogram", columns=["income"]),
+        _step("b1", "boxplot", x="gender", y="age"),
+        _step("b2", "boxplot", x="gender", y="age"),
+    ]
+    optimized = optimize_plan(steps, profile)
+
+    assert len(optimized.steps) == 4
+    assert optimized.provenance["s1"] == optimized.provenance["s2"] == "s2"  # subsumed by s2
+    assert optimized.provenance["g1"] == "g1"  # different grouping is not merged
+    assert optimized.provenance["h1"] == optimized.provenance["h2"]
+    assert optimized.provenance["b2"] == "b1"
+    costs = [estimate_step_cost(s, profile) for s in optimized.steps]
+    assert costs == sorted(costs)
+    assert optimized.estimated_cost_after < optimized.estimated_cost_before
+
+
+def test_cardinality_raises_grouped_cost():
+    profile = profile_dataset(_frame())
+    by_gender = estimate_step_cost(_step("a", "summary_stats", columns=["age"], by="gender"), profile)
+    by_city = estimate_step_cost(_step("b", "summary_stats", columns=["age"], by="city"), profile)
+    assert by_city > by_gender
+
+
+def test_run_plan_attributes_merged_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # plots are written under ./artifacts
+    df = _frame()
+    ctx = PromptState(question="q", profile=profile_dataset(df), dataframe=df)
+    steps = [
+        _step("s1", "summary_stats", columns=["age"], by="gender"),
+        _step("s2", "summary_stats", columns=["income"], by="gender"),
+        _step("h1", "histogram", columns=["age"]),
+        _step("h2", "histogram", columns=["income"]),
+    ]
+    results, report = run_plan(steps, ctx)
+
+    assert [r.step_id for r in results] == ["s1", "s2", "h1", "h2"]
+    assert all(r.status == "success" for r in results)
+    assert set(results[0].output_preview[0]) == {"gender"} | {f"age_{s}" for s in
+        ("count", "mean", "std", "min", "25%", "50%", "75%", "max")}
+    assert results[2].artifact_path == results[3].artifact_path
+    assert report.steps_before == 4 and report.steps_after == 2
+    assert report.actual_ms > 0 and report.projected_ms_saved > 0
+
+
+def test_merged_summary_previews_are_capped_per_original_step(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # spilled outputs are written under ./artifacts
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200, 60)), columns=[f"x{i}" for i in range(60)])
+    ctx = PromptState(question="q", profile=profile_dataset(df), dataframe=df)
+    steps = [
+        _step("wide", "summary_stats", columns=list(df.columns)),
+        _step("narrow", "summary_stats", columns=["x55", "x58"]),
+    ]
+    results, report = run_plan(steps, ctx)
+
+    assert report.steps_after == 1
+    wide, narrow = results
+    assert [row["column"] for row in narrow.output_preview] == ["x55", "x58"]
+    assert narrow.truncation is None
+    assert len(wide.output_preview) == 50
+    assert (wide.truncation.total_rows, wide.truncation.preview_rows) == (60, 50)
+
+
+def _example_context():
+    df = pd.read_csv("example_data.csv")
+    return PromptState(question="q", profile=profile_dataset(df), dataframe=df)
+
+
+def test_unknown_column_fails_only_its_own_summary():
+    ctx = _example_context()
+    steps = [
+        _step("a", "summary_stats", columns=["age"]),
+        _step("b", "summary_stats", columns=["agee"]),
+        _step("c", "summary_stats", columns=["gender"]),
+    ]
+    results, _ = run_plan(steps, ctx, optimize=True)
+
+    assert [r.status for r in results] == ["success", "error", "success"]
+    assert [row["column"] for row in results[0].output_preview] == ["age"]
+
+
+def test_numeric_and_non_numeric_summaries_are_not_merged():
+    ctx = _example_context()
+    steps = [_step("a", "summary_stats", columns=["age"]), _step("c", "summary_stats", columns=["gender"])]
+    results, report = run_plan(steps, ctx, optimize=True)
+
+    assert report.steps_after == 2
+    assert [row["column"] for row in results[1].output_preview] == ["gender"]
+    assert results[1].output_preview[0]["unique"] == 2
+
+
+def test_failed_merged_step_reruns_its_original_steps():
+    ctx = _example_context()
+    # A stale profile lists a column the data no longer has, so the steps merge
+    ctx.profile["columns"]["agee"] = ctx.profile["columns"]["age"]
+    steps = [_step("a", "summary_stats", columns=["age"]), _step("b", "summary_stats", columns=["agee"])]
+    results, report = run_plan(steps, ctx, optimize=True)
+
+    assert report.steps_after == 1
+    assert [r.status for r in results] == ["success", "error"]
+    assert [row["column"] for row in results[0].output_preview] == ["age"]
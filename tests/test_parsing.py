@@ -0,0 +1,62 @@
+# tests/test_parsing.py
+# Fuzz and linear-time tests for the tolerant JSON plan extractor.
+
+import json
+import random
+import time
+
+from benchmarks.adversarial import SAMPLE_PLAN as PLAN, adversarial_inputs
+from planner.parsing import JsonArrayScanner, _extract_json_array, parse_plan
+
+MB = 1024 * 1024
+
+
+def _chunked(text, rng):
+    i = 0
+    while i < len(text):
+        step = rng.randint(1, 64)
+        yield text[i:i + step]
+        i += step
+
+
+def test_extracts_first_array_with_nested_brackets_and_fences():
+    text = "Here is the plan [draft]:\n```json\n" + json.dumps(PLAN, indent=2) + "\n```\nand [more]"
+    assert json.loads(_extract_json_array(text)) == PLAN
+
+
+def test_repairs_trailing_commas_single_quotes_and_python_literals():
+    text = "Plan:\n[{'description': 'Plot \\'age\\'', 'tool': 'histogram', 'args': {'columns': ['age',],},}, ]"
+    steps = parse_plan(text)
+    assert steps[0].args == {"columns": ["age"]} and steps[0].description == "Plot 'age'"
+
+    steps = parse_plan('[{"description": "x", "tool": "t_test", "args": {"flag": True, "none": None}}]')
+    assert steps[0].args == {"flag": True, "none": None}
+
+
+def test_incremental_feeding_matches_whole_input_fuzz():
+    rng = random.Random(1234)
+    noise = ["Sure", "[1]", "{", "}", "]", "'", "it's", "```", "\n", "json", "[note]", "[see above]", " "]
+    for _ in range(200):
+        prefix = "".join(rng.choice(noise) for _ in range(rng.randint(0, 20)))
+        text = prefix + " " + json.dumps(PLAN) + "".join(rng.choice(noise) for _ in range(10))
+        scanner = JsonArrayScanner()
+        elements = []
+        for chunk in _chunked(text, rng):
+            elements += scanner.feed(chunk)
+        assert json.loads(scanner.result) == PLAN
+        assert [json.loads(e) for e in elements] == PLAN
+        assert scanner.result == _extract_json_array(text)
+
+
+def test_scanner_is_linear_on_adversarial_megabyte_inputs():
+    # A quadratic scan of 1 MB takes minutes, so an absolute bound catches it
+    # without comparing timings that vary with machine load
+    for name, big in adversarial_inputs(MB).items():
+        t_big = _time_extract(big)
+        assert t_big < 2.0, f"{name}: {t_big:.2f}s for 1 MB"
+
+
+def _time_extract(text):
+    start = time.perf_counter()
+    _extract_json_array(text)
+    return time.perf_counter() - start
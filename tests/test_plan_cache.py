@@ -0,0 +1,65 @@
+# tests/test_plan_cache.py
+# Unit tests for the persistent plan cache.
+
+import time
+
+from planner.cache import PlanCache, make_cache_key, normalize_question, profile_fingerprint
+from planner.schemas import PlanStep
+
+PROFILE = {
+    "num_rows": 3,
+    "num_columns": 2,
+    "columns": {
+        "age": {"dtype": "int64", "num_missing": 0, "mean": 30.0},
+        "gender": {"dtype": "object", "num_missing": 0, "top_values": {"F": 2, "M": 1}},
+    },
+}
+
+
+def _steps():
+    return [
+        PlanStep(step_id="a", description="Summarise age", tool="summary_stats", args={"columns": ["age"]}),
+        PlanStep(step_id="b", description="Overview", tool="eda_overview", args={}),
+    ]
+
+
+def test_key_ignores_question_formatting_and_profile_values():
+    other = {"columns": {"gender": {"dtype": "object"}, "age": {"dtype": "int64", "mean": 99.0}}}
+    assert normalize_question("  What is   the AGE? ") == "what is the age"
+    assert profile_fingerprint(PROFILE) == profile_fingerprint(other)
+    assert make_cache_key("Age?", PROFILE, "m", "v1") == make_cache_key("age", other, "m", "v1")
+    assert make_cache_key("age", PROFILE, "m", "v1") != make_cache_key("age", PROFILE, "m", "v2")
+
+
+def test_hit_returns_fresh_step_ids_and_survives_restart(tmp_path):
+    cache = PlanCache(root=str(tmp_path))
+    cache.put("k", _steps())
+
+    hit = cache.get("k")
+    assert [s.tool for s in hit] == ["summary_stats", "eda_overview"]
+    assert {s.step_id for s in hit}.isdisjoint({"a", "b"})
+
+    reloaded = PlanCache(root=str(tmp_path)).get("k")
+    assert [s.args for s in reloaded] == [{"columns": ["age"]}, {}]
+
+
+def test_ttl_invalidation_and_lru_eviction(tmp_path):
+    cache = PlanCache(root=str(tmp_path), max_entries=1, ttl_seconds=0.05)
+    cache.put("k1", _steps())
+    cache.put("k2", _steps())
+    assert list(cache._memory) == ["k2"]
+
+    cache.invalidate("k2")
+    assert cache.get("k2") is None
+
+    time.sleep(0.1)
+    assert cache.get("k1") is None
+    assert not (tmp_path / "k1.json").exists()
+
+
+def test_empty_plans_are_not_cached(tmp_path):
+    cache = PlanCache(root=str(tmp_path))
+    cache.put("k", [])
+    assert cache.get("k") is None
+    assert list(tmp_path.iterdir()) == []
+    assert cache.stats() == {"hits": 0, "misses": 1, "entries": 0}
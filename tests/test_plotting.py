@@ -0,0 +1,46 @@
+# tests/test_plotting.py
+# Tests that plotting tools draw on their own figures, so concurrent runs can plot on several threads.
+
+import threading
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from executor.tools.plotting import run_boxplot, run_histogram
+
+
+def test_plots_never_touch_the_pyplot_current_figure(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    df = pd.DataFrame({"a": [1.0, 2.0, 2.5, 4.0], "b": [3, 1, 4, 1], "g": ["x", "y", "x", "y"]})
+    current = plt.figure()
+    try:
+        hist = run_histogram(df, ["a", "b"])["artifact"]
+        box = run_boxplot(df, "g", "a")["artifact"]
+        assert current.axes == [] and plt.get_fignums() == [current.number]
+    finally:
+        plt.close(current)
+    for path in (hist, box):
+        assert Image.open(path).size[0] > 0
+
+
+def test_concurrent_histograms_each_save_their_own_figure(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(0)
+    frames = [pd.DataFrame({f"c{i}": rng.normal(size=200)}) for i in range(4)]
+    paths = {}
+
+    def plot(i):
+        paths[i] = [run_histogram(frames[i], [f"c{i}"])["artifact"] for _ in range(5)]
+
+    threads = [threading.Thread(target=plot, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Repeated plots of one frame render identically; a mixed-up figure would differ
+    for i, saved in paths.items():
+        images = [np.asarray(Image.open(p)) for p in saved]
+        assert all(np.array_equal(images[0], image) for image in images[1:]), i
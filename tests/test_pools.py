@@ -0,0 +1,80 @@
+# tests/test_pools.py
+# Load test: uploads and plans are served concurrently instead of serializing.
+
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from core.metrics import metrics
+from datasets import storage
+from planner import llm_planner
+from planner.schemas import PlanStep
+
+PLAN_DELAY = 0.5  # Simulated LLM latency per plan
+CONCURRENT_PLANS = 6
+
+
+def _csv_bytes(rows: int) -> bytes:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "age": rng.integers(18, 80, rows),
+        "income": rng.normal(50_000, 10_000, rows),
+        "gender": rng.choice(["male", "female"], rows),
+    })
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False)
+    return buf.getvalue()
+
+
+def test_uploads_and_plans_do_not_serialize(monkeypatch, tmp_path, live_server):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+
+    def slow_plan(state, use_cache=True, prepared=None):
+        time.sleep(PLAN_DELAY)  # blocking, like the real LLM call
+        return [PlanStep(step_id="s", description=state.question, tool="eda_overview", args={})]
+
+    monkeypatch.setattr(llm_planner, "plan", slow_plan)
+
+    with httpx.Client(base_url=live_server, timeout=60) as client:
+        small = client.post("/datasets/upload", files={"file": ("d.csv", _csv_bytes(100), "text/csv")})
+        assert small.status_code == 200
+        dataset_id = small.json()["dataset_id"]
+        big_csv = _csv_bytes(300_000)
+
+        def upload():
+            return client.post("/datasets/upload", files={"file": ("big.csv", big_csv, "text/csv")})
+
+        def analyze(i):
+            data = {"dataset_id": dataset_id, "prompt": f"What drives income? ({i})", "use_cache": "false"}
+            start = time.perf_counter()
+            resp = client.post("/analyze", data=data)
+            return resp, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(CONCURRENT_PLANS + 2) as pool:
+            uploads = [pool.submit(upload) for _ in range(2)]
+            plans = [pool.submit(analyze, i) for i in range(CONCURRENT_PLANS)]
+            plan_results = [f.result() for f in plans]
+            upload_results = [f.result() for f in uploads]
+        elapsed = time.perf_counter() - start
+
+    assert all(r.status_code == 200 for r in upload_results)
+    assert not list(tmp_path.glob("*.upload"))  # Spooled uploads are removed once ingested
+    assert all(resp.status_code == 200 for resp, _ in plan_results)
+    # Serialized, six plans alone would take 6 x PLAN_DELAY
+    assert max(t for _, t in plan_results) < 3 * PLAN_DELAY
+    assert elapsed < CONCURRENT_PLANS * PLAN_DELAY + 5
+    histograms = metrics.snapshot()["histograms"]
+    assert histograms["pools.cpu.seconds"]["count"] >= 3
+    assert histograms["pools.io.wait_seconds"]["count"] >= CONCURRENT_PLANS
+
+
+def test_invalid_upload_is_rejected(monkeypatch, tmp_path, live_server):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    resp = httpx.post(f"{live_server}/datasets/upload", files={"file": ("bad.csv", b"\xff\xfe\x00", "text/csv")}, timeout=30)
+    assert resp.status_code == 400
+    assert not list(tmp_path.glob("*.upload"))
@@ -0,0 +1,50 @@
+# tests/test_preview.py
+# Tests for the preview policy that caps tool outputs and spills the full result.
+
+import numpy as np
+import pandas as pd
+
+from core.state import PromptState
+from executor.preview import bound_preview
+from executor.runner import run_step
+from planner.schemas import PlanStep
+from summarizer.narrative import generate_narrative
+
+
+def test_high_cardinality_summary_is_capped_and_spilled(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # artifacts/ is relative
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"user": np.arange(4_000) % 1_000, "amount": rng.normal(size=4_000)})
+    step = PlanStep(step_id="s1", description="Amount by user", tool="summary_stats",
+                    args={"columns": ["amount"], "by": "user"})
+
+    result = run_step(step, PromptState(question="q", profile={}, dataframe=df))
+    assert result.status == "success"
+    assert len(result.output_preview) == 50
+    assert result.truncation.total_rows == 1_000 and result.truncation.preview_rows == 50
+    assert len(result.model_dump_json()) < 64 * 1024
+
+    path = result.truncation.full_output_path
+    full = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+    assert len(full) == 1_000 and full["user"].tolist()[:3] == [0, 1, 2]
+
+    section = generate_narrative([step], [result])["Summary Stats"]
+    assert "Showing first 10 of 1000 rows" in section
+    assert path in section
+
+
+def test_byte_limit_and_small_outputs(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    wide = [{"name": "x" * 1000, "i": i} for i in range(20)]
+    preview, truncation = bound_preview(wide, "test", max_rows=50, max_bytes=5_000)
+    assert len(preview) == 4 and truncation.total_rows == 20
+    assert truncation.preview_bytes <= 5_000
+
+    small = {"num_rows": 3, "columns": ["a", "b"]}
+    assert bound_preview(small, "test") == (small, None)
+    assert bound_preview(None, "test") == (None, None)
+
+    overview = {"num_rows": 3, "columns": [f"c{i}" for i in range(500)]}
+    preview, truncation = bound_preview(overview, "test", max_rows=50)
+    assert preview["num_rows"] == 3 and len(preview["columns"]) == 50
+    assert truncation.full_output_path.endswith(".json")
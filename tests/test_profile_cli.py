@@ -0,0 +1,93 @@
+# tests/test_profile_cli.py
+# Tests for streamed, chunked profiling of CSV/Parquet files and registering them without re-parsing.
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cli import profile as profile_cli
+from datasets import profile as profiling
+from datasets import storage
+from datasets.profile import PartialProfile, profile_dataset
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 5000
+    df = pd.DataFrame({
+        "count": rng.integers(0, 300, n),
+        "score": rng.normal(size=n),
+        "grade": rng.choice(list("abcde"), n, p=[0.4, 0.25, 0.15, 0.12, 0.08]),
+        "flag": rng.random(n) < 0.3,
+    })
+    df.loc[1000:1010, "score"] = np.nan
+    df.loc[4000:4005, "count"] = np.nan  # int in most chunks, float where values are missing
+    df.loc[2500:2502, "grade"] = None
+    return df
+
+
+def _assert_same_profile(got, expected):
+    assert (got["num_rows"], got["num_columns"]) == (expected["num_rows"], expected["num_columns"])
+    for column, stats in expected["columns"].items():
+        stats = dict(stats)
+        actual = dict(got["columns"][column])
+        assert actual.pop("top_values", None) == stats.pop("top_values", None), column
+        assert actual == pytest.approx(stats, nan_ok=True), column
+
+
+def test_chunked_csv_profile_matches_a_full_load(frame, tmp_path):
+    path = tmp_path / "data.csv"
+    frame.to_csv(path, index=False)
+
+    columns, chunks = profile_cli.split_file(str(path), chunk_bytes=4096)
+    assert columns == list(frame.columns) and len(chunks) > 10
+    assert sum(c.size for c in chunks) + len(path.read_bytes().split(b"\n", 1)[0]) + 1 == path.stat().st_size
+
+    profile = profile_cli.profile_file(str(path), workers=0, chunk_bytes=4096, batch_rows=100, progress=None)
+    _assert_same_profile(profile, profile_dataset(pd.read_csv(path)))
+    assert profile["columns"]["count"]["dtype"] == "float64"
+
+
+def test_distinct_counts_are_estimated_beyond_the_sketch(monkeypatch):
+    monkeypatch.setattr(profiling, "SKETCH_SIZE", 1024)
+    values = pd.DataFrame({"x": np.arange(50_000, dtype="float64")})
+    merged = PartialProfile(["x"])
+    for start in range(0, len(values), 7000):
+        part = values.iloc[start:start + 7000]
+        partial = PartialProfile(["x"])
+        partial.update(part)
+        partial.update(part)  # Duplicates do not count twice
+        merged.merge(partial)
+    estimate = merged.finalize()["columns"]["x"]["num_unique"]
+    assert abs(estimate - 50_000) / 50_000 < 0.15
+
+
+def test_parquet_profile_in_worker_processes_and_registration(frame, monkeypatch, tmp_path):
+    pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path / "store"))
+    path = tmp_path / "data.parquet"
+    frame.to_parquet(path, row_group_size=500)
+
+    profile = profile_cli.profile_file(str(path), workers=2, chunk_bytes=1, batch_rows=200, progress=None)
+    _assert_same_profile(profile, profile_dataset(frame))
+
+    storage.register_file("pq", str(path), profile)
+    df, stored = storage.load_dataset("pq")
+    pd.testing.assert_frame_equal(df, frame)
+    assert len(pd.read_csv(tmp_path / "store" / "pq.csv")) == len(frame)
+    assert json.dumps(stored) == json.dumps(profile)
+
+
+def test_cli_registers_a_csv_with_its_streamed_profile(frame, monkeypatch, tmp_path, capsys):
+    path = tmp_path / "data.csv"
+    frame.to_csv(path, index=False)
+    monkeypatch.chdir(tmp_path)
+
+    assert profile_cli.main([str(path), "--workers", "0", "--chunk-mb", "0", "--register", "ds"]) == 0
+    assert capsys.readouterr().out.strip() == "ds"
+    assert (tmp_path / "data_store" / "ds.csv").read_bytes() == path.read_bytes()
+    df, profile = storage.load_dataset("ds")
+    _assert_same_profile(profile, profile_dataset(df))
@@ -0,0 +1,142 @@
+# tests/test_prompting.py
+# Tests for prompt building and budgets, the plan schema, plan parsing telemetry and rule-based routing.
+
+from core.metrics import metrics
+from core.state import PromptState
+from planner import llm_planner, router
+from planner.cache import PlanCache
+from planner.llm_planner import build_prompt, build_prompt_with_stats, get_static_prefix
+from planner.prompting import compact_profile, rank_columns
+from planner.rule_planner import plan_rules
+from spec.tool_specs import TOOL_SPECS, get_plan_json_schema
+
+PROMPT = "What is the distribution of age and income by gender?"
+
+
+def test_prompt_budget_compacts_wide_profiles():
+    """Wide profiles are compacted to fit the budget; small ones are untouched."""
+    columns = {f"feature_{i}": {"dtype": "float64", "num_missing": 0, "mean": 1.0, "std": 0.5,
+                                "min": 0.0, "max": 2.0} for i in range(400)}
+    columns["income"] = {"dtype": "float64", "num_missing": 3, "mean": 5e4, "std": 1e4, "min": 0.0, "max": 1e5}
+    wide = PromptState(question="How does income vary?", profile={"num_rows": 10, "num_columns": 401, "columns": columns})
+
+    prompt, stats = build_prompt_with_stats(wide, token_budget=3000)
+    assert stats.compacted and stats.final_tokens <= 3000
+    assert stats.tokens_saved > 0 and stats.columns_dropped > 0
+    assert "income:float64 missing=3" in prompt
+
+    small = PromptState(question="Age?", profile={"num_rows": 1, "num_columns": 1, "columns": {"age": {"dtype": "int64"}}})
+    prompt, stats = build_prompt_with_stats(small)
+    assert not stats.compacted and '"dtype": "int64"' in prompt
+
+
+def test_columns_are_ranked_by_whole_word_mentions():
+    profile = {"columns": {"income_usd": {}, "id": {}, "age": {}, "salary": {}}}
+    # "did" and "average" contain "id" and "age" but do not mention them
+    assert rank_columns(profile, "Did the average salary change?") == ["salary", "income_usd", "id", "age"]
+    assert rank_columns(profile, "Income usd by age")[:2] == ["income_usd", "age"]
+
+
+def test_omitted_column_names_fill_the_remaining_budget():
+    top = {f"{'x' * 30}{j}": 5 for j in range(5)}
+    columns = {f"c{i:03d}": {"dtype": "object", "num_missing": 0, "top_values": top} for i in range(300)}
+    profile = {"num_rows": 1, "num_columns": len(columns), "columns": columns}
+
+    text, kept = compact_profile(profile, "q", max_tokens=389)
+    assert kept == 15
+    assert text.splitlines()[-1] == f"omitted: {', '.join(f'c{i:03d}' for i in range(15, 23))} (+285 more columns omitted)"
+
+
+def test_prompt_starts_with_shared_static_prefix():
+    """Every prompt begins with the same cached static prefix."""
+    prefix = get_static_prefix()
+    assert "TOOL CATALOG" in prefix and "USER INPUT" not in prefix
+    for question in ("Age by gender?", "Income distribution"):
+        prompt = build_prompt(PromptState(question=question, profile={"columns": {}}))
+        assert prompt.startswith(prefix) and question in prompt[len(prefix):]
+
+
+def test_plan_schema_constrains_tools_and_args():
+    """The structured-output schema enumerates every tool and forbids extra args."""
+    schema = get_plan_json_schema()
+    branches = {b["properties"]["tool"]["enum"][0]: b for b in schema["items"]["anyOf"]}
+    assert set(branches) == set(TOOL_SPECS)
+    args = branches["summary_stats"]["properties"]["args"]
+    assert args["required"] == ["columns"] and args["additionalProperties"] is False
+    assert args["properties"]["columns"]["type"] == "array"
+
+
+def test_unparseable_output_is_retried_and_counted(monkeypatch, tmp_path):
+    """A malformed generation triggers one retry and is recorded in telemetry."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(llm_planner, "get_plan_cache", lambda: PlanCache(root=str(tmp_path / "cache")))
+    outputs = iter(["not json at all", '[{"description": "Overview", "tool": "eda_overview", "args": {}}]'])
+    monkeypatch.setattr(llm_planner, "call_ollama", lambda prompt: next(outputs))
+    metrics.reset()
+
+    steps = llm_planner.plan(PromptState(question="overview", profile={"columns": {}}), use_cache=False)
+
+    assert [s.tool for s in steps] == ["eda_overview"]
+    counters = metrics.snapshot()["counters"]
+    assert counters["planner.generations"] == 2
+    assert counters["planner.parse.failures"] == 1 and counters["planner.retries"] == 1
+    assert metrics.snapshot()["gauges"]["planner.parse.failure_rate"] == 0.5
+
+
+def test_streamed_plan_yields_each_step_as_it_closes(monkeypatch, tmp_path):
+    """Steps are parsed from the token stream one by one; duplicates and broken elements are skipped."""
+    monkeypatch.chdir(tmp_path)
+    cache = PlanCache(root=str(tmp_path / "cache"))
+    monkeypatch.setattr(llm_planner, "get_plan_cache", lambda: cache)
+    output = (
+        '[{"description": "Overview", "tool": "eda_overview", "args": {}},'
+        ' {"description": "Again", "tool": "eda_overview", "args": {}},'
+        " {'description': 'Stats', 'tool': 'summary_stats', 'args': {'columns': ['age'],}},"
+        ' {"tool": "histogram"}]'
+    )
+    chunks = [output[i:i + 7] for i in range(0, len(output), 7)]
+    monkeypatch.setattr(llm_planner, "stream_ollama", lambda prompt: iter(chunks))
+    metrics.reset()
+
+    state = PromptState(question="overview", profile={"columns": {}})
+    batches = list(llm_planner.plan_stream(state, use_cache=False))
+
+    assert [[s.tool for s in b] for b in batches] == [["eda_overview"], ["summary_stats"]]
+    assert metrics.snapshot()["counters"]["planner.stream.invalid_steps"] == 1
+    # The complete plan was cached and is served as one batch next time
+    assert [[s.tool for s in b] for b in llm_planner.plan_stream(state)] == [["eda_overview", "summary_stats"]]
+
+
+RULE_PROFILE = {
+    "num_rows": 4,
+    "num_columns": 3,
+    "columns": {
+        "age": {"dtype": "int64", "num_missing": 0, "mean": 35.0},
+        "gender": {"dtype": "object", "num_missing": 0, "top_values": {"male": 2, "female": 2}},
+        "income": {"dtype": "int64", "num_missing": 0, "mean": 65000.0},
+    },
+}
+
+
+def test_rule_planner_handles_common_intents():
+    """Frequent question patterns are planned without the LLM."""
+    dist = plan_rules(PromptState(question=PROMPT, profile=RULE_PROFILE))
+    assert dist.intent == "distribution" and dist.confidence >= 0.8
+    assert ("summary_stats", {"columns": ["age", "income"], "by": "gender"}) in [(s.tool, s.args) for s in dist.steps]
+
+    comp = plan_rules(PromptState(question="Compare income between male and female", profile=RULE_PROFILE))
+    assert comp.intent == "compare"
+    assert {"group_column": "gender", "value_column": "income"} in [s.args for s in comp.steps if s.tool == "t_test"]
+
+    unsupported = plan_rules(PromptState(question="Is income correlated with age?", profile=RULE_PROFILE))
+    assert unsupported.confidence == 0.0 and not unsupported.steps
+
+
+def test_router_falls_back_to_llm_below_threshold(monkeypatch):
+    """Low-confidence questions go to the LLM and the routing share is published."""
+    monkeypatch.setattr(router.llm_planner, "plan", lambda state, **kwargs: ["llm"])
+    metrics.reset()
+
+    assert router.route_plan(PromptState(question="Give me an overview", profile=RULE_PROFILE))[0].tool == "eda_overview"
+    assert router.route_plan(PromptState(question="What drives income?", profile=RULE_PROFILE)) == ["llm"]
+    assert metrics.snapshot()["gauges"]["planner.route.rule_share"] == 0.5
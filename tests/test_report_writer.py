@@ -0,0 +1,57 @@
+# tests/test_report_writer.py
+# Tests for the streaming report writer and its per-section cache.
+
+import json
+
+import pytest
+
+from core.metrics import metrics
+from executor.schemas import ExecutionResult
+from planner.schemas import PlanStep
+from summarizer.writer import ReportWriter, SectionCache, write_report
+
+
+def _plan(n):
+    steps = [PlanStep(step_id=f"s{i}", description=f"Summarise x{i}", tool="summary_stats",
+                      args={"columns": [f"x{i}"]}) for i in range(n)]
+    results = [ExecutionResult(step_id=f"s{i}", status="success", output_preview=[{"column": f"x{i}", "mean": i}],
+                               duration_ms=1.0) for i in range(n)]
+    return steps, results
+
+
+def test_every_step_gets_a_section_and_unchanged_sections_are_cached(tmp_path):
+    steps, results = _plan(5)
+    cache = SectionCache()
+    path = write_report(steps, results, tmp_path / "r.md", cache=cache)
+    text = path.read_text()
+    assert text.startswith("# AutoStat-Agent Report")
+    assert text.count("## Summary Stats") == 5 and "| x4 | 4 |" in text
+
+    metrics.reset()
+    results[2] = results[2].model_copy(update={"output_preview": [{"column": "x2", "mean": 99}], "duration_ms": 5.0})
+    results[3] = results[3].model_copy(update={"duration_ms": 7.0})  # Timing alone does not invalidate
+    write_report(steps, results, tmp_path / "r.md", cache=cache)
+    counters = metrics.snapshot()["counters"]
+    assert counters["summarizer.section_cache.misses"] == 1
+    assert counters["summarizer.section_cache.hits"] == 4
+    assert "| x2 | 99 |" in (tmp_path / "r.md").read_text()
+
+
+def test_failed_write_keeps_previous_report(tmp_path):
+    path = tmp_path / "r.md"
+    path.write_text("previous")
+    with pytest.raises(RuntimeError):
+        with ReportWriter(path) as writer:
+            writer.write("partial")
+            raise RuntimeError("render failed")
+    assert path.read_text() == "previous"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_json_artifacts_rendered_inline(tmp_path):
+    artifact = tmp_path / "ttest.json"
+    artifact.write_text(json.dumps({"p_value": 0.01}))
+    step = PlanStep(step_id="t", description="Compare", tool="t_test", args={})
+    result = ExecutionResult(step_id="t", status="success", artifact_path=str(artifact))
+    text = write_report([step], [result], tmp_path / "r.md", cache=SectionCache()).read_text()
+    assert '"p_value": 0.01' in text
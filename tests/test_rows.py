@@ -0,0 +1,67 @@
+# tests/test_rows.py
+# Tests for the paged, column-sliced and filtered /datasets/{id}/rows endpoint.
+
+import io
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from datasets import storage
+from datasets.profile import profile_dataset
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    df = pd.DataFrame({
+        "id": range(1000),
+        "group": ["a", "b", "c", "d"] * 250,
+        "score": [i / 10 if i % 7 else None for i in range(1000)],
+    })
+    storage.save_dataset("ds", df, profile_dataset(df))
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("arrow_cache", [True, False])
+def test_pages_columns_and_filters(client, monkeypatch, arrow_cache):
+    monkeypatch.setattr(storage, "ARROW_CACHE", arrow_cache)
+
+    body = client.get("/datasets/ds/rows", params={"offset": 990, "limit": 20, "columns": "id,score"}).json()
+    assert body["columns"] == ["id", "score"]
+    assert [r["id"] for r in body["rows"]] == list(range(990, 1000))
+    assert body["rows"][4]["score"] is None  # NaN is sent as null
+    assert body["total_rows"] == 1000 and body["has_more"] is False
+
+    body = client.get(
+        "/datasets/ds/rows", params={"filter": ["group==b", "id>=500"], "limit": 3, "offset": 1}
+    ).json()
+    assert [r["id"] for r in body["rows"]] == [505, 509, 513]
+    assert body["has_more"] is True and body["total_rows"] is None
+
+    # Missing values (every 7th score) never match a filter
+    body = client.get("/datasets/ds/rows", params={"filter": "score>98", "columns": "id"}).json()
+    assert [r["id"] for r in body["rows"]] == [981, 982, 983, 984, 985, 986, 988, 989, 990, 991, 992, 993, 995, 996, 997, 998, 999]
+
+
+def test_arrow_output_and_etag(client):
+    pa = pytest.importorskip("pyarrow")
+
+    resp = client.get("/datasets/ds/rows", params={"limit": 5, "format": "arrow"})
+    assert resp.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(io.BytesIO(resp.content)).read_all()
+    assert table.column_names == ["id", "group", "score"] and table.num_rows == 5
+
+    etag = client.get("/datasets/ds/rows", params={"limit": 5}).headers["etag"]
+    assert etag != resp.headers["etag"]  # The format is part of the cache key
+    assert client.get("/datasets/ds/rows", params={"limit": 5}, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/datasets/ds/rows", params={"limit": 6}, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_invalid_requests(client):
+    assert client.get("/datasets/missing/rows").status_code == 404
+    assert client.get("/datasets/ds/rows", params={"columns": "nope"}).status_code == 400
+    assert client.get("/datasets/ds/rows", params={"filter": "score~1"}).status_code == 400
+    assert client.get("/datasets/ds/rows", params={"filter": "score>abc"}).status_code == 400
+    assert client.get("/datasets/ds/rows", params={"limit": 0}).status_code == 422
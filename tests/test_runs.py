@@ -0,0 +1,149 @@
+# tests/test_runs.py
+# Tests for the persistent run queue and the /runs endpoints.
+
+import json
+import os
+import socket
+import threading
+import time
+
+import httpx
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from api.main import app
+from core import jobs
+from core.jobs import RunQueue, RunStore
+from core.metrics import metrics
+from core.state import RunRecord
+from datasets import storage
+from datasets.profile import profile_dataset
+
+
+def test_run_end_to_end(monkeypatch, tmp_path):
+    df = pd.read_csv("example_data.csv")
+    monkeypatch.chdir(tmp_path)  # data_store, artifacts and reports are relative
+    storage.save_dataset("ds1", df, profile_dataset(df))
+    run_queue = RunQueue(RunStore(str(tmp_path / "runs.db")), workers=2)
+    monkeypatch.setattr(jobs, "_run_queue", run_queue)
+
+    client = TestClient(app)
+    resp = client.post("/runs", json={"dataset_id": "ds1", "prompt": "Show the distribution of age by gender"})
+    assert resp.status_code == 202
+    run_id = resp.json()["run_id"]
+    run_queue.join()
+
+    record = client.get(f"/runs/{run_id}").json()
+    assert record["status"] == "succeeded", record["error"]
+    assert len(record["results"]) == len(record["plan"]) > 0
+    assert os.path.exists(record["report_path"])
+    assert client.get("/runs").json()["runs"][0]["run_id"] == run_id
+    assert client.post("/runs", json={"dataset_id": "missing", "prompt": "x"}).status_code == 404
+
+    events = _read_sse(client, f"/runs/{run_id}/events")
+    types = [e["event"] for e in events]
+    assert types[:3] == ["queued", "started", "plan"]
+    assert types[-2:] == ["report", "done"]
+    assert types.count("step_finished") == len(record["plan"])
+    # The (partial) report exists as soon as the plan does
+    assert json.loads(events[2]["data"])["report_path"] == record["report_path"]
+    assert [int(e["id"]) for e in events] == list(range(1, len(events) + 1))
+
+    resumed = _read_sse(client, f"/runs/{run_id}/events", headers={"Last-Event-ID": "3"})
+    assert [e["id"] for e in resumed] == [e["id"] for e in events[3:]]
+    run_queue.stop()
+
+
+def test_events_stream_while_running(tmp_path, monkeypatch, live_server):
+    release = threading.Event()
+    def executor(record, store):
+        store.append_event(record.run_id, "plan", {"steps": []})
+        release.wait(5)
+
+    run_queue = RunQueue(RunStore(str(tmp_path / "runs.db")), workers=1, executor=executor)
+    monkeypatch.setattr(jobs, "_run_queue", run_queue)
+    run_id = run_queue.submit("d", "q").run_id
+
+    # TestClient buffers whole responses, so stream from a real server
+    seen = []
+    start = time.perf_counter()
+    with httpx.stream("GET", f"{live_server}/runs/{run_id}/events", timeout=10) as resp:
+        for line in resp.iter_lines():
+            if line.startswith("event: "):
+                seen.append(line[len("event: "):])
+                if seen[-1] == "plan":
+                    release.set()  # the first events arrive before the run has finished
+
+    assert seen == ["queued", "started", "plan", "done"]
+    assert time.perf_counter() - start < 3
+    run_queue.stop()
+
+
+def test_interrupted_runs_are_recovered(tmp_path):
+    store = RunStore(str(tmp_path / "runs.db"))
+    store.save(RunRecord(run_id="r1", dataset_id="d", question="q", status="running", created_at=time.time()))
+    store.save(RunRecord(run_id="r2", dataset_id="d", question="q", status="succeeded", created_at=time.time()))
+
+    release = threading.Event()
+    def slow_executor(record, store):
+        release.wait(5)
+        record.report_path = "report.md"
+
+    # A fresh queue over the same database simulates an API restart
+    run_queue = RunQueue(RunStore(store.path), workers=1, executor=slow_executor)
+    assert run_queue.recover() == 1
+    time.sleep(0.1)
+    assert metrics.snapshot()["gauges"]["runs.worker_utilization"] == 1.0
+    release.set()
+    run_queue.join()
+
+    assert store.get("r1").status == "succeeded"
+    assert store.get("r1").report_path == "report.md"
+    run_queue.stop()
+
+
+def test_a_run_enqueued_by_two_processes_executes_once(tmp_path):
+    store = RunStore(str(tmp_path / "runs.db"))
+    store.save(RunRecord(run_id="r1", dataset_id="d", question="q", created_at=time.time()))
+    executed = []
+    queues = [RunQueue(RunStore(store.path), workers=2, executor=lambda r, s: executed.append(r.run_id))
+              for _ in range(2)]
+    for run_queue in queues:
+        run_queue.recover()
+        run_queue._enqueue("r1")
+    for run_queue in queues:
+        run_queue.join()
+        run_queue.stop()
+
+    assert executed == ["r1"]
+    assert store.get("r1").status == "succeeded"
+
+
+def test_recovery_leaves_runs_of_live_owners_alone(tmp_path):
+    store = RunStore(str(tmp_path / "runs.db"))
+    for run_id in ("live", "stale", "exited"):
+        store.save(RunRecord(run_id=run_id, dataset_id="d", question="q", created_at=time.time()))
+    store.claim("live", "other-host:123:abc")
+    store.claim("stale", "other-host:456:def")
+    store.claim("exited", f"{socket.gethostname()}:999999999:0")  # No such pid
+    with store._connect() as conn:
+        conn.execute("UPDATE runs SET heartbeat = 0 WHERE run_id = 'stale'")
+
+    assert store.release_orphans(lease_seconds=60) == 2
+    assert {r.run_id: r.status for r in store.list()} == {"live": "running", "stale": "queued", "exited": "queued"}
+    assert store.get("stale").started_at is None
+
+
+def _read_sse(client, url, headers=None):
+    """Collect the SSE messages of a finished run as dicts of their fields."""
+    events, current = [], {}
+    with client.stream("GET", url, headers=headers) as resp:
+        for line in resp.iter_lines():
+            if not line:
+                if current:
+                    events.append(current)
+                current = {}
+            elif not line.startswith(":"):
+                field, _, value = line.partition(": ")
+                current[field] = value
+    return events
@@ -0,0 +1,92 @@
+# tests/test_serialization.py
+# Tests for numpy/pandas-aware JSON responses, compression negotiation and compact profiles.
+
+import json
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.serialization import CompressionMiddleware, FastJSONResponse, dumps, negotiate_encoding
+from datasets import storage
+from datasets.profile import profile_dataset
+
+
+def test_dumps_handles_numpy_pandas_and_nan():
+    payload = {
+        "mean": float("nan"),
+        "count": np.int64(3),
+        "ratio": np.float32(0.5),
+        "values": np.array([1.0, np.nan]),
+        "when": pd.Timestamp("2024-01-02"),
+        "missing": pd.NA,
+        1: "non-string key",
+    }
+    assert json.loads(dumps(payload)) == {
+        "mean": None, "count": 3, "ratio": 0.5, "values": [1.0, None],
+        "when": "2024-01-02T00:00:00", "missing": None, "1": "non-string key",
+    }
+
+
+def test_negotiation_prefers_best_accepted_codec():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("*") is not None
+
+
+def test_large_responses_compressed_and_streams_untouched():
+    demo = FastAPI(default_response_class=FastJSONResponse)
+
+    @demo.get("/big")
+    def big():
+        return {"values": list(range(5000))}
+
+    @demo.get("/small")
+    def small():
+        return {"ok": True}
+
+    @demo.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a" * 2000, b"b" * 2000]), media_type="application/x-ndjson")
+
+    demo.add_middleware(CompressionMiddleware, minimum_size=1024)
+    client = TestClient(demo)
+
+    resp = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip" and resp.headers["vary"] == "Accept-Encoding"
+    assert resp.json()["values"][-1] == 4999
+    assert int(resp.headers["content-length"]) < len(dumps({"values": list(range(5000))}))
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+    resp = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers and resp.content == b"a" * 2000 + b"b" * 2000
+
+
+def test_compression_is_the_outermost_api_middleware():
+    # Starlette lists middleware outermost first
+    assert app.user_middleware[0].cls is CompressionMiddleware
+
+
+def test_compact_and_on_demand_profile(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    df = pd.DataFrame({"a": [1.0, 2.0], "empty": [np.nan, np.nan], "label": ["x", "y"]})
+    storage.save_dataset("ds", df, profile_dataset(df))
+    client = TestClient(app)
+
+    resp = client.get("/datasets/ds/profile")
+    assert resp.status_code == 200
+    assert resp.json()["profile"]["columns"]["empty"]["mean"] is None  # NaN stats no longer fail
+
+    resp = client.get("/datasets/ds/profile", params={"columns": "a"})
+    assert list(resp.json()["profile"]["columns"]) == ["a"]
+    assert client.get("/datasets/ds/profile", params={"columns": "nope"}).status_code == 400
+    assert client.get("/datasets/missing/profile").status_code == 404
+
+    csv = df.to_csv(index=False).encode()
+    body = client.post("/datasets/upload?profile=compact", files={"file": ("d.csv", csv, "text/csv")}).json()
+    assert body["profile"]["columns"]["a"] == {"dtype": "float64", "num_missing": 0, "num_unique": 2}
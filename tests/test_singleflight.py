@@ -0,0 +1,121 @@
+# tests/test_singleflight.py
+# Tests for request coalescing of identical concurrent computations.
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.metrics import metrics
+from core.singleflight import AsyncSingleFlight, SingleFlight
+from core.state import PromptState
+from planner import llm_planner
+from planner.cache import PlanCache
+
+
+def test_concurrent_calls_share_one_execution_and_errors():
+    group = SingleFlight("test")
+    calls = []
+
+    def work(value):
+        calls.append(value)
+        time.sleep(0.2)
+        if value == "boom":
+            raise RuntimeError("failed once")
+        return value * 2
+
+    with ThreadPoolExecutor(8) as pool:
+        outcomes = list(pool.map(lambda _: group.do("k", work, "ab"), range(8)))
+    assert calls == ["ab"]
+    assert {result for result, _ in outcomes} == {"abab"}
+    assert sum(shared for _, shared in outcomes) == 7
+
+    def failing(_):
+        try:
+            group.do("e", work, "boom")
+        except RuntimeError as exc:
+            return str(exc)
+
+    with ThreadPoolExecutor(4) as pool:
+        assert set(pool.map(failing, range(4))) == {"failed once"}
+    assert group.in_flight() == 0
+    assert group.do("k", work, "cd") == ("cdcd", False)  # nothing is cached afterwards
+
+
+def test_async_cancellation_only_stops_abandoned_work():
+    async def scenario():
+        group = AsyncSingleFlight("test")
+        started = []
+
+        async def work():
+            started.append(1)
+            await asyncio.sleep(0.1)
+            return "done"
+
+        first = asyncio.create_task(group.do("k", work))
+        second = asyncio.create_task(group.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()  # the other waiter still wants the result
+        assert await second == ("done", True)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        lone = asyncio.create_task(group.do("k2", work))
+        await asyncio.sleep(0.01)
+        lone.cancel()  # last waiter gone: the computation is cancelled
+        with pytest.raises(asyncio.CancelledError):
+            await lone
+        await asyncio.sleep(0)
+        assert group.in_flight() == 0
+        assert len(started) == 2
+
+    asyncio.run(scenario())
+
+
+def test_identical_llm_plans_coalesce(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(llm_planner, "get_plan_cache", lambda: PlanCache(root=str(tmp_path / "cache")))
+    generations = []
+
+    def slow_llm(prompt):
+        generations.append(prompt)
+        time.sleep(0.3)
+        return '[{"description": "Overview", "tool": "eda_overview", "args": {}}]'
+
+    monkeypatch.setattr(llm_planner, "call_ollama", slow_llm)
+    metrics.reset()
+    state = PromptState(question="What drives income?", profile={"columns": {}})
+
+    with ThreadPoolExecutor(4) as pool:
+        plans = list(pool.map(lambda _: llm_planner.plan(state, use_cache=False), range(4)))
+
+    assert len(generations) == 1
+    assert all([s.tool for s in p] == ["eda_overview"] for p in plans)
+    assert len({id(p[0]) for p in plans}) == 4  # each caller owns its steps
+    assert metrics.counter("singleflight.plan.coalesced") == 3
+
+
+def test_plans_for_different_data_or_cache_modes_do_not_coalesce(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(llm_planner, "get_plan_cache", lambda: PlanCache(root=str(tmp_path / "cache")))
+    generations = []
+
+    def slow_llm(prompt):
+        generations.append(prompt)
+        time.sleep(0.3)
+        return '[{"description": "Overview", "tool": "eda_overview", "args": {}}]'
+
+    monkeypatch.setattr(llm_planner, "call_ollama", slow_llm)
+    column = {"dtype": "object", "num_missing": 0, "num_unique": 2}
+    # Same schema, different values: the prompts differ, so must the generations
+    states = [
+        PromptState(question="Compare groups", profile={"columns": {"g": {**column, "top_values": {level: 5}}}})
+        for level in ("north", "south")
+    ]
+    requests = [(states[0], False), (states[1], False), (states[0], True)]
+
+    with ThreadPoolExecutor(3) as pool:
+        list(pool.map(lambda r: llm_planner.plan(r[0], use_cache=r[1]), requests))
+
+    assert len(generations) == 3
@@ -0,0 +1,50 @@
+# tests/test_storage.py
+# Tests for dataset storage and the memory-mapped Arrow copy.
+
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from datasets import storage
+
+CSV = b"group,score,label\na,1.5,x\nb,2.5,y\na,,z\nc,4.0,x\n"
+
+
+def _ingest(dataset_id):
+    """Spool and ingest CSV as the upload endpoint does."""
+    path = storage.spool_upload(io.BytesIO(CSV), dataset_id)
+    storage.ingest_csv(dataset_id, path)
+    os.remove(path)
+
+
+def test_arrow_copy_is_memory_mapped_and_matches_csv(monkeypatch, tmp_path):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    _ingest("ds")
+    assert os.path.exists(tmp_path / "ds.arrow")
+
+    df, profile = storage.load_dataset("ds")
+    expected = pd.read_csv(tmp_path / "ds.csv")
+    pd.testing.assert_frame_equal(df, expected)
+    assert profile["num_rows"] == 4
+    # Numeric columns are zero-copy views of the mapped file
+    assert not df["score"].to_numpy().flags.writeable
+
+    # Datasets stored before the Arrow cache get their copy on first load
+    os.remove(tmp_path / "ds.arrow")
+    df, _ = storage.load_dataset("ds")
+    assert os.path.exists(tmp_path / "ds.arrow")
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_csv_fallback_when_arrow_cache_disabled(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "ARROW_CACHE", False)
+    _ingest("ds")
+    assert not os.path.exists(tmp_path / "ds.arrow")
+
+    df, _ = storage.load_dataset("ds")
+    pd.testing.assert_frame_equal(df, pd.read_csv(tmp_path / "ds.csv"))
+    assert df["score"].to_numpy().flags.writeable